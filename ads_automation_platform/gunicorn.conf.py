@@ -0,0 +1,23 @@
+"""
+Configuração do gunicorn: gunicorn -c gunicorn.conf.py src.main:app
+
+Com mais de um worker, defina PROMETHEUS_MULTIPROC_DIR para que /api/metrics agregue as métricas de todos
+os processos (ver src/services/app_metrics.py).
+"""
+
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+
+
+def on_starting(server):
+    # Valores de uma execução anterior não podem entrar na agregação
+    from src.services import app_metrics
+    app_metrics.clear_multiprocess_dir()
+
+
+def child_exit(server, worker):
+    from src.services import app_metrics
+    app_metrics.mark_process_dead(worker.pid)
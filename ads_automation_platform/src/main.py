@@ -18,6 +18,8 @@ from src.routes.integrations import integrations_bp
 from src.routes.automation import automation_bp
 from src.routes.ad_generation import ad_generation_bp
 from src.routes.facebook_data import facebook_data_bp
+from src.routes.metrics import metrics_bp
+from src.services import app_metrics
 
 # Habilitar CORS para todas as rotas
 CORS(app)
@@ -29,6 +31,10 @@ app.register_blueprint(integrations_bp, url_prefix='/api')
 app.register_blueprint(automation_bp, url_prefix='/api')
 app.register_blueprint(ad_generation_bp, url_prefix='/api')
 app.register_blueprint(facebook_data_bp, url_prefix='/api')
+app.register_blueprint(metrics_bp, url_prefix='/api')
+
+# Latência das rotas e consultas SQLAlchemy por requisição (exposto em /api/metrics)
+app_metrics.init_app(app)
 
 # uncomment if you need to use database
 app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
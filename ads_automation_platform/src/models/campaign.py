@@ -1,8 +1,6 @@
-from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 import json
-
-db = SQLAlchemy()
+from src.models.user import db  # Instância única registrada no app (main.py)
 
 class Campaign(db.Model):
     __tablename__ = 'campaigns'
@@ -18,7 +16,7 @@ class Campaign(db.Model):
     target_audience = db.Column(db.Text, nullable=True)  # JSON string com dados de segmentação
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     
     # Relacionamentos
     ad_groups = db.relationship('AdGroup', backref='campaign', lazy=True, cascade='all, delete-orphan')
@@ -1,7 +1,5 @@
-from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
-
-db = SQLAlchemy()
+from src.models.user import db  # Instância única registrada no app (main.py)
 
 class PerformanceData(db.Model):
     __tablename__ = 'performance_data'
@@ -54,7 +52,7 @@ class PlatformAccount(db.Model):
     __tablename__ = 'platform_accounts'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     platform = db.Column(db.String(50), nullable=False)  # 'google_ads', 'facebook_ads', etc.
     account_id = db.Column(db.String(255), nullable=False)  # ID da conta na plataforma
     account_name = db.Column(db.String(255), nullable=True)
@@ -1,20 +1,27 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, send_file
+from src.models.performance import PlatformAccount
+from src.services.api_client_registry import api_client_registry, FACEBOOK_PLATFORMS
 from src.services.facebook_data_service import facebook_data_service
+from src.services.media_proxy import media_proxy, MEDIA_SIZES, ORIGINAL_SIZE, DEFAULT_MEDIA_SIZE
+from src.services.structured_logging import get_logger, log_event
 from datetime import datetime, timedelta
 import json
+import logging
+
+logger = get_logger(__name__)
 
 # Imports dos serviços de IA com fallback MELHORADO
 try:
     from src.services.ai_ad_generation_service import AIAdGenerationService
     ai_ad_service = AIAdGenerationService()
-    print("✅ ai_ad_service importado com sucesso")
+    logger.debug("ai_ad_service importado com sucesso")
 except ImportError as e:
-    print(f"⚠️ WARNING: ai_ad_generation_service não encontrado: {e}")
+    logger.warning("ai_ad_generation_service não encontrado: %s", e)
     try:
         # Fallback: tentar serviço melhorado
         from src.services.ai_ad_generation_service_melhorado import AIAdGenerationServiceMelhorado
         ai_ad_service = AIAdGenerationServiceMelhorado()
-        print("✅ ai_ad_service_melhorado importado com sucesso")
+        logger.debug("ai_ad_service_melhorado importado com sucesso")
     except ImportError:
         ai_ad_service = None
 
@@ -23,35 +30,70 @@ facebook_ai_integration = None
 try:
     # Tentar import do local padrão
     from src.services.facebook_ai_integration import facebook_ai_integration
-    print("✅ facebook_ai_integration importado com sucesso (src.services)")
+    logger.debug("facebook_ai_integration importado com sucesso (src.services)")
 except ImportError:
     try:
         # Fallback: tentar import direto
         from facebook_ai_integration import facebook_ai_integration
-        print("✅ facebook_ai_integration importado com sucesso (direto)")
+        logger.debug("facebook_ai_integration importado com sucesso (direto)")
     except ImportError:
         try:
             # Fallback: tentar instanciar classe diretamente
             from facebook_ai_integration import FacebookAIIntegration
             facebook_ai_integration = FacebookAIIntegration()
-            print("✅ facebook_ai_integration instanciado com sucesso")
+            logger.debug("facebook_ai_integration instanciado com sucesso")
         except ImportError as e:
-            print(f"⚠️ WARNING: facebook_ai_integration não encontrado: {e}")
+            logger.warning("facebook_ai_integration não encontrado: %s", e)
             facebook_ai_integration = None
 
 facebook_data_bp = Blueprint('facebook_data', __name__)
 
+def _platform_account():
+    """
+    Conta do Facebook (PlatformAccount) do usuário da requisição
+    
+    Lê user_id e, opcionalmente, platform_account_id da query string ou do corpo JSON; sem
+    platform_account_id usa a primeira conta ativa do usuário.
+    """
+    body = request.get_json(silent=True) or {}
+    # Em uma implementação real, o user_id viria da sessão/token
+    user_id = request.args.get('user_id', type=int) or body.get('user_id', 1)  # Placeholder
+    platform_account_id = request.args.get('platform_account_id', type=int) or body.get('platform_account_id')
+    
+    query = PlatformAccount.query.filter(
+        PlatformAccount.user_id == user_id,
+        PlatformAccount.platform.in_(FACEBOOK_PLATFORMS),
+        PlatformAccount.is_active.is_(True)
+    )
+    if platform_account_id:
+        query = query.filter(PlatformAccount.id == platform_account_id)
+    return query.order_by(PlatformAccount.id).first()
+
+def _facebook_service():
+    """
+    Cliente de dados do Facebook da conta do usuário, reaproveitado pelo registro de clientes
+    
+    Sem conta conectada, cai no serviço configurado pelas variáveis de ambiente (None se também não houver).
+    """
+    account = _platform_account()
+    if account is not None:
+        service = api_client_registry.for_account(account, kind="data")
+        if service is not None:
+            return service
+    return facebook_data_service
+
 @facebook_data_bp.route('/facebook/account-info', methods=['GET'])
 def get_account_info():
     """Buscar informações da conta de anúncios do Facebook"""
-    if not facebook_data_service:
+    facebook_service = _facebook_service()
+    if not facebook_service:
         return jsonify({
             'success': False, 
-            'error': 'Serviço do Facebook não configurado. Verifique as variáveis de ambiente.'
+            'error': 'Serviço do Facebook não configurado. Conecte uma conta do Facebook ou verifique as variáveis de ambiente.'
         }), 500
     
     try:
-        result = facebook_data_service.get_ad_account_info()
+        result = facebook_service.get_ad_account_info()
         
         if "error" in result:
             return jsonify({'success': False, 'error': result['error']}), 500
@@ -64,14 +106,15 @@ def get_account_info():
 @facebook_data_bp.route('/facebook/pages', methods=['GET'])
 def get_pages():
     """Buscar páginas do Facebook"""
-    if not facebook_data_service:
+    facebook_service = _facebook_service()
+    if not facebook_service:
         return jsonify({
             'success': False, 
-            'error': 'Serviço do Facebook não configurado. Verifique as variáveis de ambiente.'
+            'error': 'Serviço do Facebook não configurado. Conecte uma conta do Facebook ou verifique as variáveis de ambiente.'
         }), 500
     
     try:
-        result = facebook_data_service.get_pages()
+        result = facebook_service.get_pages()
         
         if "error" in result:
             return jsonify({'success': False, 'error': result['error']}), 500
@@ -84,14 +127,15 @@ def get_pages():
 @facebook_data_bp.route('/facebook/posts/<page_id>', methods=['GET'])
 def get_posts(page_id):
     """Buscar posts de uma página específica"""
-    if not facebook_data_service:
+    facebook_service = _facebook_service()
+    if not facebook_service:
         return jsonify({
             'success': False, 
-            'error': 'Serviço do Facebook não configurado. Verifique as variáveis de ambiente.'
+            'error': 'Serviço do Facebook não configurado. Conecte uma conta do Facebook ou verifique as variáveis de ambiente.'
         }), 500
     
     try:
-        result = facebook_data_service.get_page_posts(page_id)
+        result = facebook_service.get_page_posts(page_id)
         
         if "error" in result:
             return jsonify({'success': False, 'error': result['error']}), 500
@@ -101,22 +145,79 @@ def get_posts(page_id):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# Uma URL do proxy com a versão atual (?v=) é imutável: imagem trocada na origem ganha outra versão.
+# Sem versão (ou com uma antiga), a resposta é revalidada pelo ETag após pouco tempo
+MEDIA_CACHE_MAX_AGE = 365 * 24 * 3600
+MEDIA_REVALIDATE_MAX_AGE = 300
+
+@facebook_data_bp.route('/facebook/media/<media_hash>', methods=['GET'])
+def get_media(media_hash):
+    """Servir uma imagem de publicação pelo proxy de mídia (?size=thumb|normal|original&v=<versão>)"""
+    size = request.args.get('size', DEFAULT_MEDIA_SIZE)
+    if size not in MEDIA_SIZES and size != ORIGINAL_SIZE:
+        return jsonify({'success': False, 'error': f'Tamanho inválido: {size}'}), 400
+    if len(media_hash) != 32 or any(char not in '0123456789abcdef' for char in media_hash):
+        return jsonify({'success': False, 'error': 'Mídia não encontrada'}), 404
+    
+    try:
+        media = media_proxy.get(media_hash, size)
+        
+        if media is None:
+            return jsonify({'success': False, 'error': 'Mídia não encontrada'}), 404
+        if "error" in media:
+            return jsonify({'success': False, 'error': media['error']}), 502
+        
+        # send_file responde 304 sozinho quando o If-None-Match bate com o ETag
+        versioned = media.get('version') is not None and request.args.get('v') == media['version']
+        response = send_file(media['path'], mimetype=media['content_type'], etag=media['etag'],
+                             max_age=MEDIA_CACHE_MAX_AGE if versioned else MEDIA_REVALIDATE_MAX_AGE)
+        response.cache_control.public = True
+        if versioned:
+            response.cache_control.immutable = True
+        return response
+    
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# Limites do tamanho de página aceitos nas rotas paginadas
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 500
+
+def _page_args():
+    """Ler ?limit= e ?after= da requisição (o cursor é repassado como veio da Graph API)"""
+    limit = request.args.get('limit', DEFAULT_PAGE_LIMIT, type=int) or DEFAULT_PAGE_LIMIT
+    return max(1, min(limit, MAX_PAGE_LIMIT)), request.args.get('after') or None
+
+def _paged_data(result):
+    """Montar a página para o frontend com um cursor opaco, sem as URLs de paging (que carregam o token)"""
+    paging = result.get('paging') or {}
+    next_cursor = (paging.get('cursors') or {}).get('after') if paging.get('next') else None
+    return {
+        'data': result.get('data', []),
+        'paging': {
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }
+    }
+
 @facebook_data_bp.route('/facebook/campaigns', methods=['GET'])
 def get_campaigns():
-    """Buscar campanhas de anúncios"""
-    if not facebook_data_service:
+    """Buscar uma página de campanhas de anúncios (?limit=&after=)"""
+    facebook_service = _facebook_service()
+    if not facebook_service:
         return jsonify({
             'success': False, 
-            'error': 'Serviço do Facebook não configurado. Verifique as variáveis de ambiente.'
+            'error': 'Serviço do Facebook não configurado. Conecte uma conta do Facebook ou verifique as variáveis de ambiente.'
         }), 500
     
     try:
-        result = facebook_data_service.get_campaigns()
+        limit, after = _page_args()
+        result = facebook_service.get_campaigns(limit=limit, after=after)
         
         if "error" in result:
             return jsonify({'success': False, 'error': result['error']}), 500
         
-        return jsonify({'success': True, 'data': result})
+        return jsonify({'success': True, 'data': _paged_data(result)})
     
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -124,19 +225,21 @@ def get_campaigns():
 @facebook_data_bp.route('/facebook/adsets/<campaign_id>', methods=['GET'])
 def get_adsets(campaign_id):
     """Buscar conjuntos de anúncios de uma campanha"""
-    if not facebook_data_service:
+    facebook_service = _facebook_service()
+    if not facebook_service:
         return jsonify({
             'success': False, 
-            'error': 'Serviço do Facebook não configurado. Verifique as variáveis de ambiente.'
+            'error': 'Serviço do Facebook não configurado. Conecte uma conta do Facebook ou verifique as variáveis de ambiente.'
         }), 500
     
     try:
-        result = facebook_data_service.get_adsets(campaign_id)
+        limit, after = _page_args()
+        result = facebook_service.get_adsets(campaign_id, limit=limit, after=after)
         
         if "error" in result:
             return jsonify({'success': False, 'error': result['error']}), 500
         
-        return jsonify({'success': True, 'data': result})
+        return jsonify({'success': True, 'data': _paged_data(result)})
     
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -144,19 +247,21 @@ def get_adsets(campaign_id):
 @facebook_data_bp.route('/facebook/ads/<adset_id>', methods=['GET'])
 def get_ads(adset_id):
     """Buscar anúncios de um conjunto de anúncios"""
-    if not facebook_data_service:
+    facebook_service = _facebook_service()
+    if not facebook_service:
         return jsonify({
             'success': False, 
-            'error': 'Serviço do Facebook não configurado. Verifique as variáveis de ambiente.'
+            'error': 'Serviço do Facebook não configurado. Conecte uma conta do Facebook ou verifique as variáveis de ambiente.'
         }), 500
     
     try:
-        result = facebook_data_service.get_ads(adset_id)
+        limit, after = _page_args()
+        result = facebook_service.get_ads(adset_id, limit=limit, after=after)
         
         if "error" in result:
             return jsonify({'success': False, 'error': result['error']}), 500
         
-        return jsonify({'success': True, 'data': result})
+        return jsonify({'success': True, 'data': _paged_data(result)})
     
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -164,19 +269,49 @@ def get_ads(adset_id):
 @facebook_data_bp.route('/facebook/insights/<ad_id>', methods=['GET'])
 def get_ad_insights(ad_id):
     """Buscar insights de um anúncio específico"""
-    if not facebook_data_service:
+    facebook_service = _facebook_service()
+    if not facebook_service:
         return jsonify({
             'success': False, 
-            'error': 'Serviço do Facebook não configurado. Verifique as variáveis de ambiente.'
+            'error': 'Serviço do Facebook não configurado. Conecte uma conta do Facebook ou verifique as variáveis de ambiente.'
         }), 500
     
     try:
-        result = facebook_data_service.get_ad_insights(ad_id)
+        _, after = _page_args()
+        result = facebook_service.get_ad_insights(ad_id, after=after)
         
         if "error" in result:
             return jsonify({'success': False, 'error': result['error']}), 500
         
-        return jsonify({'success': True, 'data': result})
+        return jsonify({'success': True, 'data': _paged_data(result)})
+    
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@facebook_data_bp.route('/facebook/instagram-posts/<page_id>', methods=['GET'])
+def get_instagram_posts(page_id):
+    """Buscar uma página de publicações do Instagram vinculado à página (?limit=&after=)"""
+    facebook_service = _facebook_service()
+    if not facebook_service:
+        return jsonify({
+            'success': False, 
+            'error': 'Serviço do Facebook não configurado. Conecte uma conta do Facebook ou verifique as variáveis de ambiente.'
+        }), 500
+    
+    try:
+        limit, after = _page_args()
+        result = facebook_service.get_instagram_posts(page_id, limit=limit, after=after)
+        
+        if not result.get('success'):
+            return jsonify({'success': False, 'error': result['error']}), 500
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'data': result['posts'],
+                'paging': {'next_cursor': result['next_cursor'], 'has_more': result['has_more']}
+            }
+        })
     
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -241,7 +376,7 @@ def create_ad_with_full_automation():
     }
     """
     try:
-        print("🤖🚀 DEBUG: AUTOMAÇÃO COMPLETA - Endpoint chamado")
+        logger.debug("AUTOMAÇÃO COMPLETA - Endpoint chamado")
         
         # Verificar serviços
         if not ai_ad_service:
@@ -250,7 +385,8 @@ def create_ad_with_full_automation():
                 "error": "Serviço de IA não disponível. Verifique OPENAI_API_KEY."
             }), 500
         
-        if not facebook_data_service:
+        facebook_service = _facebook_service()
+        if not facebook_service:
             return jsonify({
                 "success": False,
                 "error": "Serviço do Facebook não disponível. Verifique tokens."
@@ -281,20 +417,20 @@ def create_ad_with_full_automation():
                 "error": "ID da página é obrigatório"
             }), 400
         
-        print(f"🤖 DEBUG: Descrição do produto: {product_description}")
-        print(f"📄 DEBUG: Página ID: {page_id}")
+        logger.debug("Descrição do produto: %s", product_description)
+        logger.debug("Página ID: %s", page_id)
         
         # Parâmetros opcionais com valores padrão inteligentes
         budget_range = data.get('budget_range', 'medium')  # low, medium, high
         target_location = data.get('target_location', 'Brasil')
         business_type = data.get('business_type', 'local')  # local, online, hybrid
         
-        print(f"💰 DEBUG: Faixa de orçamento: {budget_range}")
-        print(f"📍 DEBUG: Localização: {target_location}")
-        print(f"🏢 DEBUG: Tipo de negócio: {business_type}")
+        logger.debug("Faixa de orçamento: %s", budget_range)
+        logger.debug("Localização: %s", target_location)
+        logger.debug("Tipo de negócio: %s", business_type)
         
         # ETAPA 1: ANÁLISE INTELIGENTE DO PRODUTO VIA IA
-        print("🧠 DEBUG: ETAPA 1 - Análise inteligente do produto...")
+        logger.debug("ETAPA 1 - Análise inteligente do produto...")
         
         analysis_prompt = f"""
         Analise esta descrição de produto/serviço e extraia informações estruturadas:
@@ -354,10 +490,10 @@ def create_ad_with_full_automation():
                 }), 500
             
             product_analysis = analysis_result.get("analysis", {})
-            print(f"✅ DEBUG: Análise do produto concluída: {product_analysis.get('business_name', 'N/A')}")
+            logger.debug("Análise do produto concluída: %s", product_analysis.get('business_name', 'N/A'))
             
         except Exception as e:
-            print(f"💥 DEBUG: Erro na análise: {str(e)}")
+            logger.exception("Erro na análise: %s", e)
             return jsonify({
                 "success": False,
                 "error": f"Erro na análise do produto: {str(e)}",
@@ -365,7 +501,7 @@ def create_ad_with_full_automation():
             }), 500
         
         # ETAPA 2: GERAÇÃO AUTOMÁTICA DE MÚLTIPLAS OPÇÕES DE ANÚNCIO
-        print("🎨 DEBUG: ETAPA 2 - Gerando múltiplas opções de anúncio...")
+        logger.debug("ETAPA 2 - Gerando múltiplas opções de anúncio...")
         
         # Definir orçamentos baseados na faixa escolhida
         budget_ranges = {
@@ -385,7 +521,7 @@ def create_ad_with_full_automation():
                            (selected_budget["min"] + selected_budget["max"]) // 2,
                            selected_budget["max"]][i]
             
-            print(f"🎯 DEBUG: Gerando opção {i+1}: {option_name} (R$ {option_budget}/dia)")
+            logger.debug("Gerando opção %s: %s (R$ %s/dia)", i+1, option_name, option_budget)
             
             # Preparar dados para geração da opção
             option_data = {
@@ -438,13 +574,13 @@ def create_ad_with_full_automation():
                         }
                     })
                     
-                    print(f"✅ DEBUG: Opção {i+1} gerada com sucesso")
+                    logger.debug("Opção %s gerada com sucesso", i+1)
                     
                 else:
-                    print(f"❌ DEBUG: Erro ao gerar opção {i+1}: {option_result.get('error')}")
+                    logger.warning("Erro ao gerar opção %s: %s", i+1, option_result.get('error'))
                     
             except Exception as e:
-                print(f"💥 DEBUG: Exceção ao gerar opção {i+1}: {str(e)}")
+                logger.exception("Exceção ao gerar opção %s: %s", i+1, e)
                 continue
         
         if not ad_options:
@@ -454,10 +590,10 @@ def create_ad_with_full_automation():
                 "stage": "option_generation"
             }), 500
         
-        print(f"✅ DEBUG: {len(ad_options)} opções geradas com sucesso")
+        logger.debug("%s opções geradas com sucesso", len(ad_options))
         
         # ETAPA 3: PREPARAR RESPOSTA COMPLETA
-        print("📋 DEBUG: ETAPA 3 - Preparando resposta completa...")
+        logger.debug("ETAPA 3 - Preparando resposta completa...")
         
         response_data = {
             "success": True,
@@ -492,9 +628,7 @@ def create_ad_with_full_automation():
         return jsonify(response_data), 200
         
     except Exception as e:
-        print(f"💥 DEBUG: Erro geral na automação: {str(e)}")
-        import traceback
-        print(f"💥 DEBUG: Traceback: {traceback.format_exc()}")
+        logger.exception("Erro geral na automação: %s", e)
         
         return jsonify({
             "success": False,
@@ -515,7 +649,7 @@ def publish_selected_option():
     }
     """
     try:
-        print("🚀 DEBUG: Publicando opção selecionada...")
+        logger.debug("Publicando opção selecionada...")
         
         data = request.get_json()
         
@@ -552,7 +686,7 @@ def publish_selected_option():
         
         # Aplicar personalizações se fornecidas
         if customizations:
-            print(f"🎨 DEBUG: Aplicando personalizações: {customizations}")
+            logger.debug("Aplicando personalizações: %s", customizations)
             
             # Aplicar personalizações na campanha
             if customizations.get('campaign_name'):
@@ -579,15 +713,13 @@ def publish_selected_option():
             'selected_post': None  # Novo anúncio, não baseado em post existente
         }
         
-        print(f"🚀 DEBUG: Chamando endpoint de publicação com dados: {publish_data}")
+        logger.debug("Chamando endpoint de publicação com dados: %s", publish_data)
         
         # Chamar função de publicação existente
         return publish_ad_internal(publish_data)
         
     except Exception as e:
-        print(f"💥 DEBUG: Erro ao publicar opção: {str(e)}")
-        import traceback
-        print(f"💥 DEBUG: Traceback: {traceback.format_exc()}")
+        logger.exception("Erro ao publicar opção: %s", e)
         
         return jsonify({
             "success": False,
@@ -600,7 +732,7 @@ def get_automation_templates():
     Buscar templates de automação para diferentes tipos de negócio
     """
     try:
-        print("📋 DEBUG: Buscando templates de automação...")
+        logger.debug("Buscando templates de automação...")
         
         templates = [
             {
@@ -693,7 +825,7 @@ def quick_automation():
     }
     """
     try:
-        print("⚡ DEBUG: Automação rápida iniciada...")
+        logger.debug("Automação rápida iniciada...")
         
         data = request.get_json()
         
@@ -718,9 +850,9 @@ def quick_automation():
         # Combinar informações para criar descrição completa
         full_description = f"{business_name} - {business_description} - Localização: {location}"
         
-        print(f"⚡ DEBUG: Template: {template_id}")
-        print(f"⚡ DEBUG: Negócio: {business_name}")
-        print(f"⚡ DEBUG: Descrição completa: {full_description}")
+        logger.debug("Template: %s", template_id)
+        logger.debug("Negócio: %s", business_name)
+        logger.debug("Descrição completa: %s", full_description)
         
         # Chamar automação completa com dados do template
         automation_data = {
@@ -748,7 +880,7 @@ def quick_automation():
         })
         
     except Exception as e:
-        print(f"💥 DEBUG: Erro na automação rápida: {str(e)}")
+        logger.exception("Erro na automação rápida: %s", e)
         return jsonify({
             "success": False,
             "error": f"Erro interno: {str(e)}"
@@ -771,7 +903,7 @@ def save_ad_draft():
     }
     """
     try:
-        print("💾 DEBUG: Salvando rascunho de anúncio...")
+        logger.debug("Salvando rascunho de anúncio...")
         
         data = request.get_json()
         
@@ -810,7 +942,7 @@ def save_ad_draft():
             "status": "draft"
         }
         
-        print(f"💾 DEBUG: Rascunho criado com ID: {draft_id}")
+        logger.debug("Rascunho criado com ID: %s", draft_id)
         
         # Em produção, você salvaria no banco de dados
         # Por enquanto, apenas simular o salvamento
@@ -828,7 +960,7 @@ def save_ad_draft():
         })
         
     except Exception as e:
-        print(f"💥 DEBUG: Erro ao salvar rascunho: {str(e)}")
+        logger.exception("Erro ao salvar rascunho: %s", e)
         return jsonify({
             "success": False,
             "error": f"Erro interno: {str(e)}"
@@ -847,7 +979,7 @@ def publish_ad():
     }
     """
     try:
-        print("🚀 DEBUG: Publicando anúncio...")
+        logger.debug("Publicando anúncio...")
         
         data = request.get_json()
         
@@ -877,9 +1009,7 @@ def publish_ad():
         return publish_ad_internal(data)
         
     except Exception as e:
-        print(f"💥 DEBUG: Erro ao publicar anúncio: {str(e)}")
-        import traceback
-        print(f"💥 DEBUG: Traceback: {traceback.format_exc()}")
+        logger.exception("Erro ao publicar anúncio: %s", e)
         
         return jsonify({
             "success": False,
@@ -895,16 +1025,16 @@ def publish_ad_internal(data):
         page_id = data.get('page_id')
         selected_post = data.get('selected_post')
         
-        print(f"🚀 DEBUG: Iniciando publicação interna...")
-        print(f"📄 DEBUG: Página ID: {page_id}")
-        print(f"📋 DEBUG: Estrutura AI: {ai_structure is not None}")
-        print(f"📝 DEBUG: Post selecionado: {selected_post is not None}")
+        logger.debug("Iniciando publicação interna...")
+        logger.debug("Página ID: %s", page_id)
+        logger.debug("Estrutura AI: %s", ai_structure is not None)
+        logger.debug("Post selecionado: %s", selected_post is not None)
         
         # Verificar se é publicação existente ou nova
         is_existing_post = bool(selected_post and selected_post.get('id'))
         
         if is_existing_post:
-            print("📝 DEBUG: Usando publicação existente")
+            logger.debug("Usando publicação existente")
             # Para publicação existente, usar dados da publicação original
             link_data = {
                 "message": selected_post.get("message", ""),
@@ -914,15 +1044,12 @@ def publish_ad_internal(data):
                 "call_to_action": {"type": "LEARN_MORE"}
             }
         else:
-            print("✨ DEBUG: Criando novo anúncio com IA")
+            logger.debug("Criando novo anúncio com IA")
             # Para novo anúncio, usar dados gerados pela IA
             creative_data = ai_structure.get("creative", {})
             object_story_spec = creative_data.get("object_story_spec", {})
             link_data = object_story_spec.get("link_data", {})
         
-        # ETAPA 1: CRIAR CAMPANHA (CORRIGIDA)
-        print("📈 DEBUG: ETAPA 1 - Criando campanha...")
-        
         campaign_data = ai_structure.get("campaign", {})
         
         # CORREÇÃO CRÍTICA: Remover special_ad_categories se estiver vazio
@@ -936,55 +1063,15 @@ def publish_ad_internal(data):
         special_ad_categories = campaign_data.get("special_ad_categories", [])
         if special_ad_categories and len(special_ad_categories) > 0:
             campaign_create_data["special_ad_categories"] = special_ad_categories
-            print(f"📈 DEBUG: special_ad_categories adicionado: {special_ad_categories}")
-        else:
-            print("📈 DEBUG: special_ad_categories omitido (estava vazio)")
-        
-        print(f"📈 DEBUG: Dados da campanha: {campaign_create_data}")
-        
-        # Criar campanha real
-        if facebook_data_service:
-            campaign_result = facebook_data_service.create_campaign(campaign_create_data)
-            print(f"📈 DEBUG: Resultado da campanha: {campaign_result}")
-            
-            if not campaign_result.get("success"):
-                error_msg = campaign_result.get("error", "Erro desconhecido")
-                print(f"❌ DEBUG: Erro na criação da campanha: {error_msg}")
-                
-                # Diagnóstico específico para erro 400
-                if "400" in str(error_msg):
-                    return jsonify({
-                        "success": False,
-                        "error": "Erro 400: Dados inválidos ou permissões insuficientes",
-                        "details": str(error_msg),
-                        "suggestions": [
-                            "Verifique se o token tem permissões 'ads_management'",
-                            "Confirme se a conta de anúncios está ativa",
-                            "Verifique se há limites de gastos configurados",
-                            "Confirme se a página está vinculada à conta de anúncios"
-                        ]
-                    }), 400
-                
-                return jsonify({
-                    "success": False,
-                    "error": f"Erro na criação da campanha: {error_msg}"
-                }), 500
-            
-            campaign_id = campaign_result.get("id")
-            print(f"✅ DEBUG: Campanha criada com sucesso! ID: {campaign_id}")
+            logger.debug("special_ad_categories adicionado: %s", special_ad_categories)
         else:
-            # Modo simulação
-            campaign_id = f"camp_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            print(f"🎭 DEBUG: Campanha simulada criada! ID: {campaign_id}")
-        
-        # ETAPA 2: CRIAR ADSET
-        print("🎯 DEBUG: ETAPA 2 - Criando AdSet...")
+            logger.debug("special_ad_categories omitido (estava vazio)")
         
         adset_data = ai_structure.get("adset", {})
         
+        # daily_budget da estrutura da IA já vem em centavos e segue para a API sem conversão
         adset_create_data = {
             "name": adset_data.get("name", f"AdSet - {datetime.now().strftime('%d/%m/%Y')}"),
-            "campaign_id": campaign_id,
             "daily_budget": adset_data.get("daily_budget", 5000),  # R$ 50/dia padrão
             "billing_event": "IMPRESSIONS",
             "optimization_goal": "LINK_CLICKS",
@@ -1001,29 +1088,6 @@ def publish_ad_internal(data):
             "status": "PAUSED"
         }
         
-        print(f"🎯 DEBUG: Dados do AdSet: {adset_create_data}")
-        
-        if facebook_data_service:
-            adset_result = facebook_data_service.create_adset(adset_create_data)
-            print(f"🎯 DEBUG: Resultado do AdSet: {adset_result}")
-            
-            if not adset_result.get("success"):
-                error_msg = adset_result.get("error", "Erro desconhecido")
-                print(f"❌ DEBUG: Erro na criação do AdSet: {error_msg}")
-                return jsonify({
-                    "success": False,
-                    "error": f"Erro na criação do AdSet: {error_msg}"
-                }), 500
-            
-            adset_id = adset_result.get("id")
-            print(f"✅ DEBUG: AdSet criado com sucesso! ID: {adset_id}")
-        else:
-            adset_id = f"adset_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            print(f"🎭 DEBUG: AdSet simulado criado! ID: {adset_id}")
-        
-        # ETAPA 3: CRIAR CRIATIVO
-        print("🎨 DEBUG: ETAPA 3 - Criando criativo...")
-        
         creative_create_data = {
             "name": f"Criativo - {datetime.now().strftime('%d/%m/%Y')}",
             "object_story_spec": {
@@ -1038,62 +1102,67 @@ def publish_ad_internal(data):
             }
         }
         
-        print(f"🎨 DEBUG: Dados do criativo: {creative_create_data}")
-        
-        if facebook_data_service:
-            creative_result = facebook_data_service.create_creative(creative_create_data)
-            print(f"🎨 DEBUG: Resultado do criativo: {creative_result}")
-            
-            if not creative_result.get("success"):
-                error_msg = creative_result.get("error", "Erro desconhecido")
-                print(f"❌ DEBUG: Erro na criação do criativo: {error_msg}")
-                return jsonify({
-                    "success": False,
-                    "error": f"Erro na criação do criativo: {error_msg}"
-                }), 500
-            
-            creative_id = creative_result.get("id")
-            print(f"✅ DEBUG: Criativo criado com sucesso! ID: {creative_id}")
-        else:
-            creative_id = f"creative_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            print(f"🎭 DEBUG: Criativo simulado criado! ID: {creative_id}")
-        
-        # ETAPA 4: CRIAR ANÚNCIO
-        print("📢 DEBUG: ETAPA 4 - Criando anúncio...")
-        
         ad_create_data = {
             "name": f"Anúncio - {datetime.now().strftime('%d/%m/%Y')}",
-            "adset_id": adset_id,
-            "creative": {"creative_id": creative_id},
             "status": "PAUSED"
         }
         
-        print(f"📢 DEBUG: Dados do anúncio: {ad_create_data}")
-        
-        if facebook_data_service:
-            ad_result = facebook_data_service.create_ad(ad_create_data)
-            print(f"📢 DEBUG: Resultado do anúncio: {ad_result}")
+        logger.debug("Dados da campanha: %s", campaign_create_data)
+        logger.debug("Dados do AdSet: %s", adset_create_data)
+        logger.debug("Dados do criativo: %s", creative_create_data)
+        
+        facebook_service = _facebook_service()
+        if facebook_service:
+            # Campanha -> AdSet -> criativo -> anúncio em uma única chamada batch, com rollback em falha parcial
+            logger.debug("Criando campanha, AdSet, criativo e anúncio em uma chamada batch...")
+            chain_result = facebook_service.create_ad_chain(
+                campaign_create_data, adset_create_data, creative_create_data, ad_create_data
+            )
+            logger.debug("Resultado da criação: %s", chain_result)
             
-            if not ad_result.get("success"):
-                error_msg = ad_result.get("error", "Erro desconhecido")
-                print(f"❌ DEBUG: Erro na criação do anúncio: {error_msg}")
+            if not chain_result.get("success"):
+                error_msg = chain_result.get("error", "Erro desconhecido")
+                step_names = {"campaign": "campanha", "adset": "AdSet", "creative": "criativo", "ad": "anúncio"}
+                step = step_names.get(chain_result.get("failed_step"), "publicação")
+                logger.warning("Erro na criação do %s: %s", step, error_msg)
+                
+                # Diagnóstico específico para erro 400
+                if "400" in str(error_msg) or chain_result.get("status_code") == 400:
+                    return jsonify({
+                        "success": False,
+                        "error": "Erro 400: Dados inválidos ou permissões insuficientes",
+                        "details": f"Erro na criação do {step}: {error_msg}",
+                        "rolled_back": chain_result.get("rolled_back"),
+                        "suggestions": [
+                            "Verifique se o token tem permissões 'ads_management'",
+                            "Confirme se a conta de anúncios está ativa",
+                            "Verifique se há limites de gastos configurados",
+                            "Confirme se a página está vinculada à conta de anúncios"
+                        ]
+                    }), 400
+                
                 return jsonify({
                     "success": False,
-                    "error": f"Erro na criação do anúncio: {error_msg}"
+                    "error": f"Erro na criação do {step}: {error_msg}",
+                    "rolled_back": chain_result.get("rolled_back")
                 }), 500
             
-            ad_id = ad_result.get("id")
-            print(f"✅ DEBUG: Anúncio criado com sucesso! ID: {ad_id}")
+            campaign_id = chain_result["campaign_id"]
+            adset_id = chain_result["adset_id"]
+            creative_id = chain_result["creative_id"]
+            ad_id = chain_result["ad_id"]
         else:
-            ad_id = f"ad_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            print(f"🎭 DEBUG: Anúncio simulado criado! ID: {ad_id}")
+            # Modo simulação
+            suffix = datetime.now().strftime('%Y%m%d_%H%M%S')
+            campaign_id, adset_id = f"camp_{suffix}", f"adset_{suffix}"
+            creative_id, ad_id = f"creative_{suffix}", f"ad_{suffix}"
+            logger.debug("Anúncio simulado criado! ID: %s", ad_id)
+        
+        ad_account_id = facebook_service.ad_account_id if facebook_service else 'ACCOUNT_ID'
         
         # SUCESSO TOTAL
-        print("🎉 DEBUG: ANÚNCIO CRIADO COM SUCESSO!")
-        print(f"  📈 Campanha ID: {campaign_id}")
-        print(f"  🎯 AdSet ID: {adset_id}")
-        print(f"  🎨 Criativo ID: {creative_id}")
-        print(f"  📢 Anúncio ID: {ad_id}")
+        log_event(logger, logging.INFO, "facebook.ad_published", campaign_id=campaign_id, adset_id=adset_id,
+                  creative_id=creative_id, ad_id=ad_id)
         
         return jsonify({
             "success": True,
@@ -1106,15 +1175,13 @@ def publish_ad_internal(data):
             "status": "PAUSED",
             "note": "Anúncio criado em status pausado para revisão",
             "facebook_links": {
-                "ads_manager": f"https://business.facebook.com/adsmanager/manage/campaigns?act={facebook_data_service.ad_account_id if facebook_data_service else 'ACCOUNT_ID'}&selected_campaign_ids={campaign_id}",
-                "campaign": f"https://business.facebook.com/adsmanager/manage/campaigns?act={facebook_data_service.ad_account_id if facebook_data_service else 'ACCOUNT_ID'}&selected_campaign_ids={campaign_id}"
+                "ads_manager": f"https://business.facebook.com/adsmanager/manage/campaigns?act={ad_account_id}&selected_campaign_ids={campaign_id}",
+                "campaign": f"https://business.facebook.com/adsmanager/manage/campaigns?act={ad_account_id}&selected_campaign_ids={campaign_id}"
             }
         })
         
     except Exception as e:
-        print(f"💥 DEBUG: Erro na publicação interna: {str(e)}")
-        import traceback
-        print(f"💥 DEBUG: Traceback: {traceback.format_exc()}")
+        logger.exception("Erro na publicação interna: %s", e)
         
         return jsonify({
             "success": False,
@@ -1127,7 +1194,7 @@ def check_creation_status():
     Verificar status do sistema de criação de anúncios
     """
     try:
-        print("🔍 DEBUG: Verificando status do sistema...")
+        logger.debug("Verificando status do sistema...")
         
         status = {
             "success": True,
@@ -1,8 +1,11 @@
 from flask import Blueprint, request, jsonify
 from src.models.performance import db, PlatformAccount
 from src.services.api_integrations import APIIntegrationService, create_api_instance
+from src.services.api_client_registry import api_client_registry
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import json
+import os
 
 integrations_bp = Blueprint('integrations', __name__)
 
@@ -63,6 +66,9 @@ def connect_platform():
         
         db.session.commit()
         
+        # Token novo: o cliente antigo da conta não pode mais ser reaproveitado
+        api_client_registry.invalidate(account.id)
+        
         return jsonify({
             'success': True,
             'account': account.to_dict()
@@ -79,6 +85,7 @@ def disconnect_platform(account_id):
         account = PlatformAccount.query.get_or_404(account_id)
         account.is_active = False
         db.session.commit()
+        api_client_registry.invalidate(account.id)
         
         return jsonify({
             'success': True,
@@ -111,14 +118,9 @@ def sync_campaign_to_platform():
         if not platform_account:
             return jsonify({'success': False, 'error': f'Conta da plataforma {platform} não encontrada'}), 404
         
-        # Criar instância da API
-        credentials = {
-            'access_token': platform_account.access_token,
-            'account_id': platform_account.account_id,
-            'developer_token': data.get('developer_token')  # Para Google Ads
-        }
-        
-        api_instance = create_api_instance(platform, credentials)
+        # Cliente da conta (reaproveitado pelo registro de clientes)
+        api_instance = api_client_registry.for_account(platform_account,
+                                                       developer_token=data.get('developer_token'))  # Para Google Ads
         if not api_instance:
             return jsonify({'success': False, 'error': f'Plataforma {platform} não suportada'}), 400
         
@@ -171,14 +173,9 @@ def sync_performance_data():
         
         for account in platform_accounts:
             try:
-                # Criar instância da API
-                credentials = {
-                    'access_token': account.access_token,
-                    'account_id': account.account_id,
-                    'developer_token': data.get('developer_token')  # Para Google Ads
-                }
-                
-                api_instance = create_api_instance(account.platform, credentials)
+                # Cliente da conta (reaproveitado pelo registro de clientes)
+                api_instance = api_client_registry.for_account(account,
+                                                               developer_token=data.get('developer_token'))  # Para Google Ads
                 if not api_instance:
                     continue
                 
@@ -231,9 +228,26 @@ def sync_performance_data():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# Alteração na plataforma e status local resultante de cada ação em lote
+BULK_ACTION_UPDATES = {
+    'pause': ({'status': 'PAUSED'}, 'paused'),
+    'resume': ({'status': 'ACTIVE'}, 'active'),
+}
+
+# Contas processadas em paralelo nas ações em lote
+_bulk_action_executor = ThreadPoolExecutor(max_workers=int(os.getenv("BULK_ACTION_WORKERS", "4")),
+                                           thread_name_prefix="bulk-actions")
+
+def _run_platform_bulk_action(api_instance, updates):
+    """Enviar as alterações de uma conta (em batches) e retornar o resultado por campanha, na mesma ordem"""
+    if hasattr(api_instance, 'batch_update_campaigns'):
+        return api_instance.batch_update_campaigns(updates)
+    return [api_instance.update_campaign(platform_campaign_id, campaign_updates)
+            for platform_campaign_id, campaign_updates in updates]
+
 @integrations_bp.route('/integrations/bulk-actions', methods=['POST'])
 def execute_bulk_actions():
-    """Executar ações em lote nas plataformas"""
+    """Executar ações em lote nas plataformas (um batch por conta, contas em paralelo)"""
     try:
         data = request.get_json()
         action = data.get('action')  # 'pause', 'resume', 'update_budget'
@@ -242,9 +256,13 @@ def execute_bulk_actions():
         
         if not action or not campaign_ids:
             return jsonify({'success': False, 'error': 'action e campaign_ids são obrigatórios'}), 400
+        if action not in BULK_ACTION_UPDATES and action != 'update_budget':
+            return jsonify({'success': False, 'error': f'Ação não suportada: {action}'}), 400
+        if action == 'update_budget' and data.get('new_budget') is None:
+            return jsonify({'success': False, 'error': 'new_budget é obrigatório para update_budget'}), 400
         
         # Buscar campanhas
-        from src.models.campaign import Campaign
+        from src.models.campaign import Campaign, db as campaign_db
         campaigns = Campaign.query.filter(
             Campaign.id.in_(campaign_ids),
             Campaign.user_id == user_id
@@ -258,6 +276,7 @@ def execute_bulk_actions():
             campaigns_by_platform[campaign.platform].append(campaign)
         
         results = []
+        pending = []  # (future, campanhas enviadas)
         
         for platform, platform_campaigns in campaigns_by_platform.items():
             # Buscar credenciais da plataforma
@@ -276,14 +295,8 @@ def execute_bulk_actions():
                     })
                 continue
             
-            # Criar instância da API
-            credentials = {
-                'access_token': platform_account.access_token,
-                'account_id': platform_account.account_id,
-                'developer_token': data.get('developer_token')
-            }
-            
-            api_instance = create_api_instance(platform, credentials)
+            # Cliente da conta (reaproveitado pelo registro de clientes)
+            api_instance = api_client_registry.for_account(platform_account, developer_token=data.get('developer_token'))
             if not api_instance:
                 for campaign in platform_campaigns:
                     results.append({
@@ -293,7 +306,8 @@ def execute_bulk_actions():
                     })
                 continue
             
-            # Executar ação para cada campanha
+            synced_campaigns = []
+            updates = []
             for campaign in platform_campaigns:
                 if not campaign.platform_campaign_id:
                     results.append({
@@ -303,38 +317,42 @@ def execute_bulk_actions():
                     })
                     continue
                 
-                try:
-                    if action == 'pause':
-                        success = api_instance.pause_campaign(campaign.platform_campaign_id)
-                        if success:
-                            campaign.status = 'paused'
-                    elif action == 'resume':
-                        success = api_instance.resume_campaign(campaign.platform_campaign_id)
-                        if success:
-                            campaign.status = 'active'
-                    elif action == 'update_budget':
-                        budget_data = {'budget': data.get('new_budget')}
-                        result = api_instance.update_campaign(campaign.platform_campaign_id, budget_data)
-                        success = result.get('success', False)
-                        if success:
-                            campaign.budget = data.get('new_budget')
-                    else:
-                        success = False
-                    
-                    results.append({
-                        'campaign_id': campaign.id,
-                        'success': success
-                    })
-                    
-                except Exception as e:
-                    results.append({
-                        'campaign_id': campaign.id,
-                        'success': False,
-                        'error': str(e)
-                    })
+                if action == 'update_budget':
+                    campaign_updates = {'budget': data.get('new_budget'), 'budget_type': campaign.budget_type}
+                else:
+                    campaign_updates = BULK_ACTION_UPDATES[action][0]
+                synced_campaigns.append(campaign)
+                updates.append((campaign.platform_campaign_id, campaign_updates))
+            
+            if updates:
+                # As chamadas à API rodam fora da thread da requisição; o banco só é tocado aqui
+                pending.append((_bulk_action_executor.submit(_run_platform_bulk_action, api_instance, updates),
+                                synced_campaigns))
         
-        # Salvar alterações no banco
-        db.session.commit()
+        succeeded_ids = []
+        for future, synced_campaigns in pending:
+            try:
+                platform_results = future.result()
+            except Exception as e:
+                platform_results = [{'success': False, 'error': str(e)} for _ in synced_campaigns]
+            
+            for campaign, result in zip(synced_campaigns, platform_results):
+                entry = {'campaign_id': campaign.id, 'success': bool(result.get('success'))}
+                if result.get('error'):
+                    entry['error'] = result['error']
+                results.append(entry)
+                if entry['success']:
+                    succeeded_ids.append(campaign.id)
+        
+        # Salvar alterações no banco com um único UPDATE para todas as campanhas alteradas
+        if succeeded_ids:
+            if action == 'update_budget':
+                values = {Campaign.budget: data.get('new_budget')}
+            else:
+                values = {Campaign.status: BULK_ACTION_UPDATES[action][1]}
+            values[Campaign.updated_at] = datetime.utcnow()
+            Campaign.query.filter(Campaign.id.in_(succeeded_ids)).update(values, synchronize_session=False)
+            campaign_db.session.commit()
         
         return jsonify({
             'success': True,
@@ -0,0 +1,12 @@
+from flask import Blueprint, Response, jsonify
+from src.services.app_metrics import CONTENT_TYPE_LATEST, render_metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Métricas de latência (Graph API, LLM, rotas e banco) no formato de exposição do Prometheus"""
+    output = render_metrics()
+    if output is None:
+        return jsonify({'success': False, 'error': 'Métricas desabilitadas (prometheus_client não instalado ou METRICS_ENABLED=false)'}), 503
+    return Response(output, content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,141 @@
+"""
+Índice local SHA-256 -> image_hash das imagens já enviadas para a biblioteca de cada conta de anúncios.
+
+O Facebook devolve o mesmo image_hash para o mesmo conteúdo, então reenviar um arquivo idêntico só gasta banda
+e limite de uso. O índice fica em SQLite (WAL), compartilhado entre workers e preservado entre reinícios; o
+arquivo é lido em blocos tanto para o hash quanto para o envio multipart, sem carregá-lo inteiro na memória.
+"""
+
+import hashlib
+import mimetypes
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterator, Optional
+
+from src.services.local_store import local_db_path, open_local_db
+from src.services.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+AD_IMAGE_INDEX_DB = os.getenv("AD_IMAGE_INDEX_DB", local_db_path("ad_images.db"))
+
+# Tamanho dos blocos lidos do disco para o hash e para o envio (bytes)
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 do arquivo, lido em blocos"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as image_file:
+        for chunk in iter(lambda: image_file.read(UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def guess_content_type(filename: str) -> str:
+    """Content-Type pela extensão do arquivo (application/octet-stream quando desconhecida)"""
+    return mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+
+class MultipartFileStream:
+    """
+    Corpo multipart/form-data gerado sob demanda a partir do arquivo em disco
+    
+    Com __len__ o requests envia Content-Length em vez de chunked, e com __iter__ o corpo é transmitido
+    em blocos. O arquivo só é aberto durante o envio e é sempre fechado ao final.
+    """
+    
+    def __init__(self, fields: Dict[str, str], file_field: str, path: str, filename: str, content_type: str):
+        self.boundary = uuid.uuid4().hex
+        self.path = path
+        self._head = b"".join(self._field_part(name, value) for name, value in fields.items())
+        self._head += (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode()
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode()
+    
+    def _field_part(self, name: str, value: str) -> bytes:
+        return (
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
+        ).encode()
+    
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+    
+    def __len__(self) -> int:
+        return len(self._head) + os.path.getsize(self.path) + len(self._tail)
+    
+    def __iter__(self) -> Iterator[bytes]:
+        yield self._head
+        with open(self.path, "rb") as image_file:
+            for chunk in iter(lambda: image_file.read(UPLOAD_CHUNK_SIZE), b""):
+                yield chunk
+        yield self._tail
+
+
+class AdImageIndex:
+    """Mapeamento (conta, SHA-256 do conteúdo) -> image_hash persistido em SQLite"""
+    
+    def __init__(self, db_path: str = AD_IMAGE_INDEX_DB):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+    
+    def _db(self) -> sqlite3.Connection:
+        # Conexões SQLite não sobrevivem a fork: reabrir quando o worker mudar
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = open_local_db(self.db_path)
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS ad_images (
+                    account_id TEXT NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    image_hash TEXT NOT NULL,
+                    image_url TEXT,
+                    uploaded_at REAL NOT NULL,
+                    PRIMARY KEY (account_id, sha256)
+                )
+            """)
+            self._pid = os.getpid()
+        return self._connection
+    
+    def lookup(self, account_id: str, sha256: str) -> Optional[Dict[str, Any]]:
+        """Imagem já enviada para a conta com esse conteúdo, ou None"""
+        try:
+            with self._lock:
+                row = self._db().execute(
+                    "SELECT image_hash, image_url FROM ad_images WHERE account_id = ? AND sha256 = ?",
+                    (account_id, sha256)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Erro ao consultar índice de imagens enviadas: %s", e)
+            return None
+        return {"image_hash": row[0], "image_url": row[1]} if row else None
+    
+    def store(self, account_id: str, sha256: str, image_hash: str, image_url: str = None):
+        try:
+            with self._lock:
+                self._db().execute("""
+                    INSERT OR REPLACE INTO ad_images (account_id, sha256, image_hash, image_url, uploaded_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (account_id, sha256, image_hash, image_url, time.time()))
+        except sqlite3.Error as e:
+            logger.warning("Erro ao registrar imagem enviada no índice: %s", e)
+    
+    def forget(self, account_id: str, image_hash: str):
+        """Remover um image_hash do índice (por exemplo, após a imagem ser apagada da biblioteca)"""
+        try:
+            with self._lock:
+                self._db().execute("DELETE FROM ad_images WHERE account_id = ? AND image_hash = ?",
+                                   (account_id, image_hash))
+        except sqlite3.Error as e:
+            logger.warning("Erro ao remover imagem do índice: %s", e)
+
+
+ad_image_index = AdImageIndex()
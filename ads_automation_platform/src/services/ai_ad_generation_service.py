@@ -8,6 +8,11 @@ import json
 import os
 from datetime import datetime
 import re
+import logging
+from src.services.app_metrics import llm_call
+from src.services.structured_logging import get_logger, log_event
+
+logger = get_logger(__name__)
 
 class AIAdGenerationServiceMelhorado:
     def __init__(self):
@@ -130,26 +135,26 @@ class AIAdGenerationServiceMelhorado:
         Gerar análise estruturada do produto via IA
         """
         try:
-            print("🧠 DEBUG: Iniciando análise estruturada...")
-            
-            response = openai.ChatCompletion.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Você é um especialista em marketing digital. Sempre retorne apenas JSON válido, sem texto adicional."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=1500,
-                temperature=0.7
-            )
+            with llm_call("openai", self.model, "structured_analysis") as call:
+                response = openai.ChatCompletion.create(
+                    model=self.model,
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "Você é um especialista em marketing digital. Sempre retorne apenas JSON válido, sem texto adicional."
+                        },
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    max_tokens=1500,
+                    temperature=0.7
+                )
+                call["usage"] = response.get("usage")
             
             content = response.choices[0].message.content.strip()
-            print(f"🧠 DEBUG: Resposta da IA recebida: {content[:200]}...")
+            log_event(logger, logging.DEBUG, "ai.analysis_response", model=self.model, chars=len(content))
             
             # Tentar extrair JSON da resposta
             try:
@@ -161,7 +166,6 @@ class AIAdGenerationServiceMelhorado:
                     json_content = content[json_start:json_end]
                     analysis = json.loads(json_content)
                     
-                    print("✅ DEBUG: Análise estruturada gerada com sucesso")
                     return {
                         "success": True,
                         "analysis": analysis
@@ -170,14 +174,14 @@ class AIAdGenerationServiceMelhorado:
                     raise ValueError("JSON não encontrado na resposta")
                     
             except json.JSONDecodeError as e:
-                print(f"❌ DEBUG: Erro ao decodificar JSON: {e}")
-                print(f"❌ DEBUG: Conteúdo recebido: {content}")
+                log_event(logger, logging.WARNING, "ai.analysis_invalid_json", model=self.model, error=str(e),
+                          chars=len(content))
                 
                 # Fallback: criar análise básica
                 return self._create_fallback_analysis()
         
         except Exception as e:
-            print(f"💥 DEBUG: Erro na análise estruturada: {str(e)}")
+            logger.warning("Erro na análise estruturada: %s", e)
             return {
                 "success": False,
                 "error": f"Erro na análise: {str(e)}"
@@ -188,8 +192,6 @@ class AIAdGenerationServiceMelhorado:
         Gerar uma opção específica de anúncio
         """
         try:
-            print(f"🎨 DEBUG: Gerando opção de anúncio: {option_data.get('option_type', 'N/A')}")
-            
             # Preparar prompt personalizado
             description = option_data.get('product_description', '')
             analysis = option_data.get('product_analysis', {})
@@ -206,24 +208,27 @@ class AIAdGenerationServiceMelhorado:
                 budget_centavos=option_data.get('budget_daily', 5000)
             )
             
-            response = openai.ChatCompletion.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Você é um especialista em Facebook Ads. Sempre retorne apenas JSON válido, sem texto adicional."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=2000,
-                temperature=0.8  # Mais criatividade para diferentes opções
-            )
+            with llm_call("openai", self.model, "generate_ad_option") as call:
+                response = openai.ChatCompletion.create(
+                    model=self.model,
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "Você é um especialista em Facebook Ads. Sempre retorne apenas JSON válido, sem texto adicional."
+                        },
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    max_tokens=2000,
+                    temperature=0.8  # Mais criatividade para diferentes opções
+                )
+                call["usage"] = response.get("usage")
             
             content = response.choices[0].message.content.strip()
-            print(f"🎨 DEBUG: Resposta da IA recebida: {content[:200]}...")
+            log_event(logger, logging.DEBUG, "ai.ad_option_response", model=self.model, strategy=strategy_type,
+                      chars=len(content))
             
             # Extrair JSON da resposta
             try:
@@ -237,7 +242,6 @@ class AIAdGenerationServiceMelhorado:
                     # Validar e ajustar estrutura se necessário
                     ad_structure = self._validate_and_fix_structure(ad_structure, option_data)
                     
-                    print("✅ DEBUG: Opção de anúncio gerada com sucesso")
                     return {
                         "success": True,
                         "ad_structure": ad_structure
@@ -246,13 +250,14 @@ class AIAdGenerationServiceMelhorado:
                     raise ValueError("JSON não encontrado na resposta")
                     
             except json.JSONDecodeError as e:
-                print(f"❌ DEBUG: Erro ao decodificar JSON: {e}")
+                log_event(logger, logging.WARNING, "ai.ad_option_invalid_json", model=self.model, strategy=strategy_type,
+                          error=str(e), chars=len(content))
                 
                 # Fallback: criar estrutura básica
                 return self._create_fallback_ad_structure(option_data)
         
         except Exception as e:
-            print(f"💥 DEBUG: Erro na geração da opção: {str(e)}")
+            logger.warning("Erro na geração da opção de anúncio: %s", e)
             return {
                 "success": False,
                 "error": f"Erro na geração: {str(e)}"
@@ -263,8 +268,6 @@ class AIAdGenerationServiceMelhorado:
         Gerar múltiplas opções de anúncio com diferentes estratégias
         """
         try:
-            print(f"🎯 DEBUG: Gerando {num_options} opções de anúncio...")
-            
             strategies = [
                 {"type": "conservador", "budget_multiplier": 0.7, "targeting": "narrow"},
                 {"type": "equilibrado", "budget_multiplier": 1.0, "targeting": "balanced"},
@@ -274,8 +277,6 @@ class AIAdGenerationServiceMelhorado:
             options = []
             
             for i, strategy in enumerate(strategies[:num_options]):
-                print(f"🎯 DEBUG: Gerando opção {i+1}: {strategy['type']}")
-                
                 # Ajustar dados para esta estratégia
                 option_data = base_data.copy()
                 option_data['option_type'] = strategy['type']
@@ -295,9 +296,9 @@ class AIAdGenerationServiceMelhorado:
                             "targeting_strategy": strategy['targeting']
                         }
                     })
-                    print(f"✅ DEBUG: Opção {i+1} gerada com sucesso")
                 else:
-                    print(f"❌ DEBUG: Falha ao gerar opção {i+1}: {result.get('error')}")
+                    log_event(logger, logging.WARNING, "ai.ad_option_failed", option=i + 1, strategy=strategy['type'],
+                              error=result.get('error'))
             
             return {
                 "success": True,
@@ -306,7 +307,7 @@ class AIAdGenerationServiceMelhorado:
             }
         
         except Exception as e:
-            print(f"💥 DEBUG: Erro na geração múltipla: {str(e)}")
+            logger.warning("Erro na geração múltipla de anúncios: %s", e)
             return {
                 "success": False,
                 "error": f"Erro na geração múltipla: {str(e)}"
@@ -388,7 +389,7 @@ class AIAdGenerationServiceMelhorado:
             return structure
         
         except Exception as e:
-            print(f"⚠️ DEBUG: Erro na validação: {str(e)}")
+            logger.warning("Erro na validação da estrutura do anúncio: %s", e)
             return structure
     
     def _create_fallback_analysis(self):
@@ -487,8 +488,7 @@ class AIAdGenerationServiceMelhorado:
 # Instância global do serviço melhorado
 try:
     ai_ad_service_melhorado = AIAdGenerationServiceMelhorado()
-    print("✅ AIAdGenerationServiceMelhorado inicializado com sucesso")
 except Exception as e:
-    print(f"❌ Erro ao inicializar AIAdGenerationServiceMelhorado: {e}")
+    logger.warning("AIAdGenerationServiceMelhorado indisponível: %s", e)
     ai_ad_service_melhorado = None
 
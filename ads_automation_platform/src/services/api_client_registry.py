@@ -0,0 +1,119 @@
+"""
+Registro de clientes de API por conta de plataforma (PlatformAccount).
+
+Cada conta conectada ganha um cliente criado uma única vez e reaproveitado entre requisições e ações de
+automação; todos compartilham o pool de conexões do transporte da Graph API. Os clientes são mantidos em LRU
+com limite de tamanho, descartados após ficarem ociosos e recriados quando o token da conta muda.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from src.services.graph_cache import token_identity
+
+# Máximo de clientes mantidos no processo; acima disso o menos usado é descartado
+API_CLIENT_REGISTRY_SIZE = int(os.getenv("API_CLIENT_REGISTRY_SIZE", "256"))
+# Tempo sem uso após o qual um cliente é descartado (s)
+API_CLIENT_IDLE_TTL = float(os.getenv("API_CLIENT_IDLE_TTL", str(30 * 60)))
+
+# Nomes de plataforma aceitos para contas do Facebook
+FACEBOOK_PLATFORMS = {"facebook", "facebook_ads"}
+
+
+def _facebook_ads_api(credentials: Dict[str, Any]):
+    from src.services.api_integrations import FacebookAdsAPI
+    return FacebookAdsAPI(credentials["access_token"], credentials["account_id"])
+
+
+def _facebook_data_service(credentials: Dict[str, Any]):
+    from src.services.facebook_data_service import FacebookDataService
+    return FacebookDataService(credentials["access_token"], credentials["account_id"])
+
+
+# (plataforma, tipo de cliente) -> fábrica(credentials)
+CLIENT_FACTORIES: Dict[tuple, Callable[[Dict[str, Any]], Any]] = {}
+for _platform in FACEBOOK_PLATFORMS:
+    CLIENT_FACTORIES[(_platform, "api")] = _facebook_ads_api
+    CLIENT_FACTORIES[(_platform, "data")] = _facebook_data_service
+
+
+def credentials_fingerprint(credentials: Dict[str, Any]) -> str:
+    """Identidade das credenciais (o token em si não fica guardado na chave)"""
+    return f"{credentials.get('account_id')}:{token_identity(credentials.get('access_token') or '')}"
+
+
+class ApiClientRegistry:
+    """Clientes por (conta, tipo), em LRU com descarte por ociosidade e troca de token"""
+    
+    def __init__(self, max_clients: int = API_CLIENT_REGISTRY_SIZE, idle_ttl: float = API_CLIENT_IDLE_TTL):
+        self.max_clients = max_clients
+        self.idle_ttl = idle_ttl
+        self._clients: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, account_key: Any, platform: str, credentials: Dict[str, Any], kind: str = "api") -> Optional[Any]:
+        """
+        Cliente da conta, reaproveitado enquanto as credenciais forem as mesmas
+        
+        Args:
+            account_key: identificador da conta (id do PlatformAccount)
+            platform: plataforma da conta ('facebook_ads', ...)
+            credentials: {"access_token", "account_id", ...}
+            kind: 'api' (FacebookAdsAPI) ou 'data' (FacebookDataService)
+        
+        Returns:
+            Cliente pronto para uso, ou None se a plataforma não for suportada
+        """
+        factory = CLIENT_FACTORIES.get((platform, kind))
+        if factory is None or not credentials.get("access_token") or not credentials.get("account_id"):
+            return None
+        
+        key = (account_key, kind)
+        fingerprint = credentials_fingerprint(credentials)
+        now = time.monotonic()
+        
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None and entry["fingerprint"] == fingerprint and now - entry["last_used"] < self.idle_ttl:
+                entry["last_used"] = now
+                self._clients.move_to_end(key)
+                return entry["client"]
+        
+        client = factory(credentials)
+        
+        with self._lock:
+            self._clients[key] = {"client": client, "fingerprint": fingerprint, "last_used": now}
+            self._clients.move_to_end(key)
+            self._evict(now)
+        return client
+    
+    def for_account(self, platform_account: Any, kind: str = "api", developer_token: str = None) -> Optional[Any]:
+        """Cliente de um PlatformAccount (chaveado pelo id da conta)"""
+        credentials = {
+            "access_token": platform_account.access_token,
+            "account_id": platform_account.account_id,
+            "developer_token": developer_token
+        }
+        return self.get(platform_account.id, platform_account.platform, credentials, kind)
+    
+    def invalidate(self, account_key: Any):
+        """Descartar os clientes de uma conta (token trocado ou conta desconectada)"""
+        with self._lock:
+            for key in [key for key in self._clients if key[0] == account_key]:
+                del self._clients[key]
+    
+    def _evict(self, now: float):
+        for key in [key for key, entry in self._clients.items() if now - entry["last_used"] >= self.idle_ttl]:
+            del self._clients[key]
+        while len(self._clients) > self.max_clients:
+            self._clients.popitem(last=False)
+    
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"clients": len(self._clients), "max_clients": self.max_clients}
+
+
+api_client_registry = ApiClientRegistry()
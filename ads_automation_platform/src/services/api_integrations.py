@@ -1,12 +1,29 @@
 import requests
 import os
 import json
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+from src.services.graph_cache import response_cache
+from src.services.graph_http import GRAPH_BASE_URL, get_graph_transport
+from src.services.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Limite de sub-requisições por chamada batch da Graph API
+GRAPH_BATCH_LIMIT = 50
+
+# Métricas padrão solicitadas nas consultas de insights
+INSIGHTS_METRIC_FIELDS = [
+    'impressions', 'clicks', 'spend', 'ctr', 'cpc', 'cpm',
+    'reach', 'frequency', 'conversions', 'cost_per_conversion'
+]
 
 class FacebookAdsAPI:
     def __init__(self, access_token: str, ad_account_id: str):
         self.access_token = access_token
         self.ad_account_id = ad_account_id
-        self.base_url = "https://graph.facebook.com/v23.0" # Versão da API fornecida pelo usuário
+        self.base_url = GRAPH_BASE_URL # Versão da API fornecida pelo usuário
+        self.http = get_graph_transport() # Pool de conexões compartilhado (keep-alive)
 
     def _make_request(self, method: str, endpoint: str, data: dict = None):
         url = f"{self.base_url}/{endpoint}"
@@ -21,24 +38,28 @@ class FacebookAdsAPI:
             headers['Content-Type'] = 'application/json'
 
         params = {"access_token": self.access_token}
+        usage_key = f"act_{self.ad_account_id}"
+        response = None
 
         try:
             if method.upper() == "POST":
                 if files:
-                    response = requests.post(url, params=params, data=data, files=files)
+                    response = self.http.post(url, params=params, data=data, files=files, usage_key=usage_key)
                 else:
-                    response = requests.post(url, params=params, json=data, headers=headers)
+                    response = self.http.post(url, params=params, json=data, headers=headers, usage_key=usage_key)
             elif method.upper() == "GET":
-                response = requests.get(url, params=params, headers=headers)
+                response = self.http.get(url, params=params, headers=headers, usage_key=usage_key)
             else:
                 raise ValueError("Método HTTP não suportado")
 
             response.raise_for_status() # Levanta um erro para códigos de status HTTP ruins (4xx ou 5xx)
+            if method.upper() == "POST":
+                response_cache.invalidate_token(self.access_token) # Escritas tornam as leituras em cache obsoletas
             return response.json()
         except requests.exceptions.RequestException as e:
-            print(f"Erro na requisição à Facebook API: {e}")
+            logger.warning("Erro na requisição à Facebook API (%s %s): %s", method, endpoint, e)
             if response:
-                print(f"Resposta da API: {response.text}")
+                logger.debug("Resposta da API: %s", response.text)
             return {"error": str(e), "api_response": response.text if response else None}
 
     def create_campaign(self, name: str, objective: str, status: str = "PAUSED"):
@@ -84,10 +105,115 @@ class FacebookAdsAPI:
             "status": status,
         }
         return self._make_request("POST", endpoint, data=data)
+
+    @staticmethod
+    def _campaign_update_params(updates: dict) -> dict:
+        """Converte alterações locais ({'status', 'name', 'budget', 'budget_type'}) nos campos da Graph API."""
+        params = {}
+        if updates.get('status'):
+            params['status'] = updates['status']
+        if updates.get('name'):
+            params['name'] = updates['name']
+        if updates.get('budget') is not None:
+            budget_field = 'lifetime_budget' if updates.get('budget_type') == 'total' else 'daily_budget'
+            params[budget_field] = int(round(float(updates['budget']) * 100)) # Em centavos
+        return params
+
+    def update_campaign(self, campaign_id: str, updates: dict):
+        """Atualiza status, nome e/ou orçamento de uma campanha. Retorna {'success': bool, ...}."""
+        result = self._make_request("POST", campaign_id, data=self._campaign_update_params(updates))
+        if "error" in result:
+            return {"success": False, "error": result["error"]}
+        return {"success": bool(result.get("success", True))}
+
+    def pause_campaign(self, campaign_id: str):
+        """Pausa uma campanha. Retorna True em caso de sucesso."""
+        return self.update_campaign(campaign_id, {'status': 'PAUSED'})['success']
+
+    def resume_campaign(self, campaign_id: str):
+        """Reativa uma campanha pausada. Retorna True em caso de sucesso."""
+        return self.update_campaign(campaign_id, {'status': 'ACTIVE'})['success']
+
+    def batch_update_campaigns(self, updates: list):
+        """
+        Aplica alterações em várias campanhas via Graph API batch (até 50 por chamada).
+
+        updates: lista de (campaign_id, {'status'|'name'|'budget'|'budget_type': ...}).
+        Retorna uma lista na mesma ordem com {'success': bool, 'error': ...} por campanha.
+        """
+        results = []
+        url = self.base_url
+        usage_key = f"act_{self.ad_account_id}"
+
+        for start in range(0, len(updates), GRAPH_BATCH_LIMIT):
+            chunk = updates[start:start + GRAPH_BATCH_LIMIT]
+            batch = [
+                {
+                    "method": "POST",
+                    "relative_url": campaign_id,
+                    "body": urlencode(self._campaign_update_params(campaign_updates))
+                }
+                for campaign_id, campaign_updates in chunk
+            ]
+
+            try:
+                response = self.http.post(url, params={"access_token": self.access_token},
+                                          data={"batch": json.dumps(batch), "include_headers": "false"},
+                                          usage_key=usage_key)
+                response.raise_for_status()
+                items = response.json()
+            except (requests.exceptions.RequestException, ValueError) as e:
+                logger.warning("Erro na chamada batch à Facebook API", exc_info=True)
+                results.extend({"success": False, "error": str(e)} for _ in chunk)
+                continue
+
+            for index in range(len(chunk)):
+                item = items[index] if isinstance(items, list) and index < len(items) else None
+                results.append(self._parse_batch_result(item))
+
+        if updates:
+            response_cache.invalidate_token(self.access_token) # Escritas tornam as leituras em cache obsoletas
+        return results
+
+    @staticmethod
+    def _parse_batch_result(item):
+        """Converte uma sub-resposta do batch em {'success': bool, 'error': ...}."""
+        if not item:
+            return {"success": False, "error": "Sub-requisição não executada no batch"}
+        try:
+            body = json.loads(item.get("body") or "{}")
+        except ValueError:
+            body = {}
+        if item.get("code", 0) >= 400 or "error" in body:
+            error = body.get("error") or {}
+            return {"success": False, "error": error.get("message", f"Erro HTTP {item.get('code')}")}
+        return {"success": bool(body.get("success", True))}
         # ===== ADICIONE ESTAS FUNÇÕES AQUI DENTRO DA CLASSE =====
     
-    def get_campaigns(self, fields=None, limit=25):
-        """Busca todas as campanhas da conta de anúncios."""
+    def _get_paginated(self, endpoint: str, params: dict):
+        """Busca todas as páginas de um edge seguindo o cursor 'after' e retorna {'data': [...]}."""
+        rows = []
+        page_params = {**params, 'access_token': self.access_token}
+        url = f"{self.base_url}/{endpoint}"
+        
+        try:
+            while True:
+                response = self.http.get(url, params=page_params, usage_key=f"act_{self.ad_account_id}")
+                response.raise_for_status()
+                page = response.json()
+                rows.extend(page.get('data', []))
+                
+                paging = page.get('paging') or {}
+                after = (paging.get('cursors') or {}).get('after')
+                if not paging.get('next') or not after:
+                    return {'data': rows}
+                page_params = {**page_params, 'after': after}
+        except requests.exceptions.RequestException as e:
+            logger.warning("Erro ao buscar %s: %s", endpoint, e)
+            return {"error": str(e)}
+
+    def get_campaigns(self, fields=None, limit=100):
+        """Busca todas as campanhas da conta de anúncios (limit = tamanho de cada página)."""
         if fields is None:
             fields = ['id', 'name', 'status', 'objective', 'created_time', 'updated_time']
         
@@ -96,124 +222,146 @@ class FacebookAdsAPI:
             'fields': ','.join(fields),
             'limit': limit
         }
+        return self._get_paginated(endpoint, params)
+
+    @staticmethod
+    def _time_range_param(date_range=None):
+        """Intervalo de datas como JSON; padrão: últimos 30 dias."""
+        if date_range:
+            return json.dumps(date_range)
         
-        try:
-            url = f"{self.base_url}/{endpoint}"
-            response = requests.get(url, params={**params, 'access_token': self.access_token})
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Erro ao buscar campanhas: {e}")
-            return {"error": str(e)}
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=30)
+        return json.dumps({
+            'since': start_date.strftime('%Y-%m-%d'),
+            'until': end_date.strftime('%Y-%m-%d')
+        })
+
+    def get_insights(self, level='campaign', date_range=None, fields=None, limit=500):
+        """
+        Busca métricas de todos os objetos de um nível (campaign, adset ou ad) em uma única consulta
+        paginada em act_X/insights, em vez de uma chamada por objeto.
+        """
+        if fields is None:
+            fields = INSIGHTS_METRIC_FIELDS
+        
+        endpoint = f"act_{self.ad_account_id}/insights"
+        params = {
+            'fields': ','.join([f'{level}_id', f'{level}_name', *fields]),
+            'level': level,
+            'time_range': self._time_range_param(date_range),
+            'limit': limit
+        }
+        return self._get_paginated(endpoint, params)
 
     def get_campaign_insights(self, campaign_id=None, date_range=None, fields=None):
-        """Busca métricas/insights das campanhas."""
+        """Busca métricas/insights de uma campanha ou, sem campaign_id, de todas as campanhas da conta."""
         if fields is None:
-            fields = [
-                'impressions', 'clicks', 'spend', 'ctr', 'cpc', 'cpm',
-                'reach', 'frequency', 'conversions', 'cost_per_conversion'
-            ]
+            fields = INSIGHTS_METRIC_FIELDS
         
-        # Se não especificar campanha, busca de todas as campanhas da conta
-        if campaign_id:
-            endpoint = f"{campaign_id}/insights"
-        else:
-            endpoint = f"act_{self.ad_account_id}/insights"
+        # Sem campanha específica: uma consulta paginada no nível de campanha
+        if not campaign_id:
+            return self.get_insights(level='campaign', date_range=date_range, fields=fields)
         
+        endpoint = f"{campaign_id}/insights"
         params = {
             'fields': ','.join(fields),
-            'level': 'campaign'
+            'level': 'campaign',
+            'time_range': self._time_range_param(date_range)
         }
         
-        # Adicionar filtro de data se especificado
-        if date_range:
-            params['time_range'] = json.dumps(date_range)
-        else:
-            # Padrão: últimos 30 dias
-            from datetime import datetime, timedelta
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=30)
-            params['time_range'] = json.dumps({
-                'since': start_date.strftime('%Y-%m-%d'),
-                'until': end_date.strftime('%Y-%m-%d')
-            })
-        
         try:
             url = f"{self.base_url}/{endpoint}"
-            response = requests.get(url, params={**params, 'access_token': self.access_token})
+            response = self.http.get(url, params={**params, 'access_token': self.access_token},
+                                     usage_key=f"act_{self.ad_account_id}")
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
-            print(f"Erro ao buscar insights: {e}")
+            logger.warning("Erro ao buscar insights: %s", e)
             return {"error": str(e)}
 
-    def get_campaigns_with_metrics(self, date_range=None, status_filter=None):
-        """Busca campanhas com suas métricas combinadas."""
-        # Definir filtros de status - CORREÇÃO PRINCIPAL
-        if status_filter is None:
-            # INCLUIR TODOS OS STATUS, NÃO APENAS ACTIVE
-            status_filter = ['ACTIVE', 'PAUSED', 'ARCHIVED']
-        
-        # Buscar campanhas
-        campaigns_response = self.get_campaigns(
-            fields=['id', 'name', 'status', 'objective', 'created_time'],
-            limit=100
-        )
-        
-        if "error" in campaigns_response:
-            return campaigns_response
+    @staticmethod
+    def _extract_metrics(insight=None):
+        """Converte uma linha de insights nas métricas usadas pelas tabelas (zeros quando não há dados)."""
+        insight = insight or {}
+        return {
+            'impressions': int(insight.get('impressions', 0)),
+            'clicks': int(insight.get('clicks', 0)),
+            'spend': float(insight.get('spend', 0)),
+            'ctr': float(insight.get('ctr', 0)),
+            'cpc': float(insight.get('cpc', 0)),
+            'cpm': float(insight.get('cpm', 0))
+        }
+
+    def _get_objects_with_metrics(self, level, objects_endpoint, object_fields, date_range=None, status_filter=None):
+        """Busca os objetos de um nível e junta em memória as métricas da consulta de insights do mesmo nível."""
+        objects_response = self._get_paginated(objects_endpoint, {'fields': ','.join(object_fields), 'limit': 100})
+        if "error" in objects_response:
+            return objects_response
         
-        campaigns = campaigns_response.get('data', [])
+        objects = objects_response.get('data', [])
         
         # Filtrar por status se especificado
         if status_filter:
-            campaigns = [c for c in campaigns if c.get('status') in status_filter]
+            objects = [o for o in objects if o.get('status') in status_filter]
         
-        # Buscar métricas para cada campanha
-        campaigns_with_metrics = []
+        # Falha nos insights não derruba a tabela: os objetos seguem com métricas zeradas
+        insights_response = self.get_insights(level=level, date_range=date_range)
+        metrics_error = insights_response.get("error")
+        if metrics_error:
+            logger.warning("Insights de %s indisponíveis, métricas zeradas: %s", level, metrics_error)
         
-        for campaign in campaigns:
-            campaign_id = campaign['id']
-            
-            # Buscar métricas da campanha
-            insights_response = self.get_campaign_insights(
-                campaign_id=campaign_id,
-                date_range=date_range
-            )
-            
-            metrics = {
-                'impressions': 0,
-                'clicks': 0,
-                'spend': 0.0,
-                'ctr': 0.0,
-                'cpc': 0.0,
-                'cpm': 0.0
-            }
-            
-            if "error" not in insights_response and insights_response.get('data'):
-                insight_data = insights_response['data'][0]  # Pegar primeiro resultado
-                metrics.update({
-                    'impressions': int(insight_data.get('impressions', 0)),
-                    'clicks': int(insight_data.get('clicks', 0)),
-                    'spend': float(insight_data.get('spend', 0)),
-                    'ctr': float(insight_data.get('ctr', 0)),
-                    'cpc': float(insight_data.get('cpc', 0)),
-                    'cpm': float(insight_data.get('cpm', 0))
-                })
-            
-            # Combinar dados da campanha com métricas
-            campaign_with_metrics = {
-                **campaign,
-                **metrics
-            }
-            
-            campaigns_with_metrics.append(campaign_with_metrics)
+        insights_by_id = {row.get(f'{level}_id'): row for row in insights_response.get('data', [])}
         
-        return {
+        # Combinar dados do objeto com métricas (objetos sem entrega ficam com métricas zeradas)
+        objects_with_metrics = [
+            {**obj, **self._extract_metrics(insights_by_id.get(obj.get('id')))}
+            for obj in objects
+        ]
+        
+        result = {
             "success": True,
-            "data": campaigns_with_metrics,
-            "total_campaigns": len(campaigns_with_metrics)
+            "data": objects_with_metrics,
+            f"total_{level}s": len(objects_with_metrics)
         }
+        if metrics_error:
+            result["metrics_error"] = metrics_error
+        return result
+
+    def get_campaigns_with_metrics(self, date_range=None, status_filter=None):
+        """Busca campanhas com suas métricas combinadas (2 consultas paginadas, independente do nº de campanhas)."""
+        # Definir filtros de status - CORREÇÃO PRINCIPAL
+        if status_filter is None:
+            # INCLUIR TODOS OS STATUS, NÃO APENAS ACTIVE
+            status_filter = ['ACTIVE', 'PAUSED', 'ARCHIVED']
+        
+        return self._get_objects_with_metrics(
+            'campaign',
+            f"act_{self.ad_account_id}/campaigns",
+            ['id', 'name', 'status', 'objective', 'created_time'],
+            date_range=date_range,
+            status_filter=status_filter
+        )
+
+    def get_adsets_with_metrics(self, date_range=None, status_filter=None):
+        """Busca conjuntos de anúncios com suas métricas combinadas."""
+        return self._get_objects_with_metrics(
+            'adset',
+            f"act_{self.ad_account_id}/adsets",
+            ['id', 'name', 'status', 'campaign_id', 'daily_budget', 'lifetime_budget'],
+            date_range=date_range,
+            status_filter=status_filter
+        )
+
+    def get_ads_with_metrics(self, date_range=None, status_filter=None):
+        """Busca anúncios com suas métricas combinadas."""
+        return self._get_objects_with_metrics(
+            'ad',
+            f"act_{self.ad_account_id}/ads",
+            ['id', 'name', 'status', 'adset_id', 'campaign_id'],
+            date_range=date_range,
+            status_filter=status_filter
+        )
 
     def get_account_summary(self, date_range=None):
         """Busca resumo geral da conta de anúncios."""
@@ -295,7 +443,7 @@ FACEBOOK_AD_ACCOUNT_ID = os.getenv("FACEBOOK_AD_ACCOUNT_ID")
 
 # Verificação para garantir que as variáveis foram carregadas
 if not FACEBOOK_ACCESS_TOKEN or not FACEBOOK_AD_ACCOUNT_ID:
-    print("ATENÇÃO: FACEBOOK_ACCESS_TOKEN ou FACEBOOK_AD_ACCOUNT_ID não configurados como variáveis de ambiente. A funcionalidade de anúncios do Facebook pode não funcionar.")
+    logger.warning("FACEBOOK_ACCESS_TOKEN ou FACEBOOK_AD_ACCOUNT_ID não configurados como variáveis de ambiente. A funcionalidade de anúncios do Facebook pode não funcionar.")
     # Em um ambiente de produção, você pode querer levantar uma exceção ou lidar com isso de forma mais robusta.
 
 # Instanciar a API do Facebook apenas se as credenciais estiverem disponíveis
@@ -385,5 +533,19 @@ class APIIntegrationService:
     def get_api(self):
         return self.api
 
-def create_api_instance():
-    return APIIntegrationService().get_api()
+def create_api_instance(platform=None, credentials=None, account_key=None):
+    """
+    Retorna o cliente da API para a plataforma e credenciais informadas (reaproveitado pelo registro de clientes).
+
+    Sem argumentos, mantém o comportamento antigo: cliente da conta configurada nas variáveis de ambiente.
+    account_key identifica a conta no registro (id do PlatformAccount); sem ele, usa plataforma + account_id.
+    Retorna None para plataformas não suportadas.
+    """
+    if platform is None and credentials is None:
+        return APIIntegrationService().get_api()
+
+    from src.services.api_client_registry import api_client_registry
+    credentials = credentials or {}
+    if account_key is None:
+        account_key = f"{platform}:{credentials.get('account_id')}"
+    return api_client_registry.get(account_key, platform, credentials)
@@ -0,0 +1,192 @@
+"""
+Métricas da aplicação no formato do Prometheus (exposição em /api/metrics).
+
+Cobre as chamadas à Graph API (por família de endpoint e status), as chamadas aos provedores de LLM
+(latência, tokens e erros), as rotas Flask e a quantidade de consultas SQLAlchemy por requisição.
+
+Com um único processo as métricas ficam no registro padrão. Com vários workers (gunicorn), defina
+PROMETHEUS_MULTIPROC_DIR no ambiente: cada processo grava seus valores em arquivos mapeados em memória nesse
+diretório e a exposição agrega todos eles. O gunicorn.conf.py do projeto limpa o diretório ao iniciar o master
+(clear_multiprocess_dir) e descarta os valores de cada worker encerrado (mark_process_dead).
+
+prometheus_client é opcional: sem ele as funções de registro não fazem nada e o endpoint responde 503.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Modo multiprocesso só quando o diretório é definido explicitamente (antes de o processo importar o prometheus_client)
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+    from prometheus_client import multiprocess
+    PROMETHEUS_AVAILABLE = METRICS_ENABLED
+except ImportError:  # prometheus_client é opcional: sem ele as métricas ficam desligadas
+    PROMETHEUS_AVAILABLE = False
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+# Faixas de latência (s): chamadas HTTP externas e rotas vão de milissegundos a dezenas de segundos
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+LLM_LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+if PROMETHEUS_AVAILABLE:
+    GRAPH_REQUEST_SECONDS = Histogram(
+        "graph_request_duration_seconds", "Duração das chamadas à Graph API",
+        ["method", "family", "status"], buckets=LATENCY_BUCKETS
+    )
+    GRAPH_REQUEST_ERRORS = Counter(
+        "graph_request_errors_total", "Chamadas à Graph API sem resposta (timeout, conexão)",
+        ["method", "family", "error"]
+    )
+    LLM_REQUEST_SECONDS = Histogram(
+        "llm_request_duration_seconds", "Duração das chamadas aos provedores de LLM",
+        ["provider", "model", "operation", "outcome"], buckets=LLM_LATENCY_BUCKETS
+    )
+    LLM_TOKENS = Counter(
+        "llm_tokens_total", "Tokens consumidos nas chamadas de LLM", ["provider", "model", "kind"]
+    )
+    LLM_ERRORS = Counter(
+        "llm_request_errors_total", "Chamadas de LLM que falharam", ["provider", "model", "operation"]
+    )
+    HTTP_REQUEST_SECONDS = Histogram(
+        "http_request_duration_seconds", "Duração das requisições às rotas Flask",
+        ["method", "endpoint", "status"], buckets=LATENCY_BUCKETS
+    )
+    DB_QUERIES_PER_REQUEST = Histogram(
+        "db_queries_per_request", "Consultas SQLAlchemy executadas por requisição",
+        ["endpoint"], buckets=QUERY_COUNT_BUCKETS
+    )
+    DB_QUERY_SECONDS = Histogram(
+        "db_query_duration_seconds", "Duração das consultas SQLAlchemy", buckets=LATENCY_BUCKETS
+    )
+
+
+def observe_graph_request(method: str, family: str, status: Any, seconds: float):
+    """Registrar uma chamada à Graph API que obteve resposta"""
+    if PROMETHEUS_AVAILABLE:
+        GRAPH_REQUEST_SECONDS.labels(method.upper(), family, str(status)).observe(seconds)
+
+
+def record_graph_error(method: str, family: str, error: str, seconds: float):
+    """Registrar uma chamada à Graph API sem resposta (a duração entra no histograma com status 'error')"""
+    if PROMETHEUS_AVAILABLE:
+        GRAPH_REQUEST_ERRORS.labels(method.upper(), family, error).inc()
+        GRAPH_REQUEST_SECONDS.labels(method.upper(), family, "error").observe(seconds)
+
+
+def _usage_tokens(usage: Any) -> Tuple[int, int]:
+    """(prompt, completion) do campo 'usage' no formato da OpenAI"""
+    if not usage:
+        return 0, 0
+    return int(usage.get("prompt_tokens") or 0), int(usage.get("completion_tokens") or 0)
+
+
+@contextmanager
+def llm_call(provider: str, model: str, operation: str) -> Iterator[Dict[str, Any]]:
+    """
+    Medir uma chamada a um provedor de LLM
+    
+    Dentro do bloco, preencha no dicionário retornado 'usage' (tokens, formato da OpenAI) e/ou 'error'
+    quando a resposta indicar falha. Exceções contam como erro e são propagadas.
+    """
+    call: Dict[str, Any] = {}
+    started = time.perf_counter()
+    try:
+        yield call
+    except Exception:
+        call.setdefault("error", True)
+        raise
+    finally:
+        if PROMETHEUS_AVAILABLE:
+            outcome = "error" if call.get("error") else "success"
+            LLM_REQUEST_SECONDS.labels(provider, model, operation, outcome).observe(time.perf_counter() - started)
+            if outcome == "error":
+                LLM_ERRORS.labels(provider, model, operation).inc()
+            prompt_tokens, completion_tokens = _usage_tokens(call.get("usage"))
+            if prompt_tokens:
+                LLM_TOKENS.labels(provider, model, "prompt").inc(prompt_tokens)
+            if completion_tokens:
+                LLM_TOKENS.labels(provider, model, "completion").inc(completion_tokens)
+
+
+def _request_endpoint() -> str:
+    # A regra da rota (e não o caminho) mantém a cardinalidade dos labels limitada
+    from flask import request
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+
+def _before_request():
+    from flask import g
+    g.metrics_started = time.perf_counter()
+    g.metrics_queries = 0
+
+
+def _after_request(response):
+    from flask import g, request
+    started = getattr(g, "metrics_started", None)
+    if started is not None:
+        endpoint = _request_endpoint()
+        HTTP_REQUEST_SECONDS.labels(request.method, endpoint, str(response.status_code)).observe(
+            time.perf_counter() - started
+        )
+        DB_QUERIES_PER_REQUEST.labels(endpoint).observe(getattr(g, "metrics_queries", 0))
+    return response
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    from flask import g, has_request_context
+    started = conn.info.get("metrics_query_started")
+    if started:
+        DB_QUERY_SECONDS.observe(time.perf_counter() - started.pop())
+    if has_request_context():
+        g.metrics_queries = getattr(g, "metrics_queries", 0) + 1
+
+
+def init_app(app):
+    """Instalar os hooks de medição das rotas e das consultas SQLAlchemy (todas as engines do processo)"""
+    if not PROMETHEUS_AVAILABLE:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def render_metrics() -> Optional[bytes]:
+    """Métricas no formato de exposição do Prometheus, agregando os workers no modo multiprocesso (None se desligadas)"""
+    if not PROMETHEUS_AVAILABLE:
+        return None
+    if not PROMETHEUS_MULTIPROC_DIR:
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+
+def clear_multiprocess_dir():
+    """Apagar os arquivos de uma execução anterior (usar no master, antes de iniciar os workers)"""
+    if not PROMETHEUS_MULTIPROC_DIR:
+        return
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+    for name in os.listdir(PROMETHEUS_MULTIPROC_DIR):
+        if name.endswith(".db"):
+            os.remove(os.path.join(PROMETHEUS_MULTIPROC_DIR, name))
+
+
+def mark_process_dead(pid: int):
+    """Descartar os valores de um worker encerrado (usar no hook child_exit do gunicorn)"""
+    if PROMETHEUS_AVAILABLE and PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
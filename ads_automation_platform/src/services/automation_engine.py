@@ -8,7 +8,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 from src.models.campaign import Campaign, AutomationRule
 from src.models.performance import PerformanceData
-from src.services.api_integrations import APIIntegrationService, create_api_instance
+from src.services.api_client_registry import api_client_registry
 from src.models.performance import PlatformAccount
 from sqlalchemy import and_, func
 
@@ -17,7 +17,8 @@ class AutomationEngine:
     
     def __init__(self, db_session):
         self.db = db_session
-        self.api_service = APIIntegrationService()
+        self.api_clients = api_client_registry
+        self._platform_accounts = {}  # (user_id, plataforma) -> PlatformAccount, durante esta execução
     
     def execute_automation_rules(self, user_id: int = None) -> List[Dict[str, Any]]:
         """Executar todas as regras de automação ativas"""
@@ -166,6 +167,21 @@ class AutomationEngine:
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
+    def _platform_api(self, campaign: Campaign):
+        """Cliente da API da conta da campanha (conta consultada uma vez por execução, cliente reaproveitado)"""
+        key = (campaign.user_id, campaign.platform)
+        if key not in self._platform_accounts:
+            self._platform_accounts[key] = PlatformAccount.query.filter_by(
+                user_id=campaign.user_id,
+                platform=campaign.platform,
+                is_active=True
+            ).first()
+        
+        platform_account = self._platform_accounts[key]
+        if not platform_account:
+            return None
+        return self.api_clients.for_account(platform_account)
+    
     def _pause_campaign(self, campaign_id: int) -> Dict[str, Any]:
         """Pausar uma campanha"""
         campaign = Campaign.query.get(campaign_id)
@@ -178,21 +194,9 @@ class AutomationEngine:
         
         # Pausar na plataforma externa se sincronizada
         if campaign.platform_campaign_id:
-            # Buscar credenciais da plataforma
-            platform_account = PlatformAccount.query.filter_by(
-                user_id=campaign.user_id,
-                platform=campaign.platform,
-                is_active=True
-            ).first()
-            
-            if platform_account:
-                api_instance = create_api_instance(campaign.platform, {
-                    'access_token': platform_account.access_token,
-                    'account_id': platform_account.account_id
-                })
-                
-                if api_instance:
-                    api_instance.pause_campaign(campaign.platform_campaign_id)
+            api_instance = self._platform_api(campaign)
+            if api_instance:
+                api_instance.pause_campaign(campaign.platform_campaign_id)
         
         return {
             'success': True,
@@ -209,20 +213,9 @@ class AutomationEngine:
         self.db.commit()
         
         if campaign.platform_campaign_id:
-            platform_account = PlatformAccount.query.filter_by(
-                user_id=campaign.user_id,
-                platform=campaign.platform,
-                is_active=True
-            ).first()
-            
-            if platform_account:
-                api_instance = create_api_instance(campaign.platform, {
-                    'access_token': platform_account.access_token,
-                    'account_id': platform_account.account_id
-                })
-                
-                if api_instance:
-                    api_instance.resume_campaign(campaign.platform_campaign_id)
+            api_instance = self._platform_api(campaign)
+            if api_instance:
+                api_instance.resume_campaign(campaign.platform_campaign_id)
         
         return {
             'success': True,
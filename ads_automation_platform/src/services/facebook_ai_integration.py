@@ -4,9 +4,12 @@ Conecta a estrutura gerada pela IA com a API do Facebook para criar anúncios re
 """
 
 import json
-import requests
+import logging
 from typing import Dict, Any
 from datetime import datetime, timedelta
+from src.services.structured_logging import get_logger, log_event
+
+logger = get_logger(__name__)
 
 class FacebookAIIntegration:
     """Classe que integra IA com criação de anúncios no Facebook - VERSÃO CORRIGIDA"""
@@ -31,8 +34,6 @@ class FacebookAIIntegration:
             Dict com resultado da criação do anúncio
         """
         try:
-            print("🤖➡️📘 DEBUG: Iniciando criação de anúncio com estrutura da IA (VERSÃO CORRIGIDA)...")
-            
             if not self.facebook_service:
                 return {
                     "success": False,
@@ -50,13 +51,10 @@ class FacebookAIIntegration:
             adset_data = ai_structure.get("adset", {})
             creative_data = ai_structure.get("creative", {})
             
-            print(f"📊 DEBUG: Estrutura da IA:")
-            print(f"  📈 Campanha: {campaign_data.get('name')}")
-            print(f"  🎯 Objetivo: {campaign_data.get('objective')}")
-            print(f"  💰 Orçamento: R$ {adset_data.get('daily_budget', 0)}")
+            log_event(logger, logging.DEBUG, "ai_publish.structure", campaign=campaign_data.get('name'),
+                      objective=campaign_data.get('objective'), daily_budget=adset_data.get('daily_budget', 0))
             
             # VERSÃO SIMPLIFICADA: Criar apenas campanha por enquanto
-            print("🔄 DEBUG: Criando campanha simplificada...")
             
             # Dados mínimos obrigatórios para campanha
             campaign_create_data = {
@@ -65,14 +63,12 @@ class FacebookAIIntegration:
                 "status": "PAUSED"  # Sempre criar pausada
             }
             
-            print(f"📤 DEBUG: Dados da campanha: {campaign_create_data}")
-            
             # Tentar criar campanha
             campaign_result = self._create_campaign_direct(campaign_create_data)
             
             if campaign_result.get("success"):
                 campaign_id = campaign_result.get("campaign_id")
-                print(f"✅ DEBUG: Campanha criada com sucesso - ID: {campaign_id}")
+                log_event(logger, logging.INFO, "ai_publish.campaign_created", campaign_id=campaign_id)
                 
                 return {
                     "success": True,
@@ -88,7 +84,7 @@ class FacebookAIIntegration:
                 }
             else:
                 error_msg = campaign_result.get("error", "Erro desconhecido")
-                print(f"❌ DEBUG: Erro ao criar campanha: {error_msg}")
+                log_event(logger, logging.WARNING, "ai_publish.campaign_failed", error=error_msg)
                 
                 # Tentar diagnóstico do erro
                 if "400" in str(error_msg):
@@ -110,9 +106,7 @@ class FacebookAIIntegration:
                     }
             
         except Exception as e:
-            print(f"💥 DEBUG: Exceção na integração: {str(e)}")
-            import traceback
-            print(f"💥 DEBUG: Traceback: {traceback.format_exc()}")
+            logger.exception("Erro na criação de anúncio a partir da estrutura da IA")
             
             return {
                 "success": False,
@@ -142,15 +136,10 @@ class FacebookAIIntegration:
                 }
             
             # Usar método do serviço existente
-            print("🔄 DEBUG: Chamando create_campaign do facebook_data_service...")
-            result = self.facebook_service.create_campaign(campaign_data)
-            
-            print(f"📥 DEBUG: Resultado do create_campaign: {result}")
-            
-            return result
+            return self.facebook_service.create_campaign(campaign_data)
             
         except Exception as e:
-            print(f"💥 DEBUG: Erro em _create_campaign_direct: {str(e)}")
+            logger.warning("Erro ao criar campanha: %s", e)
             return {
                 "success": False,
                 "error": f"Erro interno: {str(e)}"
@@ -192,8 +181,7 @@ class FacebookAIIntegration:
 # Instância global para uso nos endpoints
 try:
     facebook_ai_integration = FacebookAIIntegration()
-    print("✅ FacebookAIIntegration inicializado com sucesso")
 except Exception as e:
-    print(f"❌ Erro ao inicializar FacebookAIIntegration: {e}")
+    logger.warning("FacebookAIIntegration indisponível: %s", e)
     facebook_ai_integration = None
 
@@ -3,11 +3,331 @@ Serviço para buscar dados reais da Facebook Marketing API.
 Este módulo fornece funcionalidades para coletar campanhas, conjuntos de anúncios, anúncios e insights de performance.
 """
 
+import csv
+import logging
 import requests
 import os
 import json
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+from datetime import date, datetime, timedelta
+from urllib.parse import urlencode
+from src.services.ad_image_index import MultipartFileStream, ad_image_index, file_sha256, guess_content_type
+from src.services.graph_cache import NOT_MODIFIED, cache_key, response_cache, single_flight, ttl_for
+from src.services.graph_http import GRAPH_BASE_URL, get_graph_transport
+from src.services.structured_logging import get_logger, log_event, timed
+from src.services.media_proxy import media_proxy
+from src.services.page_token_cache import AUTH_ERROR_CODES, page_token_cache, token_expiry
+from src.services.targeting_index import targeting_index
+
+logger = get_logger(__name__)
+
+# Campos solicitados à Graph API (compartilhados com a variante assíncrona)
+ACCOUNT_FIELDS = "id,name,account_status,currency,timezone_name,business_name,business"
+CAMPAIGN_FIELDS = "id,name,status,objective,created_time,updated_time,start_time,stop_time,daily_budget,lifetime_budget"
+ADSET_FIELDS = "id,name,status,campaign_id,created_time,updated_time,start_time,end_time,daily_budget,lifetime_budget,targeting,optimization_goal,billing_event"
+AD_FIELDS = "id,name,status,adset_id,campaign_id,created_time,updated_time,creative"
+CAMPAIGN_INSIGHTS_FIELDS = "impressions,clicks,ctr,cpc,cpm,spend,reach,frequency,actions,cost_per_action_type,video_views,video_p25_watched_actions,video_p50_watched_actions,video_p75_watched_actions,video_p100_watched_actions"
+ACCOUNT_INSIGHTS_FIELDS = "impressions,clicks,ctr,cpc,cpm,spend,reach,frequency,actions,cost_per_action_type,account_currency,account_id,account_name"
+INSIGHTS_FIELDS = "impressions,clicks,ctr,cpc,cpm,spend,reach,frequency,actions,cost_per_action_type"
+CHART_INSIGHTS_FIELDS = "impressions,clicks,spend,ctr,cpc,date_start"
+AD_CREATIVE_FIELDS = "id,name,status,object_story_spec,image_url,video_id,thumbnail_url"
+
+# Campos dos posts de página com imagem, link e anexos expandidos na própria listagem
+PAGE_POST_FIELDS = "id,message,created_time,full_picture,permalink_url,status_type,attachments{media,media_type,type}"
+
+# Campos da mídia do Instagram, com os itens de carrossel expandidos na própria listagem
+INSTAGRAM_MEDIA_FIELDS = ("id,caption,media_type,media_url,thumbnail_url,permalink,timestamp,like_count,comments_count,"
+                          "children{id,media_type,media_url,thumbnail_url}")
+
+# Validade do vínculo página -> conta comercial do Instagram em cache (muda raramente)
+INSTAGRAM_ACCOUNT_TTL = float(os.getenv("INSTAGRAM_ACCOUNT_TTL", str(12 * 3600)))
+
+# Limite de sub-requisições por chamada batch da Graph API
+GRAPH_BATCH_LIMIT = 50
+
+# Adsets trazidos por campanha na consulta aninhada de orçamentos
+BUDGET_ADSETS_LIMIT = 100
+
+# Janelas de comparação do dashboard (nome -> dias), todas terminando ontem e buscadas em uma única chamada
+DASHBOARD_WINDOWS = {"7d": 7, "30d": 30}
+
+# Prazo total do resumo do dashboard (s); seções que não respondem a tempo vêm do cache ou vazias
+DASHBOARD_DEADLINE_SECONDS = float(os.getenv("DASHBOARD_DEADLINE_SECONDS", "8"))
+DASHBOARD_CAMPAIGNS_SHOWN = 10
+
+# Pool para buscar imagens de posts que não vieram na listagem expandida
+_post_media_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="post-media")
+
+# Pool compartilhado para as consultas independentes do dashboard
+_dashboard_executor = ThreadPoolExecutor(max_workers=int(os.getenv("DASHBOARD_WORKERS", "8")),
+                                         thread_name_prefix="dashboard-fanout")
+
+# Limites acima dos quais os insights são gerados como relatório assíncrono (report_run_id)
+ASYNC_INSIGHTS_MAX_SYNC_DAYS = int(os.getenv("ASYNC_INSIGHTS_MAX_SYNC_DAYS", "90"))
+ASYNC_INSIGHTS_ROW_THRESHOLD = int(os.getenv("ASYNC_INSIGHTS_ROW_THRESHOLD", "5000"))
+ASYNC_INSIGHTS_TIMEOUT = float(os.getenv("ASYNC_INSIGHTS_TIMEOUT", "300"))
+ASYNC_INSIGHTS_POLL_INTERVAL = 2.0
+ASYNC_INSIGHTS_MAX_POLL_INTERVAL = 15.0
+ASYNC_INSIGHTS_EXPORT_URL = "https://www.facebook.com/ads/ads_insights/export_report/"
+
+
+class FacebookAPIError(Exception):
+    """Erro da Graph API ao percorrer páginas (os iteradores não podem retornar dicts de erro)"""
+
+
+def _next_cursor(response: Dict[str, Any]) -> Optional[str]:
+    """Retornar o cursor 'after' quando a resposta indica que existe próxima página"""
+    paging = response.get("paging") or {}
+    if not paging.get("next"):
+        return None
+    return (paging.get("cursors") or {}).get("after")
+
+
+def _sum_adset_budgets(adsets: List[Dict]) -> float:
+    """Somar orçamentos dos adsets em reais (API retorna centavos), priorizando daily_budget"""
+    total_budget = 0
+    for adset in adsets:
+        daily_budget = adset.get("daily_budget", "0")
+        lifetime_budget = adset.get("lifetime_budget", "0")
+        
+        if daily_budget and daily_budget != "0":
+            total_budget += float(daily_budget) / 100  # Centavos para reais
+        elif lifetime_budget and lifetime_budget != "0":
+            total_budget += float(lifetime_budget) / 100  # Centavos para reais
+    
+    return round(total_budget, 2)
+
+
+def _window_time_ranges(windows: Dict[str, int], today: Optional[date] = None) -> Dict[str, Dict[str, str]]:
+    """Converter janelas (nome -> dias) em intervalos explícitos terminando ontem (dia corrente ainda incompleto)"""
+    until = (today or datetime.now().date()) - timedelta(days=1)
+    return {
+        name: {
+            "since": (until - timedelta(days=days - 1)).strftime("%Y-%m-%d"),
+            "until": until.strftime("%Y-%m-%d")
+        }
+        for name, days in windows.items()
+    }
+
+
+def _match_window_rows(rows: List[Dict], time_ranges: Dict[str, Dict[str, str]]) -> Dict[str, Dict]:
+    """Associar as linhas de uma consulta com time_ranges às janelas pelo período (date_start/date_stop)"""
+    rows_by_period = {(row.get("date_start"), row.get("date_stop")): row for row in rows}
+    return {
+        name: rows_by_period.get((time_range["since"], time_range["until"]), {})
+        for name, time_range in time_ranges.items()
+    }
+
+
+def _derive_performance_metrics(rows: List[Dict]) -> List[Dict[str, Any]]:
+    """
+    Calcular as métricas de performance de várias linhas de insights de uma vez, coluna a coluna
+    
+    CTR, CPC e CPM vindos da API são mantidos; quando ausentes ou zerados são derivados de
+    impressões, cliques e gasto.
+    """
+    impressions = [int(row.get("impressions", 0)) for row in rows]
+    clicks = [int(row.get("clicks", 0)) for row in rows]
+    spend = [float(row.get("spend", 0)) for row in rows]
+    reach = [int(row.get("reach", 0)) for row in rows]
+    
+    ctr = [
+        float(row.get("ctr", 0)) or ((c / i) * 100 if i > 0 and c > 0 else 0.0)
+        for row, i, c in zip(rows, impressions, clicks)
+    ]
+    cpc = [
+        float(row.get("cpc", 0)) or (s / c if c > 0 and s > 0 else 0.0)
+        for row, c, s in zip(rows, clicks, spend)
+    ]
+    cpm = [
+        float(row.get("cpm", 0)) or ((s / i) * 1000 if i > 0 and s > 0 else 0.0)
+        for row, i, s in zip(rows, impressions, spend)
+    ]
+    
+    return [
+        {
+            "impressions": i,
+            "clicks": c,
+            "spend": s,
+            "ctr": round(row_ctr, 2),
+            "cpc": round(row_cpc, 2),
+            "cpm": round(row_cpm, 2),
+            "reach": r
+        }
+        for i, c, s, row_ctr, row_cpc, row_cpm, r in zip(impressions, clicks, spend, ctr, cpc, cpm, reach)
+    ]
+
+
+def _build_dashboard_summary(account_info: Dict[str, Any], campaigns: Dict[str, Any], window_insights: Dict[str, Dict],
+                             campaign_budgets: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Montar o resumo do dashboard a partir dos dados já buscados
+    
+    campaigns traz as campanhas exibidas ('data') e as contagens por status ('stats');
+    window_insights mapeia o nome de cada janela de DASHBOARD_WINDOWS para sua linha de insights;
+    cada janela vira uma seção performance_<nome> do resumo.
+    """
+    campaign_stats = {"active": 0, "paused": 0, "total": 0, **(campaigns.get("stats") or {})}
+    
+    window_names = list(window_insights)
+    window_metrics = _derive_performance_metrics([window_insights[name] for name in window_names])
+    
+    # Adicionar orçamentos às campanhas
+    campaigns_with_budgets = []
+    for campaign in campaigns.get("data", [])[:DASHBOARD_CAMPAIGNS_SHOWN]:
+        campaign_with_budget = campaign.copy()
+        campaign_id = campaign.get("id")
+        campaign_with_budget["budget"] = campaign_budgets.get(campaign_id, 0)
+        campaigns_with_budgets.append(campaign_with_budget)
+    
+    # Preparar resumo
+    summary = {
+        "account_info": {
+            "id": account_info.get("id"),
+            "name": account_info.get("name"),
+            "currency": account_info.get("currency"),
+            "business_name": account_info.get("business_name"),
+            "status": account_info.get("account_status")
+        },
+        "campaign_stats": campaign_stats,
+        **{f"performance_{name}": metrics for name, metrics in zip(window_names, window_metrics)},
+        "campaigns": campaigns_with_budgets,
+        "last_updated": datetime.now().isoformat()
+    }
+    
+    return summary
+
+
+def _empty_dashboard_sections() -> Dict[str, Any]:
+    """Valor de cada seção do dashboard quando ela falha e não há cópia em cache"""
+    return {
+        "account_info": {},
+        "campaigns": {"data": [], "total": 0},
+        "campaigns_active": 0,
+        "campaigns_paused": 0,
+        "insights": {name: {} for name in DASHBOARD_WINDOWS},
+        "budgets": {}
+    }
+
+
+def _is_section_result(result: Any) -> bool:
+    """Resultado utilizável de uma seção (contagens podem ser 0; respostas com 'error' não contam)"""
+    return result is not None and not (isinstance(result, dict) and "error" in result)
+
+
+def _assemble_dashboard_summary(results: Dict[str, Any], sections_status: Dict[str, str]) -> Dict[str, Any]:
+    """Montar o resumo a partir dos resultados de cada seção, com o estado de cada uma"""
+    campaigns = {
+        "data": results["campaigns"].get("data", []),
+        "stats": {
+            "active": results["campaigns_active"],
+            "paused": results["campaigns_paused"],
+            "total": results["campaigns"].get("total", 0)
+        }
+    }
+    summary = _build_dashboard_summary(results["account_info"], campaigns, results["insights"], results["budgets"])
+    summary["sections_status"] = sections_status
+    summary["partial"] = any(status != "ok" for status in sections_status.values())
+    return summary
+
+
+def _build_chart_points(rows: List[Dict]) -> List[Dict[str, Any]]:
+    """Converter linhas diárias de insights no formato usado pelos gráficos"""
+    return [
+        {
+            "date": day_data.get("date_start"),
+            "impressions": int(day_data.get("impressions", 0)),
+            "clicks": int(day_data.get("clicks", 0)),
+            "spend": float(day_data.get("spend", 0)),
+            "ctr": float(day_data.get("ctr", 0)),
+            "cpc": float(day_data.get("cpc", 0))
+        }
+        for day_data in rows
+    ]
+
+
+def _structure_page_post(post: Dict[str, Any]) -> Dict[str, Any]:
+    """Converter um post da página (com campos expandidos) no formato usado pelo seletor de publicações"""
+    post_id = post.get('id', '')
+    attachments = (post.get('attachments') or {}).get('data') or []
+    attachment = attachments[0] if attachments else {}
+    
+    picture = post.get('full_picture') or ((attachment.get('media') or {}).get('image') or {}).get('src', '')
+    
+    return {
+        'id': post_id,
+        'message': post.get('message', ''),
+        'created_time': post.get('created_time', ''),
+        'full_picture': picture,
+        'permalink_url': post.get('permalink_url') or f"https://www.facebook.com/{post_id}",
+        'type': (attachment.get('media_type') or attachment.get('type') or 'status').lower(),
+        'platform': 'facebook',
+        'platform_name': 'Facebook',
+        'icon': '📘'
+    }
+
+
+def _instagram_image_url(media: Dict[str, Any]) -> str:
+    """URL de imagem de uma mídia do Instagram (a miniatura, no caso de vídeos)"""
+    if (media.get('media_type') or '').upper() == 'VIDEO':
+        return media.get('thumbnail_url') or ''
+    return media.get('media_url') or ''
+
+
+def _structure_instagram_media(media: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Converter uma mídia do Instagram (com os filhos do carrossel expandidos) no formato usado pelo frontend
+    
+    As URLs ficam com a origem assinada; _proxy_instagram_media as troca pelas do proxy em lote.
+    """
+    media_type = (media.get('media_type') or '').lower()
+    children = ((media.get('children') or {}).get('data')) or []
+    
+    formatted_post = {
+        'id': media.get('id'),
+        'message': media.get('caption', ''),
+        'created_time': media.get('timestamp'),
+        'permalink_url': media.get('permalink', ''),
+        'engagement': {
+            'likes': media.get('like_count', 0),
+            'comments': media.get('comments_count', 0),
+            'shares': 0  # Instagram não tem shares públicos
+        }
+    }
+    
+    if media_type == 'carousel_album':
+        items = [
+            {'id': child.get('id'), 'type': (child.get('media_type') or 'image').lower(),
+             'url': _instagram_image_url(child)}
+            for child in children
+        ]
+        cover = _instagram_image_url(media) or (_instagram_image_url(children[0]) if children else '')
+        formatted_post['media'] = {'type': 'image', 'url': cover, 'children': items}
+    elif media_type == 'video':
+        formatted_post['media'] = {'type': 'video', 'url': _instagram_image_url(media)}
+    elif media_type == 'image':
+        formatted_post['media'] = {'type': 'image', 'url': _instagram_image_url(media)}
+    
+    return formatted_post
+
+
+def _proxy_instagram_media(formatted_posts: List[Dict[str, Any]]):
+    """Trocar as URLs de origem da listagem pelas do proxy, registrando todas em uma única transação"""
+    slots = []
+    for post in formatted_posts:
+        media = post.get('media')
+        if media:
+            slots.append((f"ig:{post['id']}", media))
+            slots.extend((f"ig:{child['id']}", child) for child in media.get('children', []))
+    
+    proxied = media_proxy.proxy_urls([(media_id, slot['url']) for media_id, slot in slots])
+    for (_, slot), url in zip(slots, proxied):
+        slot['url'] = url
+
 
 class FacebookDataService:
     """Serviço para buscar dados reais da Facebook Marketing API"""
@@ -15,260 +335,544 @@ class FacebookDataService:
     def __init__(self, access_token: str, ad_account_id: str):
         self.access_token = access_token
         self.ad_account_id = ad_account_id
-        self.base_url = "https://graph.facebook.com/v23.0"
+        self.base_url = GRAPH_BASE_URL
         self.account_prefix = f"act_{ad_account_id}"
+        self.http = get_graph_transport()  # Pool de conexões compartilhado (keep-alive)
+        self._local = threading.local()
+        self._async_client = None
+    
+    def _async_service(self):
+        """Variante assíncrona (HTTP/2) da mesma conta, usada nas leituras em leque; None sem httpx"""
+        from src.services.facebook_data_service_async import ASYNC_GRAPH_AVAILABLE, AsyncFacebookDataService
+        if not ASYNC_GRAPH_AVAILABLE:
+            return None
+        if self._async_client is None:
+            self._async_client = AsyncFacebookDataService(self.access_token, self.ad_account_id)
+        return self._async_client
+    
+    @contextmanager
+    def _cache_only(self):
+        """Dentro do bloco, leituras nesta thread usam apenas o cache (mesmo expirado), sem chamar a API"""
+        self._local.cache_only = True
+        try:
+            yield
+        finally:
+            self._local.cache_only = False
+    
+    def _make_request(self, endpoint: str, params: dict = None, use_cache: bool = True,
+                      ttl: float = None) -> Dict[str, Any]:
+        """
+        Fazer requisição GET para a Facebook API, servindo do cache e coalescendo chamadas idênticas simultâneas
+        
+        'ttl' substitui a validade padrão do tipo de endpoint (ttl_for) quando a consulta muda menos que ele.
+        """
+        key = cache_key(self.access_token, endpoint, params)
+        if getattr(self._local, "cache_only", False):
+            cached = response_cache.peek(key)
+            return cached if cached is not None else {"error": "Resposta não disponível em cache"}
+        
+        if not use_cache or not response_cache.enabled:
+            # Mesmo sem cache, chamadas idênticas simultâneas compartilham uma única ida à API
+            return single_flight.do(key, lambda: self._fetch(endpoint, params)[0])
+        
+        return response_cache.fetch(key, ttl or ttl_for(endpoint, params),
+                                    lambda etag: self._fetch(endpoint, params, etag))
     
-    def _make_request(self, endpoint: str, params: dict = None) -> Dict[str, Any]:
-        """Fazer requisição para a Facebook API"""
+    def _fetch(self, endpoint: str, params: dict = None, etag: str = None) -> Tuple[Any, Optional[str]]:
+        """
+        Buscar o endpoint diretamente na Facebook API
+        
+        Com 'etag' a requisição é condicional (If-None-Match) e o corpo retornado é NOT_MODIFIED
+        quando a API responde 304. Retorna (corpo, etag da resposta).
+        """
         url = f"{self.base_url}/{endpoint}"
         
         default_params = {"access_token": self.access_token}
         if params:
             default_params.update(params)
         
+        headers = {"If-None-Match": etag} if etag else None
+        
         try:
-            response = requests.get(url, params=default_params)
+            response = self.http.get(url, params=default_params, headers=headers, usage_key=self.account_prefix)
+            if response.status_code == 304:
+                return NOT_MODIFIED, response.headers.get("ETag") or etag
             response.raise_for_status()
-            return response.json()
+            return response.json(), response.headers.get("ETag")
         except requests.exceptions.RequestException as e:
-            print(f"Erro na requisição à Facebook API: {e}")
-            return {"error": str(e)}
+            logger.warning("Erro na requisição à Facebook API: %s", e)
+            return {"error": str(e)}, None
     
     def get_ad_account_info(self) -> Dict[str, Any]:
         """Buscar informações da conta de anúncios"""
         endpoint = self.account_prefix
         params = {
-            "fields": "id,name,account_status,currency,timezone_name,business_name,business"
+            "fields": ACCOUNT_FIELDS
         }
         return self._make_request(endpoint, params)
     
-    def get_campaigns(self, limit: int = 50) -> Dict[str, Any]:
-        """Buscar campanhas da conta de anúncios"""
+    def _iter_pages(self, endpoint: str, params: dict = None) -> Iterator[Dict[str, Any]]:
+        """Percorrer as páginas de um edge seguindo o cursor 'after', mantendo apenas uma página em memória"""
+        page_params = dict(params or {})
+        while True:
+            response = self._make_request(endpoint, page_params)
+            if "error" in response:
+                raise FacebookAPIError(response["error"])
+            
+            yield response
+            
+            after = _next_cursor(response)
+            if not after:
+                return
+            page_params = {**page_params, "after": after}
+    
+    def _iter_items(self, endpoint: str, params: dict = None) -> Iterator[Dict[str, Any]]:
+        """Percorrer os itens de todas as páginas de um edge"""
+        for page in self._iter_pages(endpoint, params):
+            yield from page.get("data", [])
+    
+    @staticmethod
+    def _page_params(params: dict, after: Optional[str]) -> dict:
+        """Incluir o cursor da página solicitada, quando informado"""
+        if after:
+            params["after"] = after
+        return params
+    
+    def _adsets_endpoint(self, campaign_id: Optional[str]) -> str:
+        return f"{campaign_id}/adsets" if campaign_id else f"{self.account_prefix}/adsets"
+    
+    def _ads_endpoint(self, adset_id: Optional[str]) -> str:
+        return f"{adset_id}/ads" if adset_id else f"{self.account_prefix}/ads"
+    
+    def get_campaigns(self, limit: int = 50, after: str = None) -> Dict[str, Any]:
+        """Buscar uma página de campanhas da conta de anúncios"""
         endpoint = f"{self.account_prefix}/campaigns"
         params = {
-            "fields": "id,name,status,objective,created_time,updated_time,start_time,stop_time,daily_budget,lifetime_budget",
+            "fields": CAMPAIGN_FIELDS,
             "limit": limit
         }
-        return self._make_request(endpoint, params)
+        return self._make_request(endpoint, self._page_params(params, after))
     
-    def get_adsets(self, campaign_id: str = None, limit: int = 50) -> Dict[str, Any]:
-        """Buscar conjuntos de anúncios"""
-        if campaign_id:
-            endpoint = f"{campaign_id}/adsets"
-        else:
-            endpoint = f"{self.account_prefix}/adsets"
-        
+    def iter_campaigns(self, page_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """Percorrer todas as campanhas da conta, página a página"""
+        endpoint = f"{self.account_prefix}/campaigns"
+        return self._iter_items(endpoint, {"fields": CAMPAIGN_FIELDS, "limit": page_size})
+    
+    def get_adsets(self, campaign_id: str = None, limit: int = 50, after: str = None) -> Dict[str, Any]:
+        """Buscar uma página de conjuntos de anúncios"""
         params = {
-            "fields": "id,name,status,campaign_id,created_time,updated_time,start_time,end_time,daily_budget,lifetime_budget,targeting,optimization_goal,billing_event",
+            "fields": ADSET_FIELDS,
             "limit": limit
         }
-        return self._make_request(endpoint, params)
+        return self._make_request(self._adsets_endpoint(campaign_id), self._page_params(params, after))
     
-    def get_ads(self, adset_id: str = None, limit: int = 50) -> Dict[str, Any]:
-        """Buscar anúncios"""
-        if adset_id:
-            endpoint = f"{adset_id}/ads"
-        else:
-            endpoint = f"{self.account_prefix}/ads"
-        
+    def iter_adsets(self, campaign_id: str = None, page_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """Percorrer todos os conjuntos de anúncios (da campanha ou da conta), página a página"""
+        return self._iter_items(self._adsets_endpoint(campaign_id), {"fields": ADSET_FIELDS, "limit": page_size})
+    
+    def get_ads(self, adset_id: str = None, limit: int = 50, after: str = None) -> Dict[str, Any]:
+        """Buscar uma página de anúncios"""
         params = {
-            "fields": "id,name,status,adset_id,campaign_id,created_time,updated_time,creative",
+            "fields": AD_FIELDS,
             "limit": limit
         }
-        return self._make_request(endpoint, params)
+        return self._make_request(self._ads_endpoint(adset_id), self._page_params(params, after))
+    
+    def iter_ads(self, adset_id: str = None, page_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """Percorrer todos os anúncios (do conjunto ou da conta), página a página"""
+        return self._iter_items(self._ads_endpoint(adset_id), {"fields": AD_FIELDS, "limit": page_size})
     
-    def get_campaign_insights(self, campaign_id: str, date_preset: str = "last_7_days") -> Dict[str, Any]:
+    def get_campaign_insights(self, campaign_id: str, date_preset: str = "last_7_days", after: str = None) -> Dict[str, Any]:
         """Buscar insights de performance de uma campanha"""
         endpoint = f"{campaign_id}/insights"
         params = {
-            "fields": "impressions,clicks,ctr,cpc,cpm,spend,reach,frequency,actions,cost_per_action_type,video_views,video_p25_watched_actions,video_p50_watched_actions,video_p75_watched_actions,video_p100_watched_actions",
+            "fields": CAMPAIGN_INSIGHTS_FIELDS,
             "date_preset": date_preset
         }
-        return self._make_request(endpoint, params)
+        return self._make_request(endpoint, self._page_params(params, after))
     
-    def get_adset_insights(self, adset_id: str, date_preset: str = "last_7_days") -> Dict[str, Any]:
+    def get_adset_insights(self, adset_id: str, date_preset: str = "last_7_days", after: str = None) -> Dict[str, Any]:
         """Buscar insights de performance de um conjunto de anúncios"""
         endpoint = f"{adset_id}/insights"
         params = {
-            "fields": "impressions,clicks,ctr,cpc,cpm,spend,reach,frequency,actions,cost_per_action_type",
+            "fields": INSIGHTS_FIELDS,
             "date_preset": date_preset
         }
-        return self._make_request(endpoint, params)
+        return self._make_request(endpoint, self._page_params(params, after))
     
-    def get_ad_insights(self, ad_id: str, date_preset: str = "last_7_days") -> Dict[str, Any]:
+    def get_ad_insights(self, ad_id: str, date_preset: str = "last_7_days", after: str = None) -> Dict[str, Any]:
         """Buscar insights de performance de um anúncio"""
         endpoint = f"{ad_id}/insights"
         params = {
-            "fields": "impressions,clicks,ctr,cpc,cpm,spend,reach,frequency,actions,cost_per_action_type",
+            "fields": INSIGHTS_FIELDS,
             "date_preset": date_preset
         }
-        return self._make_request(endpoint, params)
+        return self._make_request(endpoint, self._page_params(params, after))
     
-    def get_account_insights(self, date_preset: str = "last_7_days") -> Dict[str, Any]:
+    def get_account_insights(self, date_preset: str = "last_7_days", after: str = None) -> Dict[str, Any]:
         """Buscar insights de performance da conta de anúncios"""
         endpoint = f"{self.account_prefix}/insights"
         params = {
-            "fields": "impressions,clicks,ctr,cpc,cpm,spend,reach,frequency,actions,cost_per_action_type,account_currency,account_id,account_name",
+            "fields": ACCOUNT_INSIGHTS_FIELDS,
             "date_preset": date_preset
         }
-        return self._make_request(endpoint, params)
+        return self._make_request(endpoint, self._page_params(params, after))
     
-    def get_insights_with_date_range(self, object_id: str, object_type: str, start_date: str, end_date: str) -> Dict[str, Any]:
-        """Buscar insights com intervalo de datas específico"""
+    def get_account_insights_windows(self, windows: Dict[str, int] = None) -> Dict[str, Any]:
+        """
+        Buscar insights da conta para várias janelas de comparação em uma única chamada (time_ranges)
+        
+        Returns:
+            {"<nome da janela>": linha de insights (ou {} sem dados), ...} ou {"error": ...}
+        """
+        time_ranges = _window_time_ranges(windows or DASHBOARD_WINDOWS)
+        response = self._make_request(f"{self.account_prefix}/insights", {
+            "fields": ACCOUNT_INSIGHTS_FIELDS,
+            "time_ranges": json.dumps(list(time_ranges.values()))
+        })
+        if "error" in response:
+            return response
+        return _match_window_rows(response.get("data", []), time_ranges)
+    
+    def iter_insights(self, object_id: str = None, level: str = None, date_preset: str = "last_7_days",
+                      time_range: Dict[str, str] = None, time_increment: Any = None,
+                      fields: str = INSIGHTS_FIELDS, page_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Percorrer todas as linhas de insights de um objeto (ou da conta quando object_id não é informado).
+        
+        Args:
+            level: Nível de agregação (campaign, adset, ad) para insights da conta
+            time_range: {"since": "YYYY-MM-DD", "until": "YYYY-MM-DD"}; tem prioridade sobre date_preset
+            time_increment: Quebra temporal das linhas (ex.: 1 para diário)
+        """
+        endpoint = f"{object_id or self.account_prefix}/insights"
+        params = {"fields": fields, "limit": page_size}
+        if time_range:
+            params["time_range"] = json.dumps(time_range)
+        else:
+            params["date_preset"] = date_preset
+        if level:
+            params["level"] = level
+        if time_increment:
+            params["time_increment"] = time_increment
+        return self._iter_items(endpoint, params)
+    
+    def get_insights_with_date_range(self, object_id: str, object_type: str, start_date: str, end_date: str,
+                                     level: str = None, time_increment: Any = None,
+                                     estimated_objects: int = 1) -> Dict[str, Any]:
+        """
+        Buscar insights com intervalo de datas específico
+        
+        Períodos longos ou com muitas linhas estimadas (objetos x dias quando time_increment=1) são gerados
+        como relatório assíncrono; o retorno mantém o formato {"data": [...]} nos dois casos.
+        """
         if object_type == "account":
             endpoint = f"{self.account_prefix}/insights"
         else:
             endpoint = f"{object_id}/insights"
         
         params = {
-            "fields": "impressions,clicks,ctr,cpc,cpm,spend,reach,frequency,actions,cost_per_action_type",
+            "fields": INSIGHTS_FIELDS,
             "time_range": json.dumps({
                 "since": start_date,
                 "until": end_date
             })
         }
+        if level:
+            params["level"] = level
+        if time_increment:
+            params["time_increment"] = time_increment
+        
+        if self._should_use_async_insights(start_date, end_date, estimated_objects, time_increment):
+            return self.run_async_insights_report(endpoint, params)
         return self._make_request(endpoint, params)
     
-    def get_campaign_budgets(self, campaigns: List[Dict]) -> Dict[str, float]:
-        """Buscar orçamentos das campanhas através dos adsets - TESTADO COM DADOS REAIS"""
-        campaign_budgets = {}
+    # ===== RELATÓRIOS ASSÍNCRONOS DE INSIGHTS =====
+    
+    @staticmethod
+    def _should_use_async_insights(start_date: str, end_date: str, estimated_objects: int = 1,
+                                   time_increment: Any = None) -> bool:
+        """Decidir se a consulta deve usar relatório assíncrono (período longo ou muitas linhas estimadas)"""
+        try:
+            days = (datetime.strptime(end_date, "%Y-%m-%d") - datetime.strptime(start_date, "%Y-%m-%d")).days + 1
+        except (TypeError, ValueError):
+            return False
+        
+        if days > ASYNC_INSIGHTS_MAX_SYNC_DAYS:
+            return True
+        
+        rows_per_object = days if str(time_increment) == "1" else 1
+        return max(1, estimated_objects) * rows_per_object > ASYNC_INSIGHTS_ROW_THRESHOLD
+    
+    def start_async_insights_report(self, endpoint: str, params: dict) -> Dict[str, Any]:
+        """
+        Iniciar um relatório assíncrono de insights (POST <objeto>/insights)
+        
+        Returns:
+            {"report_run_id": "..."} ou {"error": ...}
+        """
+        result = self._make_post_request(endpoint, params, invalidate_cache=False)
+        if "report_run_id" not in result:
+            return {"error": result.get("error", "A API não retornou report_run_id")}
+        return {"report_run_id": result["report_run_id"]}
+    
+    def get_async_insights_report_status(self, report_run_id: str) -> Dict[str, Any]:
+        """Consultar o andamento de um relatório assíncrono (async_status, async_percent_completion)"""
+        return self._make_request(report_run_id, {
+            "fields": "id,async_status,async_percent_completion,date_start,date_stop"
+        }, use_cache=False)
+    
+    def wait_for_async_insights_report(self, report_run_id: str, timeout: float = ASYNC_INSIGHTS_TIMEOUT) -> Dict[str, Any]:
+        """Aguardar a conclusão do relatório consultando o status com intervalo crescente"""
+        deadline = time.monotonic() + timeout
+        interval = ASYNC_INSIGHTS_POLL_INTERVAL
+        
+        while True:
+            status = self.get_async_insights_report_status(report_run_id)
+            if "error" in status:
+                return status
+            
+            async_status = status.get("async_status")
+            if async_status == "Job Completed":
+                return status
+            if async_status in ("Job Failed", "Job Skipped"):
+                return {"error": f"Relatório assíncrono {report_run_id} terminou com status '{async_status}'",
+                        "report_run_id": report_run_id}
+            
+            if time.monotonic() + interval > deadline:
+                return {"error": f"Relatório assíncrono {report_run_id} não concluiu em {timeout:.0f}s "
+                                 f"({status.get('async_percent_completion', 0)}%)",
+                        "report_run_id": report_run_id}
+            
+            time.sleep(interval)
+            interval = min(interval * 1.5, ASYNC_INSIGHTS_MAX_POLL_INTERVAL)
+    
+    def iter_async_insights_results(self, report_run_id: str, page_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Percorrer as linhas de um relatório concluído, página a página"""
+        return self._iter_items(f"{report_run_id}/insights", {"limit": page_size})
+    
+    def iter_async_insights_csv(self, report_run_id: str) -> Iterator[Dict[str, str]]:
+        """Percorrer as linhas da exportação CSV de um relatório concluído sem carregá-la inteira em memória"""
+        params = {"report_run_id": report_run_id, "format": "csv", "access_token": self.access_token}
+        response = self.http.get(ASYNC_INSIGHTS_EXPORT_URL, params=params, stream=True)
+        try:
+            response.raise_for_status()
+            response.encoding = response.encoding or "utf-8"
+            yield from csv.DictReader(response.iter_lines(decode_unicode=True))
+        finally:
+            response.close()
+    
+    def run_async_insights_report(self, endpoint: str, params: dict, output: str = "json",
+                                  timeout: float = ASYNC_INSIGHTS_TIMEOUT) -> Dict[str, Any]:
+        """
+        Gerar insights via relatório assíncrono: iniciar, aguardar e coletar o resultado
+        
+        Args:
+            endpoint: Edge de insights (ex.: act_X/insights ou <campaign_id>/insights)
+            params: Mesmos parâmetros da consulta síncrona (fields, time_range, level, time_increment...)
+            output: "json" (resultado paginado) ou "csv" (exportação do relatório)
+        
+        Returns:
+            {"data": [...], "report_run_id": "..."} ou {"error": ...}
+        """
+        job = self.start_async_insights_report(endpoint, params)
+        if "error" in job:
+            return job
+        
+        report_run_id = job["report_run_id"]
+        status = self.wait_for_async_insights_report(report_run_id, timeout)
+        if "error" in status:
+            return status
         
         try:
-            for campaign in campaigns:
+            if output == "csv":
+                rows = list(self.iter_async_insights_csv(report_run_id))
+            else:
+                rows = list(self.iter_async_insights_results(report_run_id))
+        except (FacebookAPIError, requests.exceptions.RequestException) as e:
+            return {"error": str(e), "report_run_id": report_run_id}
+        
+        return {"data": rows, "report_run_id": report_run_id}
+    
+    def get_campaign_budgets(self, campaigns: List[Dict] = None, max_campaigns: int = None) -> Dict[str, float]:
+        """
+        Buscar orçamentos das campanhas (soma dos adsets) com uma consulta de campos aninhados
+        
+        Uma chamada traz campanhas e seus adsets; a paginação só é seguida quando
+        há mais campanhas a resolver ou quando uma campanha tem mais adsets que o limite.
+        
+        Args:
+            campaigns: Campanhas a resolver (None = todas as campanhas da conta)
+            max_campaigns: Sem 'campaigns', resolver apenas as primeiras N campanhas da listagem
+        
+        Returns:
+            Dict {campaign_id: orçamento em reais}
+        
+        Raises:
+            FacebookAPIError: se alguma página de campanhas ou de adsets falhar (sem orçamentos parciais,
+                para que o dashboard sirva a seção do cache em vez de exibir valores zerados)
+        """
+        campaign_budgets = {}
+        pending_ids = None
+        if campaigns is not None:
+            pending_ids = {campaign.get("id") for campaign in campaigns if campaign.get("id")}
+            if not pending_ids:
+                return campaign_budgets
+        
+        endpoint = f"{self.account_prefix}/campaigns"
+        params = {
+            "fields": f"id,daily_budget,lifetime_budget,adsets.limit({BUDGET_ADSETS_LIMIT}){{daily_budget,lifetime_budget}}",
+            "limit": min(100, max_campaigns) if max_campaigns and pending_ids is None else 100
+        }
+        
+        while True:
+            response = self._make_request(endpoint, params)
+            if "error" in response:
+                logger.warning("Erro ao buscar orçamentos das campanhas: %s", response['error'])
+                raise FacebookAPIError(response["error"])
+            
+            for campaign in response.get("data", []):
                 campaign_id = campaign.get("id")
-                if not campaign_id:
+                if pending_ids is not None and campaign_id not in pending_ids:
                     continue
                 
-                # Buscar adsets da campanha
-                adsets_response = self.get_adsets(campaign_id)
-                adsets = adsets_response.get("data", [])
-                
-                total_budget = 0
-                for adset in adsets:
-                    # Processar orçamentos (valores em centavos da API)
-                    daily_budget = adset.get("daily_budget", "0")
-                    lifetime_budget = adset.get("lifetime_budget", "0")
-                    
-                    # Converter strings para float e depois para reais
-                    # Priorizar daily_budget, depois lifetime_budget
-                    if daily_budget and daily_budget != "0":
-                        total_budget += float(daily_budget) / 100  # Centavos para reais
-                    elif lifetime_budget and lifetime_budget != "0":
-                        total_budget += float(lifetime_budget) / 100  # Centavos para reais
+                adsets_edge = campaign.get("adsets") or {}
+                adsets = adsets_edge.get("data", []) + self._get_remaining_adsets(campaign_id, adsets_edge)
                 
-                # Arredondar para 2 casas decimais
-                campaign_budgets[campaign_id] = round(total_budget, 2)
+                total_budget = _sum_adset_budgets(adsets)
+                if not total_budget:
+                    # Campanhas com orçamento na própria campanha (CBO) não têm orçamento nos adsets
+                    total_budget = _sum_adset_budgets([campaign])
                 
-        except Exception as e:
-            print(f"Erro ao buscar orçamentos dos adsets: {e}")
-            # Em caso de erro, retornar dicionário vazio (orçamentos zerados)
-            
+                campaign_budgets[campaign_id] = total_budget
+                if pending_ids is not None:
+                    pending_ids.discard(campaign_id)
+            
+            after = _next_cursor(response)
+            if not after or pending_ids == set():
+                break
+            if pending_ids is None and max_campaigns and len(campaign_budgets) >= max_campaigns:
+                break
+            params = {**params, "after": after}
+        
         return campaign_budgets
     
-    def get_dashboard_summary(self) -> Dict[str, Any]:
-        """Buscar resumo para dashboard com dados agregados"""
+    def _get_remaining_adsets(self, campaign_id: str, adsets_edge: Dict[str, Any]) -> List[Dict]:
+        """Seguir a paginação do edge de adsets de uma campanha além da primeira página aninhada"""
+        remaining = []
+        after = _next_cursor(adsets_edge)
+        
+        while after:
+            response = self._make_request(f"{campaign_id}/adsets", {
+                "fields": "daily_budget,lifetime_budget",
+                "limit": BUDGET_ADSETS_LIMIT,
+                "after": after
+            })
+            if "error" in response:
+                logger.warning("Erro ao paginar adsets da campanha %s: %s", campaign_id, response['error'])
+                raise FacebookAPIError(response["error"])
+            remaining.extend(response.get("data", []))
+            after = _next_cursor(response)
+        
+        return remaining
+    
+    def _campaign_count(self, status: str) -> int:
+        """Total de campanhas com o status efetivo informado (só o summary, sem percorrer a listagem)"""
+        response = self._make_request(f"{self.account_prefix}/campaigns", {
+            "effective_status": json.dumps([status]), "fields": "id", "limit": 1, "summary": "total_count"
+        })
+        if "error" in response:
+            raise FacebookAPIError(response["error"])
+        return int((response.get("summary") or {}).get("total_count", 0))
+    
+    def _load_dashboard_campaigns(self) -> Dict[str, Any]:
+        """
+        Campanhas exibidas no dashboard e o total da conta, sem paginar a conta inteira
+        
+        Uma página com as primeiras DASHBOARD_CAMPAIGNS_SHOWN campanhas traz o total (summary=total_count);
+        as contagens de ativas e pausadas são seções próprias do dashboard (_campaign_count).
+        """
+        page = self._make_request(f"{self.account_prefix}/campaigns", {
+            "fields": CAMPAIGN_FIELDS, "limit": DASHBOARD_CAMPAIGNS_SHOWN, "summary": "total_count"
+        })
+        if "error" in page:
+            raise FacebookAPIError(page["error"])
+        
+        campaigns = page.get("data", [])
+        return {"data": campaigns, "total": int((page.get("summary") or {}).get("total_count", len(campaigns)))}
+    
+    def _run_dashboard_section(self, loader, use_cache_only: bool = False):
+        """Executar o carregamento de uma seção, opcionalmente servindo apenas do cache"""
+        if not use_cache_only:
+            return loader()
+        with self._cache_only():
+            return loader()
+    
+    def get_dashboard_summary(self, deadline: float = DASHBOARD_DEADLINE_SECONDS) -> Dict[str, Any]:
+        """
+        Buscar resumo para dashboard com dados agregados
+        
+        As seções independentes (conta, campanhas, contagens por status, insights e orçamentos) são buscadas
+        em paralelo sob um prazo único, uma chamada por seção. Uma seção que falha ou não responde a tempo é
+        servida do cache (mesmo expirado) ou vazia, e o resumo informa o estado de cada seção em
+        'sections_status' e 'partial'.
+        
+        Com httpx instalado as seções rodam no cliente assíncrono (HTTP/2, uma tarefa por seção); sem ele,
+        no pool de threads do dashboard.
+        """
+        async_service = self._async_service()
+        if async_service is not None:
+            from src.services.facebook_data_service_async import run_async
+            return run_async(async_service.get_dashboard_summary(deadline))
+        
+        loaders = {
+            "account_info": self.get_ad_account_info,
+            "campaigns": self._load_dashboard_campaigns,
+            "campaigns_active": lambda: self._campaign_count("ACTIVE"),
+            "campaigns_paused": lambda: self._campaign_count("PAUSED"),
+            "insights": self.get_account_insights_windows,
+            # Orçamentos das campanhas exibidas, sem esperar a listagem de campanhas
+            "budgets": lambda: self.get_campaign_budgets(max_campaigns=DASHBOARD_CAMPAIGNS_SHOWN)
+        }
+        empty = _empty_dashboard_sections()
+        
         try:
-            # Buscar informações da conta
-            account_info = self.get_ad_account_info()
-            
-            # Buscar campanhas ativas
-            campaigns_response = self.get_campaigns()
-            campaigns = campaigns_response.get("data", [])
-            
-            # Buscar insights da conta para os últimos 7 dias
-            account_insights = self.get_account_insights("last_7_days")
-            insights_data = account_insights.get("data", [{}])[0] if account_insights.get("data") else {}
-            
-            # Buscar insights para os últimos 30 dias para comparação
-            account_insights_30d = self.get_account_insights("last_30_days")
-            insights_30d = account_insights_30d.get("data", [{}])[0] if account_insights_30d.get("data") else {}
-            
-            # Contar campanhas por status
-            campaign_stats = {
-                "active": len([c for c in campaigns if c.get("status") == "ACTIVE"]),
-                "paused": len([c for c in campaigns if c.get("status") == "PAUSED"]),
-                "total": len(campaigns)
-            }
-            
-            # Calcular métricas derivadas se os dados básicos existirem
-            impressions_7d = int(insights_data.get("impressions", 0))
-            clicks_7d = int(insights_data.get("clicks", 0))
-            spend_7d = float(insights_data.get("spend", 0))
-            
-            # Calcular CTR, CPC e CPM se não estiverem disponíveis ou estiverem zerados
-            ctr_7d = float(insights_data.get("ctr", 0))
-            if ctr_7d == 0 and impressions_7d > 0 and clicks_7d > 0:
-                ctr_7d = (clicks_7d / impressions_7d) * 100
-            
-            cpc_7d = float(insights_data.get("cpc", 0))
-            if cpc_7d == 0 and clicks_7d > 0 and spend_7d > 0:
-                cpc_7d = spend_7d / clicks_7d
-            
-            cpm_7d = float(insights_data.get("cpm", 0))
-            if cpm_7d == 0 and impressions_7d > 0 and spend_7d > 0:
-                cpm_7d = (spend_7d / impressions_7d) * 1000
-            
-            # Fazer o mesmo para 30 dias
-            impressions_30d = int(insights_30d.get("impressions", 0))
-            clicks_30d = int(insights_30d.get("clicks", 0))
-            spend_30d = float(insights_30d.get("spend", 0))
-            
-            ctr_30d = float(insights_30d.get("ctr", 0))
-            if ctr_30d == 0 and impressions_30d > 0 and clicks_30d > 0:
-                ctr_30d = (clicks_30d / impressions_30d) * 100
-            
-            cpc_30d = float(insights_30d.get("cpc", 0))
-            if cpc_30d == 0 and clicks_30d > 0 and spend_30d > 0:
-                cpc_30d = spend_30d / clicks_30d
-            
-            cpm_30d = float(insights_30d.get("cpm", 0))
-            if cpm_30d == 0 and impressions_30d > 0 and spend_30d > 0:
-                cpm_30d = (spend_30d / impressions_30d) * 1000
-            
-            # Buscar orçamentos das campanhas através dos adsets
-            campaign_budgets = self.get_campaign_budgets(campaigns)
-            
-            # Adicionar orçamentos às campanhas
-            campaigns_with_budgets = []
-            for campaign in campaigns[:10]:  # Primeiras 10 campanhas
-                campaign_with_budget = campaign.copy()
-                campaign_id = campaign.get("id")
-                campaign_with_budget["budget"] = campaign_budgets.get(campaign_id, 0)
-                campaigns_with_budgets.append(campaign_with_budget)
-            
-            # Preparar resumo
-            summary = {
-                "account_info": {
-                    "id": account_info.get("id"),
-                    "name": account_info.get("name"),
-                    "currency": account_info.get("currency"),
-                    "business_name": account_info.get("business_name"),
-                    "status": account_info.get("account_status")
-                },
-                "campaign_stats": campaign_stats,
-                "performance_7d": {
-                    "impressions": impressions_7d,
-                    "clicks": clicks_7d,
-                    "spend": spend_7d,
-                    "ctr": round(ctr_7d, 2),
-                    "cpc": round(cpc_7d, 2),
-                    "cpm": round(cpm_7d, 2),
-                    "reach": int(insights_data.get("reach", 0))
-                },
-                "performance_30d": {
-                    "impressions": impressions_30d,
-                    "clicks": clicks_30d,
-                    "spend": spend_30d,
-                    "ctr": round(ctr_30d, 2),
-                    "cpc": round(cpc_30d, 2),
-                    "cpm": round(cpm_30d, 2),
-                    "reach": int(insights_30d.get("reach", 0))
-                },
-                "campaigns": campaigns_with_budgets,
-                "last_updated": datetime.now().isoformat()
+            futures = {
+                name: _dashboard_executor.submit(self._run_dashboard_section, loader)
+                for name, loader in loaders.items()
             }
-            
-            return {"success": True, "data": summary}
+            wait(futures.values(), timeout=deadline)
+            
+            results = {}
+            sections_status = {}
+            for name, future in futures.items():
+                failure = "timeout"
+                if future.done():
+                    try:
+                        result = future.result()
+                        if _is_section_result(result):
+                            results[name] = result
+                            sections_status[name] = "ok"
+                            continue
+                    except Exception as e:
+                        logger.warning("Erro ao carregar seção '%s' do dashboard: %s", name, e)
+                    failure = "error"
+                else:
+                    # A chamada continua em segundo plano e alimenta o cache para os próximos acessos
+                    future.cancel()
+                
+                try:
+                    cached = self._run_dashboard_section(loaders[name], use_cache_only=True)
+                except Exception:
+                    cached = None
+                if _is_section_result(cached):
+                    results[name] = cached
+                    sections_status[name] = "cached"
+                else:
+                    results[name] = empty[name]
+                    sections_status[name] = failure
+            
+            return {"success": True, "data": _assemble_dashboard_summary(results, sections_status)}
             
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -283,7 +887,7 @@ class FacebookDataService:
             # Buscar insights por dia
             endpoint = f"{self.account_prefix}/insights"
             params = {
-                "fields": "impressions,clicks,spend,ctr,cpc,date_start",
+                "fields": CHART_INSIGHTS_FIELDS,
                 "time_range": json.dumps({
                     "since": start_date.strftime("%Y-%m-%d"),
                     "until": end_date.strftime("%Y-%m-%d")
@@ -291,29 +895,23 @@ class FacebookDataService:
                 "time_increment": 1  # Dados diários
             }
             
-            response = self._make_request(endpoint, params)
+            since, until = start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+            if self._should_use_async_insights(since, until, time_increment=1):
+                response = self.run_async_insights_report(endpoint, params)
+            else:
+                # Seguir a paginação: a API devolve poucas linhas diárias por página
+                response = {"data": list(self._iter_items(endpoint, params))}
             
             if "data" in response:
-                chart_data = []
-                for day_data in response["data"]:
-                    chart_data.append({
-                        "date": day_data.get("date_start"),
-                        "impressions": int(day_data.get("impressions", 0)),
-                        "clicks": int(day_data.get("clicks", 0)),
-                        "spend": float(day_data.get("spend", 0)),
-                        "ctr": float(day_data.get("ctr", 0)),
-                        "cpc": float(day_data.get("cpc", 0))
-                    })
-                
-                return {"success": True, "data": chart_data}
+                return {"success": True, "data": _build_chart_points(response["data"])}
             else:
                 return {"success": False, "error": "Nenhum dado encontrado"}
                 
         except Exception as e:
             return {"success": False, "error": str(e)}
     
-    def _make_post_request(self, endpoint: str, data: dict = None) -> Dict[str, Any]:
-        """Fazer requisição POST para a Facebook API"""
+    def _make_post_request(self, endpoint: str, data: dict = None, invalidate_cache: bool = True) -> Dict[str, Any]:
+        """Fazer requisição POST para a Facebook API (escritas descartam o cache de leituras do token)"""
         url = f"{self.base_url}/{endpoint}"
         
         # Preparar dados para envio (form data como na documentação oficial)
@@ -327,36 +925,191 @@ class FacebookDataService:
         }
         
         try:
-            print(f"DEBUG: Fazendo POST para {url} com dados: {post_data}")
-            response = requests.post(url, data=post_data, headers=headers)
-            
-            print(f"DEBUG: Status Code: {response.status_code}")
-            print(f"DEBUG: Response Content: {response.text}")
+            # Corpo da requisição só é montado no log com DEBUG habilitado (o token é mascarado na saída)
+            logger.debug("POST %s com dados: %s", endpoint, data)
+            with timed(logger, "graph.post", endpoint=endpoint) as event:
+                response = self.http.post(url, data=post_data, headers=headers, usage_key=self.account_prefix)
+                event["status"] = response.status_code
             
             response.raise_for_status()
             
+            if invalidate_cache:
+                response_cache.invalidate_token(self.access_token)
+            
             # Verificar se a resposta tem conteúdo JSON
             if response.content:
                 try:
                     result = response.json()
-                    print(f"DEBUG: JSON Response: {result}")
+                    logger.debug("Resposta do POST %s: %s", endpoint, result)
                     return result
                 except json.JSONDecodeError:
                     # Se não conseguir decodificar JSON, assumir sucesso
-                    print("DEBUG: Não foi possível decodificar JSON, assumindo sucesso")
+                    logger.debug("Resposta do POST %s não é JSON, assumindo sucesso", endpoint)
                     return {"success": True}
             else:
                 # Se não há conteúdo, assumir sucesso
-                print("DEBUG: Resposta vazia, assumindo sucesso")
+                logger.debug("Resposta vazia do POST %s, assumindo sucesso", endpoint)
                 return {"success": True}
                 
         except requests.exceptions.RequestException as e:
-            print(f"Erro na requisição POST à Facebook API: {e}")
-            if hasattr(e, 'response') and e.response is not None:
-                print(f"DEBUG: Response Status: {e.response.status_code}")
-                print(f"DEBUG: Response Text: {e.response.text}")
+            # Falhas de conexão já constam do evento graph.post; aqui ficam as respostas de erro da API
+            response = getattr(e, 'response', None)
+            if response is not None:
+                log_event(logger, logging.WARNING, "graph.post_failed", endpoint=endpoint,
+                          status=response.status_code, error=e)
+                logger.debug("Corpo do erro do POST %s: %s", endpoint, response.text)
             return {"error": str(e)}
     
+    def batch_requests(self, requests_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Executar várias sub-requisições pela Graph API batch
+        
+        Args:
+            requests_list: Lista de sub-requisições no formato
+                {"method": "GET|POST|DELETE", "endpoint": "act_X/campaigns", "params": {...}, "name": "opcional",
+                 "depends_on": "opcional"}
+                Em GET/DELETE os params vão na query string; em POST vão no corpo. Sub-requisições nomeadas podem
+                ser referenciadas pelas seguintes com "{result=<nome>:$.id}".
+        
+        Returns:
+            Lista na mesma ordem das sub-requisições; cada item é o JSON da sub-resposta
+            ou {"error": ..., "status_code": ..., "error_code": ...} em caso de falha individual
+        """
+        results = []
+        
+        for start in range(0, len(requests_list), GRAPH_BATCH_LIMIT):
+            chunk = requests_list[start:start + GRAPH_BATCH_LIMIT]
+            batch_payload = [self._build_batch_item(item) for item in chunk]
+            
+            response = self._make_post_request("", {
+                "batch": json.dumps(batch_payload),
+                "include_headers": "false"
+            }, invalidate_cache=any(item["method"] != "GET" for item in batch_payload))
+            
+            if not isinstance(response, list):
+                # Falha da chamada inteira: propagar o erro para cada sub-requisição
+                error = response.get("error", "Resposta inválida da API batch") if isinstance(response, dict) else "Resposta inválida da API batch"
+                results.extend({"error": error} for _ in chunk)
+                continue
+            
+            results.extend(self._parse_batch_item(item) for item in response)
+            
+            # A API pode truncar a lista de respostas; completar para manter a ordem
+            for _ in range(len(chunk) - len(response)):
+                results.append({"error": "Sub-requisição sem resposta no batch"})
+        
+        return results
+    
+    def _build_batch_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Converter uma sub-requisição para o formato aceito pela Graph API batch"""
+        method = item.get("method", "GET").upper()
+        endpoint = item.get("endpoint", "").lstrip("/")
+        
+        params = {}
+        for key, value in (item.get("params") or {}).items():
+            params[key] = json.dumps(value) if isinstance(value, (dict, list)) else value
+        
+        batch_item = {"method": method}
+        if method == "POST":
+            batch_item["relative_url"] = endpoint
+            if params:
+                batch_item["body"] = urlencode(params)
+        else:
+            batch_item["relative_url"] = f"{endpoint}?{urlencode(params)}" if params else endpoint
+        
+        if item.get("name"):
+            batch_item["name"] = item["name"]
+            batch_item["omit_response_on_success"] = False
+        if item.get("depends_on"):
+            batch_item["depends_on"] = item["depends_on"]
+        
+        return batch_item
+    
+    def create_ad_chain(self, campaign: Dict[str, Any], adset: Dict[str, Any], creative: Dict[str, Any],
+                        ad: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Criar campanha, conjunto, criativo e anúncio em uma única chamada batch
+        
+        Cada etapa referencia o ID criado na anterior com "{result=<nome>:$.id}" e só executa se ela tiver
+        sucesso. Se alguma etapa falhar, a campanha (com o que houver abaixo dela) e o criativo criados são
+        apagados, para não deixar objetos órfãos na conta.
+        
+        Args:
+            campaign, adset, creative, ad: parâmetros da Graph API de cada objeto (valores em centavos);
+                os campos de ligação (campaign_id, adset_id, creative) são preenchidos aqui
+        
+        Returns:
+            Dict com os quatro IDs, ou com o erro, a etapa que falhou e se houve rollback
+        """
+        steps = ["campaign", "adset", "creative", "ad"]
+        chain = [
+            {"method": "POST", "endpoint": f"{self.account_prefix}/campaigns", "name": "campaign",
+             "params": campaign},
+            {"method": "POST", "endpoint": f"{self.account_prefix}/adsets", "name": "adset",
+             "params": {**adset, "campaign_id": "{result=campaign:$.id}"}},
+            {"method": "POST", "endpoint": f"{self.account_prefix}/adcreatives", "name": "creative",
+             "depends_on": "adset", "params": creative},
+            {"method": "POST", "endpoint": f"{self.account_prefix}/ads", "name": "ad",
+             "params": {**ad, "adset_id": "{result=adset:$.id}", "creative": {"creative_id": "{result=creative:$.id}"}}},
+        ]
+        
+        results = self.batch_requests(chain)
+        created = {step: result.get("id") for step, result in zip(steps, results) if result.get("id")}
+        
+        if len(created) == len(steps):
+            return {
+                "success": True,
+                "campaign_id": created["campaign"],
+                "adset_id": created["adset"],
+                "creative_id": created["creative"],
+                "ad_id": created["ad"]
+            }
+        
+        failed_step, failure = next(
+            ((step, result) for step, result in zip(steps, results) if "error" in result),
+            (None, {"error": "Resposta incompleta da API batch"})
+        )
+        error = failure["error"]
+        logger.warning("Erro na criação encadeada do anúncio (etapa '%s'): %s", failed_step, error)
+        
+        # Apagar a campanha remove também o conjunto e o anúncio; o criativo pertence à conta e é apagado à parte
+        rollback = [{"method": "DELETE", "endpoint": created[step]} for step in ("campaign", "creative") if step in created]
+        rolled_back = all("error" not in result for result in self.batch_requests(rollback)) if rollback else True
+        if not rolled_back:
+            logger.error("Falha ao desfazer objetos criados parcialmente: %s", created)
+        
+        return {
+            "success": False,
+            "error": error,
+            "failed_step": failed_step,
+            "status_code": failure.get("status_code"),
+            "rolled_back": rolled_back,
+            "orphaned": {} if rolled_back else created
+        }
+    
+    @staticmethod
+    def _parse_batch_item(item: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Decodificar uma sub-resposta do batch (a API retorna null quando a sub-requisição não executou)"""
+        if not item:
+            return {"error": "Sub-requisição não executada (timeout ou dependência com falha)"}
+        
+        status_code = item.get("code", 0)
+        try:
+            body = json.loads(item.get("body") or "{}")
+        except json.JSONDecodeError:
+            body = {"raw": item.get("body")}
+        
+        if status_code >= 400 or (isinstance(body, dict) and "error" in body):
+            error = body.get("error", {}) if isinstance(body, dict) else {}
+            message = error.get("message", f"Erro HTTP {status_code}") if isinstance(error, dict) else str(error)
+            return {
+                "error": message,
+                "status_code": status_code,
+                "error_code": error.get("code") if isinstance(error, dict) else None
+            }
+        
+        return body if isinstance(body, dict) else {"data": body}
+    
     def pause_campaign(self, campaign_id: str) -> Dict[str, Any]:
         """Pausar uma campanha específica"""
         endpoint = campaign_id
@@ -403,7 +1156,12 @@ class FacebookDataService:
             return {"success": False, "error": f"Status inválido: {current_status}"}
 
     def get_campaign_details(self, campaign_id: str) -> Dict[str, Any]:
-        """Buscar detalhes completos de uma campanha para edição"""
+        """Buscar detalhes completos de uma campanha para edição (campanha, adsets e anúncios em paralelo com httpx)"""
+        async_service = self._async_service()
+        if async_service is not None:
+            from src.services.facebook_data_service_async import run_async
+            return run_async(async_service.get_campaign_details(campaign_id))
+        
         try:
             # Buscar dados básicos da campanha
             campaign_fields = [
@@ -518,8 +1276,6 @@ class FacebookDataService:
             Dict com lista de páginas REAIS e seus access_tokens
         """
         try:
-            print("🔍 DEBUG: Iniciando busca de páginas disponíveis...")
-            
             # Endpoint correto para buscar páginas do usuário
             url = f"{self.base_url}/me/accounts"
             
@@ -529,14 +1285,8 @@ class FacebookDataService:
                 "fields": "id,name,access_token,category,category_list,tasks"
             }
             
-            print(f"🔍 DEBUG: URL: {url}")
-            print(f"🔍 DEBUG: Campos solicitados: {params['fields']}")
-            print(f"🔍 DEBUG: Usando token de usuário: {self.access_token[:20]}...")
-            
             # Fazer requisição
-            response = requests.get(url, params=params, timeout=30)
-            
-            print(f"📥 DEBUG: Status da resposta: {response.status_code}")
+            response = self.http.get(url, params=params, timeout=30)
             
             # Verificar se a requisição foi bem-sucedida
             response.raise_for_status()
@@ -545,15 +1295,12 @@ class FacebookDataService:
             data = response.json()
             pages = data.get('data', [])
             
-            print(f"📊 DEBUG: {len(pages)} páginas REAIS encontradas")
-            
-            # Log das páginas encontradas
-            for i, page in enumerate(pages, 1):
-                page_name = page.get('name', 'Sem nome')
-                page_id = page.get('id', 'Sem ID')
-                category = page.get('category', 'Sem categoria')
-                has_token = 'Sim' if page.get('access_token') else 'Não'
-                print(f"  📄 Página REAL {i}: {page_name} (ID: {page_id}) - Categoria: {category} - Token: {has_token}")
+            log_event(logger, logging.INFO, "facebook.pages_loaded", total=len(pages),
+                      without_token=sum(1 for page in pages if not page.get('access_token')))
+            if logger.isEnabledFor(logging.DEBUG):
+                for page in pages:
+                    logger.debug("Página %s (ID: %s) - Categoria: %s", page.get('name'), page.get('id'),
+                                 page.get('category'))
             
             # Verificar se encontrou páginas reais
             if not pages:
@@ -575,15 +1322,14 @@ class FacebookDataService:
         except requests.exceptions.HTTPError as e:
             # Erro HTTP (4xx, 5xx)
             error_msg = f'Erro HTTP na Graph API: {e.response.status_code}'
-            print(f"❌ DEBUG: {error_msg}")
             
             try:
                 error_data = e.response.json()
                 if 'error' in error_data:
                     error_msg += f" - {error_data['error'].get('message', 'Erro desconhecido')}"
-                    print(f"❌ DEBUG: Detalhes do erro: {error_data['error']}")
             except:
                 pass
+            logger.warning(error_msg)
                 
             return {
                 "success": False,
@@ -595,7 +1341,7 @@ class FacebookDataService:
         except requests.exceptions.Timeout:
             # Timeout
             error_msg = 'Timeout na requisição à Graph API'
-            print(f"⏰ DEBUG: {error_msg}")
+            logger.warning(error_msg)
             
             return {
                 "success": False,
@@ -607,7 +1353,7 @@ class FacebookDataService:
         except requests.exceptions.RequestException as e:
             # Outros erros de requisição
             error_msg = f'Erro de conexão com a Graph API: {str(e)}'
-            print(f"🌐 DEBUG: {error_msg}")
+            logger.warning(error_msg)
             
             return {
                 "success": False,
@@ -619,9 +1365,7 @@ class FacebookDataService:
         except Exception as e:
             # Erro geral
             error_msg = f'Erro interno ao buscar páginas: {str(e)}'
-            print(f"💥 DEBUG: {error_msg}")
-            import traceback
-            print(f"💥 DEBUG: Traceback: {traceback.format_exc()}")
+            logger.exception(error_msg)
             
             return {
                 "success": False,
@@ -630,7 +1374,8 @@ class FacebookDataService:
                 "total": 0
             }
     
-    def get_publicacoes_pagina(self, pagina_id: str, token_pagina: str = None, limit: int = 20) -> Dict[str, Any]:
+    def get_publicacoes_pagina(self, pagina_id: str, token_pagina: str = None, limit: int = 20,
+                               _retry_auth: bool = True) -> Dict[str, Any]:
         """
         Buscar publicações de uma página específica usando o fluxo correto da Graph API
         
@@ -646,69 +1391,30 @@ class FacebookDataService:
             Dict com lista de publicações da página COM THUMBNAILS
         """
         try:
-            print(f"🔍 DEBUG: Iniciando busca de publicações para página {pagina_id}")
-            
-            # Se token da página não foi fornecido, buscar via get_paginas_disponiveis
+            # Se token da página não foi fornecido, usar o cache de tokens (carregado via /me/accounts)
+            token_from_cache = not token_pagina
             if not token_pagina:
-                print("🔍 DEBUG: Token da página não fornecido, buscando via /me/accounts...")
-                
-                pages_response = self.get_paginas_disponiveis()
-                
-                if not pages_response.get('success'):
-                    return {
-                        "success": False,
-                        "error": f"Erro ao buscar páginas: {pages_response.get('error')}",
-                        "data": [],
-                        "total": 0
-                    }
-                
-                # Encontrar a página específica
-                target_page = None
-                for page in pages_response.get('data', []):
-                    if page.get('id') == pagina_id:
-                        target_page = page
-                        break
-                
-                if not target_page:
-                    return {
-                        "success": False,
-                        "error": f"Página {pagina_id} não encontrada nas páginas disponíveis",
-                        "data": [],
-                        "total": 0
-                    }
-                
-                token_pagina = target_page.get('access_token')
+                token_pagina = self.get_page_access_token(pagina_id)
                 if not token_pagina:
                     return {
                         "success": False,
-                        "error": f"Token de acesso não encontrado para a página {pagina_id}",
+                        "error": f"Página {pagina_id} não encontrada nas páginas disponíveis ou sem token de acesso",
                         "data": [],
                         "total": 0
                     }
-                
-                print(f"✅ DEBUG: Token da página obtido com sucesso")
-            
-            # Buscar publicações usando o token da página
-            print(f"📝 DEBUG: Buscando publicações usando token da página...")
             
             # URL da Graph API para buscar posts da página
             url = f"{self.base_url}/{pagina_id}/posts"
             
-            # Parâmetros da requisição - USAR TOKEN DA PÁGINA
+            # Imagem, link e anexos vêm na mesma chamada (expansão de campos), sem requisições por post
             params = {
                 'access_token': token_pagina,  # 🎯 SACADA: Token específico da página
-                'fields': 'id,message,created_time',  # Campos básicos que funcionam
+                'fields': PAGE_POST_FIELDS,
                 'limit': limit
             }
             
-            print(f"🔍 DEBUG: URL: {url}")
-            print(f"🔍 DEBUG: Campos solicitados: {params['fields']}")
-            print(f"🔍 DEBUG: Usando token da página: {token_pagina[:20]}...")
-            
             # Fazer requisição para a Graph API
-            response = requests.get(url, params=params, timeout=30)
-            
-            print(f"📥 DEBUG: Status da resposta: {response.status_code}")
+            response = self.http.get(url, params=params, timeout=30)
             
             # Verificar se a requisição foi bem-sucedida
             response.raise_for_status()
@@ -717,83 +1423,32 @@ class FacebookDataService:
             data = response.json()
             posts = data.get('data', [])
             
-            print(f"📊 DEBUG: {len(posts)} publicações encontradas")
-            
             # Estruturar dados para o frontend
-            structured_posts = []
+            structured_posts = [_structure_page_post(post) for post in posts]
             
-            for i, post in enumerate(posts, 1):
-                post_id = post.get('id', '')
-                
-                # Estruturar cada post com dados básicos
-                structured_post = {
-                    'id': post_id,
-                    'message': post.get('message', ''),
-                    'created_time': post.get('created_time', ''),
-                    'full_picture': '',  # Será preenchido abaixo
-                    'permalink_url': f"https://www.facebook.com/{post_id}",  # URL construída
-                    'type': 'status',  # Tipo padrão
-                    'platform': 'facebook',
-                    'platform_name': 'Facebook',
-                    'icon': '📘'
-                }
-                
-                # 🖼️ BUSCAR THUMBNAIL DA IMAGEM (método seguro)
-                print(f"🖼️ DEBUG: Buscando thumbnail para post {i}...")
-                
-                try:
-                    # Método 1: Tentar buscar object_id (para fotos)
-                    object_url = f"{self.base_url}/{post_id}"
-                    object_params = {
-                        'access_token': token_pagina,
-                        'fields': 'object_id'
-                    }
-                    
-                    object_response = requests.get(object_url, params=object_params, timeout=5)
-                    
-                    if object_response.status_code == 200:
-                        object_data = object_response.json()
-                        object_id = object_data.get('object_id')
-                        
-                        if object_id:
-                            # Se tem object_id, é uma foto - construir URL da thumbnail
-                            thumbnail_url = f"https://graph.facebook.com/v23.0/{object_id}/picture?access_token={token_pagina}&type=normal"
-                            structured_post['full_picture'] = thumbnail_url
-                            print(f"  ✅ Thumbnail encontrada via object_id: {object_id}")
-                        else:
-                            # Método 2: Tentar buscar via endpoint de picture do post
-                            picture_url = f"https://graph.facebook.com/v23.0/{post_id}/picture?access_token={token_pagina}&redirect=false"
-                            
-                            picture_response = requests.get(picture_url, timeout=5)
-                            if picture_response.status_code == 200:
-                                picture_data = picture_response.json()
-                                if picture_data.get('data', {}).get('url'):
-                                    structured_post['full_picture'] = picture_data['data']['url']
-                                    print(f"  ✅ Thumbnail encontrada via picture endpoint")
-                                else:
-                                    print(f"  ℹ️ Post sem imagem")
-                            else:
-                                print(f"  ℹ️ Post sem imagem (picture endpoint)")
-                    else:
-                        print(f"  ℹ️ Post sem object_id")
-                        
-                except Exception as img_error:
-                    # Se falhar na busca de imagem, continuar sem imagem (não é crítico)
-                    print(f"  ⚠️ Erro ao buscar imagem: {str(img_error)}")
-                    pass
-                
-                # Adicionar à lista
-                structured_posts.append(structured_post)
-                
-                # Log do post para debug
-                message_preview = structured_post['message'][:50] if structured_post['message'] else 'Sem texto'
-                created_date = structured_post['created_time'][:10] if structured_post['created_time'] else 'Data desconhecida'
-                has_image = "✅ Sim" if structured_post['full_picture'] else "❌ Não"
-                
-                print(f"  📝 Post {i}: {message_preview}...")
-                print(f"     📅 Data: {created_date}")
-                print(f"     🆔 ID: {post_id}")
-                print(f"     🖼️ Imagem: {has_image}")
+            # Fallback concorrente apenas para posts com anexo mas sem imagem na resposta expandida
+            missing_media = [
+                structured_post for structured_post, post in zip(structured_posts, posts)
+                if not structured_post['full_picture'] and (post.get('attachments') or {}).get('data')
+            ]
+            if missing_media:
+                pictures = _post_media_executor.map(
+                    lambda structured_post: self._get_post_picture_url(structured_post['id'], token_pagina),
+                    missing_media
+                )
+                for structured_post, picture_url in zip(missing_media, pictures):
+                    structured_post['full_picture'] = picture_url or ''
+            
+            # As imagens passam pelo proxy de mídia: o navegador não busca direto do Facebook
+            proxied = media_proxy.proxy_urls([
+                (f"fb:{structured_post['id']}", structured_post['full_picture']) for structured_post in structured_posts
+            ])
+            for structured_post, picture_url in zip(structured_posts, proxied):
+                structured_post['full_picture'] = picture_url
+            
+            log_event(logger, logging.DEBUG, "facebook.page_posts_loaded", page_id=pagina_id,
+                      total=len(structured_posts), fallback=len(missing_media),
+                      with_image=sum(1 for structured_post in structured_posts if structured_post['full_picture']))
             
             # Retornar resposta estruturada
             return {
@@ -805,17 +1460,21 @@ class FacebookDataService:
             }
             
         except requests.exceptions.HTTPError as e:
+            # Token de página em cache revogado ou expirado: invalidar e tentar uma vez com token novo
+            if token_from_cache and _retry_auth and self._is_auth_error(e.response):
+                page_token_cache.invalidate(self.access_token, pagina_id)
+                return self.get_publicacoes_pagina(pagina_id, None, limit, _retry_auth=False)
+            
             # Erro HTTP (4xx, 5xx)
             error_msg = f'Erro HTTP na Graph API: {e.response.status_code}'
-            print(f"❌ DEBUG: {error_msg}")
             
             try:
                 error_data = e.response.json()
                 if 'error' in error_data:
                     error_msg += f" - {error_data['error'].get('message', 'Erro desconhecido')}"
-                    print(f"❌ DEBUG: Detalhes do erro: {error_data['error']}")
             except:
                 pass
+            logger.warning(error_msg)
                 
             return {
                 'success': False,
@@ -827,7 +1486,7 @@ class FacebookDataService:
         except requests.exceptions.Timeout:
             # Timeout
             error_msg = 'Timeout na requisição à Graph API'
-            print(f"⏰ DEBUG: {error_msg}")
+            logger.warning(error_msg)
             
             return {
                 'success': False,
@@ -839,7 +1498,7 @@ class FacebookDataService:
         except requests.exceptions.RequestException as e:
             # Outros erros de requisição
             error_msg = f'Erro de conexão com a Graph API: {str(e)}'
-            print(f"🌐 DEBUG: {error_msg}")
+            logger.warning(error_msg)
             
             return {
                 'success': False,
@@ -851,9 +1510,7 @@ class FacebookDataService:
         except Exception as e:
             # Erro geral
             error_msg = f'Erro interno ao buscar publicações: {str(e)}'
-            print(f"💥 DEBUG: {error_msg}")
-            import traceback
-            print(f"💥 DEBUG: Traceback: {traceback.format_exc()}")
+            logger.exception(error_msg)
             
             return {
                 'success': False,
@@ -862,6 +1519,60 @@ class FacebookDataService:
                 'total': 0
             }
 
+    def get_page_access_token(self, page_id: str) -> Optional[str]:
+        """Token de acesso da página, servido do cache de tokens (renovado perto da expiração)"""
+        return page_token_cache.get(self.access_token, page_id, self._load_page_tokens)
+    
+    def _load_page_tokens(self) -> Dict[str, Any]:
+        """Carregar os tokens de todas as páginas do usuário (/me/accounts) e a validade via /debug_token"""
+        tokens = {}
+        params = {"access_token": self.access_token, "fields": "id,access_token", "limit": 100}
+        
+        while True:
+            response = self.http.get(f"{self.base_url}/me/accounts", params=params, timeout=30)
+            response.raise_for_status()
+            page = response.json()
+            tokens.update({item.get("id"): item.get("access_token") for item in page.get("data", [])})
+            
+            after = _next_cursor(page)
+            if not after:
+                break
+            params = {**params, "after": after}
+        
+        # Tokens de página herdam a validade do token de usuário de onde foram derivados
+        try:
+            debug = self.http.get(f"{self.base_url}/debug_token",
+                                  params={"input_token": self.access_token, "access_token": self.access_token},
+                                  timeout=10)
+            debug.raise_for_status()
+            expires_at = token_expiry(debug.json().get("data") or {})
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.warning("Não foi possível consultar a validade do token: %s", e)
+            expires_at = token_expiry({})
+        
+        return {"tokens": tokens, "expires_at": expires_at}
+    
+    @staticmethod
+    def _is_auth_error(response) -> bool:
+        """Verificar se a resposta é um erro de token inválido/expirado (códigos 190/102)"""
+        try:
+            return (response.json().get("error") or {}).get("code") in AUTH_ERROR_CODES
+        except (AttributeError, ValueError):
+            return False
+    
+    def _get_post_picture_url(self, post_id: str, token_pagina: str) -> Optional[str]:
+        """Buscar a URL (CDN) da imagem de um post via /picture, sem expor o token na URL retornada"""
+        try:
+            response = self.http.get(f"{self.base_url}/{post_id}/picture",
+                                     params={'access_token': token_pagina, 'redirect': 'false', 'type': 'normal'},
+                                     timeout=5)
+            if response.status_code != 200:
+                return None
+            return (response.json().get('data') or {}).get('url')
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.warning("Erro ao buscar imagem do post %s: %s", post_id, e)
+            return None
+    
     # ===== MÉTODOS PARA CRIAÇÃO DE ANÚNCIOS =====
     
     def get_business_managers(self) -> Dict[str, Any]:
@@ -891,21 +1602,22 @@ class FacebookDataService:
                 "error": str(e)
             }
     
-    def get_ad_creatives(self, limit: int = 50) -> Dict[str, Any]:
-        """Buscar criativos de anúncios"""
+    def get_ad_creatives(self, limit: int = 50, after: str = None) -> Dict[str, Any]:
+        """Buscar uma página de criativos de anúncios"""
         try:
             endpoint = f"{self.account_prefix}/adcreatives"
             params = {
-                "fields": "id,name,status,object_story_spec,image_url,video_id,thumbnail_url",
+                "fields": AD_CREATIVE_FIELDS,
                 "limit": limit
             }
             
-            result = self._make_request(endpoint, params)
+            result = self._make_request(endpoint, self._page_params(params, after))
             
             if "data" in result:
                 return {
                     "success": True,
-                    "creatives": result["data"]
+                    "creatives": result["data"],
+                    "next_cursor": _next_cursor(result)
                 }
             else:
                 return {
@@ -919,6 +1631,11 @@ class FacebookDataService:
                 "error": str(e)
             }
     
+    def iter_ad_creatives(self, page_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """Percorrer todos os criativos da conta, página a página"""
+        endpoint = f"{self.account_prefix}/adcreatives"
+        return self._iter_items(endpoint, {"fields": AD_CREATIVE_FIELDS, "limit": page_size})
+    
     def create_campaign(self, campaign_data: Dict[str, Any]) -> Dict[str, Any]:
         """Criar uma nova campanha"""
         try:
@@ -1076,36 +1793,28 @@ class FacebookDataService:
             }
     
     def upload_image(self, image_path: str, image_name: str = None) -> Dict[str, Any]:
-        """Fazer upload de uma imagem para a biblioteca de anúncios"""
+        """
+        Fazer upload de uma imagem para a biblioteca de anúncios
+        
+        Arquivos com conteúdo idêntico a um já enviado para a conta reutilizam o image_hash registrado
+        (índice local por SHA-256), sem novo upload.
+        """
         try:
-            endpoint = f"{self.account_prefix}/adimages"
-            
-            # Preparar dados para upload
-            files = {
-                'filename': (image_name or 'uploaded_image.jpg', open(image_path, 'rb'), 'image/jpeg')
-            }
+            sha256 = file_sha256(image_path)
             
-            data = {
-                'access_token': self.access_token
-            }
-            
-            url = f"{self.base_url}/{endpoint}"
-            response = requests.post(url, files=files, data=data)
-            
-            if response.status_code == 200:
-                result = response.json()
-                if 'images' in result:
-                    image_hash = list(result['images'].keys())[0]
-                    return {
-                        "success": True,
-                        "image_hash": image_hash,
-                        "message": "Imagem enviada com sucesso"
-                    }
+            cached = ad_image_index.lookup(self.account_prefix, sha256)
+            if cached:
+                return {
+                    "success": True,
+                    "image_hash": cached["image_hash"],
+                    "image_url": cached["image_url"],
+                    "reused": True,
+                    "message": "Imagem já enviada anteriormente; image_hash reutilizado"
+                }
             
-            return {
-                "success": False,
-                "error": "Erro ao fazer upload da imagem"
-            }
+            # Envios simultâneos do mesmo arquivo para a mesma conta compartilham um único upload
+            return single_flight.do(f"adimage:{self.account_prefix}:{sha256}",
+                                    lambda: self._upload_image_file(image_path, image_name, sha256))
                 
         except Exception as e:
             return {
@@ -1113,19 +1822,67 @@ class FacebookDataService:
                 "error": str(e)
             }
     
-    def get_targeting_options(self, targeting_type: str, query: str = None) -> Dict[str, Any]:
-        """Buscar opções de segmentação (interesses, comportamentos, etc.)"""
+    def _upload_image_file(self, image_path: str, image_name: Optional[str], sha256: str) -> Dict[str, Any]:
+        """Enviar o arquivo para /adimages em streaming e registrar o image_hash no índice"""
+        endpoint = f"{self.account_prefix}/adimages"
+        filename = image_name or os.path.basename(image_path)
+        
+        body = MultipartFileStream(
+            fields={'access_token': self.access_token},
+            file_field='filename',
+            path=image_path,
+            filename=filename,
+            content_type=guess_content_type(filename)
+        )
+        
+        url = f"{self.base_url}/{endpoint}"
+        response = self.http.post(url, data=body, headers={'Content-Type': body.content_type},
+                                  usage_key=self.account_prefix)
+        
+        if response.status_code == 200:
+            result = response.json()
+            # 'images' vem indexado pelo nome do arquivo: {"<nome>": {"hash": ..., "url": ...}}
+            image = next(iter((result.get('images') or {}).values()), None)
+            if image and image.get('hash'):
+                ad_image_index.store(self.account_prefix, sha256, image['hash'], image.get('url'))
+                return {
+                    "success": True,
+                    "image_hash": image['hash'],
+                    "image_url": image.get('url'),
+                    "reused": False,
+                    "message": "Imagem enviada com sucesso"
+                }
+        
+        return {
+            "success": False,
+            "error": "Erro ao fazer upload da imagem"
+        }
+    
+    def _search_loader(self, params: dict):
+        """Loader do índice de autocomplete: consulta /search com o termo e o limite pedidos"""
+        def load(query: str, limit: int) -> List[Dict[str, Any]]:
+            result = self._make_request("search", {**params, "q": query, "limit": limit})
+            if "error" in result:
+                raise FacebookAPIError(result["error"])
+            return result.get("data", [])
+        return load
+    
+    def get_targeting_options(self, targeting_type: str, query: str = None, locale: str = None) -> Dict[str, Any]:
+        """Buscar opções de segmentação (interesses, comportamentos, etc.), com autocomplete local por prefixo"""
         try:
             endpoint = "search"
             params = {
                 "type": targeting_type,  # interests, behaviors, demographics, etc.
                 "class": "adTargetingCategory"
             }
+            if locale:
+                params["locale"] = locale
             
             if query:
-                params["q"] = query
-            
-            result = self._make_request(endpoint, params)
+                scope = ("targeting", targeting_type, locale)
+                result = targeting_index.search(scope, query, self._search_loader(params))
+            else:
+                result = self._make_request(endpoint, params)
             
             if "data" in result:
                 return {
@@ -1144,19 +1901,21 @@ class FacebookDataService:
                 "error": str(e)
             }
     
-    def get_location_targeting(self, query: str, location_types: List[str] = None) -> Dict[str, Any]:
-        """Buscar opções de segmentação geográfica"""
+    def get_location_targeting(self, query: str, location_types: List[str] = None,
+                               locale: str = None) -> Dict[str, Any]:
+        """Buscar opções de segmentação geográfica, com autocomplete local por prefixo"""
         try:
-            endpoint = "search"
             params = {
-                "type": "adgeolocation",
-                "q": query
+                "type": "adgeolocation"
             }
             
             if location_types:
                 params["location_types"] = json.dumps(location_types)
+            if locale:
+                params["locale"] = locale
             
-            result = self._make_request(endpoint, params)
+            scope = ("adgeolocation", tuple(sorted(location_types or [])), locale)
+            result = targeting_index.search(scope, query, self._search_loader(params))
             
             if "data" in result:
                 return {
@@ -1195,7 +1954,7 @@ class FacebookDataService:
                 'limit': limit
             }
             
-            response = requests.get(url, params=params)
+            response = self.http.get(url, params=params)
             response.raise_for_status()
             
             data = response.json()
@@ -1239,112 +1998,91 @@ class FacebookDataService:
             }
             
         except requests.exceptions.RequestException as e:
-            print(f"Erro ao buscar posts da página {page_id}: {e}")
+            logger.warning("Erro ao buscar posts da página %s: %s", page_id, e)
             return {
                 'success': False,
                 'error': f'Erro na API do Facebook: {str(e)}',
                 'posts': []
             }
         except Exception as e:
-            print(f"Erro inesperado ao buscar posts: {e}")
+            logger.exception("Erro inesperado ao buscar posts: %s", e)
             return {
                 'success': False,
                 'error': f'Erro interno: {str(e)}',
                 'posts': []
             }
 
-    def get_instagram_posts(self, page_id: str, limit: int = 20) -> Dict[str, Any]:
+    def get_instagram_business_account(self, page_id: str) -> Optional[str]:
+        """
+        ID da conta comercial do Instagram vinculada à página (vínculo em cache por INSTAGRAM_ACCOUNT_TTL)
+        
+        Raises:
+            FacebookAPIError: se a consulta à página falhar
+        """
+        result = self._make_request(page_id, {"fields": "instagram_business_account"}, ttl=INSTAGRAM_ACCOUNT_TTL)
+        if "error" in result:
+            raise FacebookAPIError(result["error"])
+        return (result.get("instagram_business_account") or {}).get("id")
+    
+    def iter_instagram_media(self, instagram_account_id: str, page_size: int = 50) -> Iterator[Dict[str, Any]]:
+        """Percorrer todas as mídias da conta do Instagram, página a página, com os carrosséis já expandidos"""
+        endpoint = f"{instagram_account_id}/media"
+        return self._iter_items(endpoint, {"fields": INSTAGRAM_MEDIA_FIELDS, "limit": page_size})
+    
+    def get_instagram_posts(self, page_id: str, limit: int = 20, after: str = None) -> Dict[str, Any]:
         """
-        Buscar publicações do Instagram conectado a uma página do Facebook
+        Buscar uma página de publicações do Instagram conectado a uma página do Facebook
         
         Args:
             page_id: ID da página do Facebook
             limit: Número máximo de posts a retornar
+            after: Cursor da página seguinte (retornado em 'next_cursor')
             
         Returns:
-            Dict com lista de posts do Instagram e metadados
+            Dict com lista de posts do Instagram, cursor da próxima página e metadados
         """
         try:
-            # Primeiro, buscar a conta do Instagram conectada à página
-            url = f"https://graph.facebook.com/v18.0/{page_id}"
-            params = {
-                'access_token': self.access_token,
-                'fields': 'instagram_business_account'
-            }
+            instagram_account_id = self.get_instagram_business_account(page_id)
             
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            
-            page_data = response.json()
-            instagram_account = page_data.get('instagram_business_account')
-            
-            if not instagram_account:
+            if not instagram_account_id:
                 return {
                     'success': False,
                     'error': 'Esta página não tem uma conta do Instagram conectada',
                     'posts': []
                 }
             
-            instagram_account_id = instagram_account['id']
-            
-            # Buscar posts do Instagram
-            url = f"https://graph.facebook.com/v18.0/{instagram_account_id}/media"
+            endpoint = f"{instagram_account_id}/media"
             params = {
-                'access_token': self.access_token,
-                'fields': 'id,caption,media_type,media_url,thumbnail_url,timestamp,like_count,comments_count',
+                'fields': INSTAGRAM_MEDIA_FIELDS,
                 'limit': limit
             }
             
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            posts = data.get('data', [])
+            data = self._make_request(endpoint, self._page_params(params, after))
+            if "error" in data:
+                raise FacebookAPIError(data["error"])
             
             # Formatar posts para o frontend
-            formatted_posts = []
-            for post in posts:
-                formatted_post = {
-                    'id': post.get('id'),
-                    'message': post.get('caption', ''),
-                    'created_time': post.get('timestamp'),
-                    'engagement': {
-                        'likes': post.get('like_count', 0),
-                        'comments': post.get('comments_count', 0),
-                        'shares': 0  # Instagram não tem shares públicos
-                    }
-                }
-                
-                # Adicionar mídia
-                media_type = post.get('media_type', '').lower()
-                if media_type in ['image', 'carousel_album']:
-                    formatted_post['media'] = {
-                        'type': 'image',
-                        'url': post.get('media_url', '')
-                    }
-                elif media_type == 'video':
-                    formatted_post['media'] = {
-                        'type': 'video',
-                        'url': post.get('thumbnail_url', post.get('media_url', ''))
-                    }
-                
-                formatted_posts.append(formatted_post)
+            formatted_posts = [_structure_instagram_media(media) for media in data.get('data', [])]
+            _proxy_instagram_media(formatted_posts)
+            next_cursor = _next_cursor(data)
             
             return {
                 'success': True,
                 'posts': formatted_posts,
-                'total': len(formatted_posts)
+                'total': len(formatted_posts),
+                'next_cursor': next_cursor,
+                'has_more': next_cursor is not None
             }
             
-        except requests.exceptions.RequestException as e:
-            print(f"Erro ao buscar posts do Instagram para página {page_id}: {e}")
+        except FacebookAPIError as e:
+            logger.warning("Erro ao buscar posts do Instagram para página %s: %s", page_id, e)
             return {
                 'success': False,
                 'error': f'Erro na API do Facebook/Instagram: {str(e)}',
                 'posts': []
             }
         except Exception as e:
-            print(f"Erro inesperado ao buscar posts do Instagram: {e}")
+            logger.exception("Erro inesperado ao buscar posts do Instagram: %s", e)
             return {
                 'success': False,
                 'error': f'Erro interno: {str(e)}',
@@ -1367,87 +2105,56 @@ class FacebookDataService:
             budget = ad_data['budget']
             target_audience = ad_data['target_audience']
             
-            # 1. Criar campanha
-            campaign_data = {
-                'name': campaign_name,
-                'objective': 'REACH',  # ou outro objetivo baseado no tipo de post
-                'status': 'PAUSED',
-                'access_token': self.access_token
-            }
-            
-            campaign_url = f"https://graph.facebook.com/v18.0/act_{self.ad_account_id}/campaigns"
-            campaign_response = requests.post(campaign_url, data=campaign_data)
-            campaign_response.raise_for_status()
-            
-            campaign_result = campaign_response.json()
-            campaign_id = campaign_result['id']
-            
-            # 2. Criar conjunto de anúncios
-            adset_data = {
-                'name': f"{campaign_name} - Conjunto",
-                'campaign_id': campaign_id,
-                'daily_budget': int(float(budget) * 100),  # Converter para centavos
-                'billing_event': 'IMPRESSIONS',
-                'optimization_goal': 'REACH',
-                'bid_amount': 100,  # Valor em centavos
-                'targeting': json.dumps(target_audience),
-                'status': 'PAUSED',
-                'access_token': self.access_token
-            }
-            
-            adset_url = f"https://graph.facebook.com/v18.0/act_{self.ad_account_id}/adsets"
-            adset_response = requests.post(adset_url, data=adset_data)
-            adset_response.raise_for_status()
-            
-            adset_result = adset_response.json()
-            adset_id = adset_result['id']
-            
-            # 3. Criar criativo usando o post existente
-            creative_data = {
-                'name': f"{campaign_name} - Criativo",
-                'object_story_id': post_id,  # Usar o post existente
-                'access_token': self.access_token
-            }
-            
-            creative_url = f"https://graph.facebook.com/v18.0/act_{self.ad_account_id}/adcreatives"
-            creative_response = requests.post(creative_url, data=creative_data)
-            creative_response.raise_for_status()
-            
-            creative_result = creative_response.json()
-            creative_id = creative_result['id']
-            
-            # 4. Criar anúncio
-            ad_data_final = {
-                'name': f"{campaign_name} - Anúncio",
-                'adset_id': adset_id,
-                'creative': json.dumps({'creative_id': creative_id}),
-                'status': 'PAUSED',
-                'access_token': self.access_token
-            }
-            
-            ad_url = f"https://graph.facebook.com/v18.0/act_{self.ad_account_id}/ads"
-            ad_response = requests.post(ad_url, data=ad_data_final)
-            ad_response.raise_for_status()
+            # Campanha -> conjunto -> criativo (usando o post existente) -> anúncio em uma única chamada batch
+            result = self.create_ad_chain(
+                campaign={
+                    'name': campaign_name,
+                    'objective': 'REACH',  # ou outro objetivo baseado no tipo de post
+                    'status': 'PAUSED'
+                },
+                adset={
+                    'name': f"{campaign_name} - Conjunto",
+                    'daily_budget': int(float(budget) * 100),  # Converter para centavos
+                    'billing_event': 'IMPRESSIONS',
+                    'optimization_goal': 'REACH',
+                    'bid_amount': 100,  # Valor em centavos
+                    'targeting': target_audience,
+                    'status': 'PAUSED'
+                },
+                creative={
+                    'name': f"{campaign_name} - Criativo",
+                    'object_story_id': post_id  # Usar o post existente
+                },
+                ad={
+                    'name': f"{campaign_name} - Anúncio",
+                    'status': 'PAUSED'
+                }
+            )
             
-            ad_result = ad_response.json()
+            if not result['success']:
+                return {
+                    'success': False,
+                    'error': f"Erro na API do Facebook ({result['failed_step']}): {result['error']}",
+                    'rolled_back': result['rolled_back']
+                }
             
             return {
                 'success': True,
                 'message': 'Anúncio criado com sucesso a partir da publicação existente',
-                'campaign_id': campaign_id,
-                'adset_id': adset_id,
-                'creative_id': creative_id,
-                'ad_id': ad_result['id']
+                'campaign_id': result['campaign_id'],
+                'adset_id': result['adset_id'],
+                'creative_id': result['creative_id'],
+                'ad_id': result['ad_id']
             }
             
         except requests.exceptions.RequestException as e:
-            print(f"Erro ao criar anúncio a partir do post {post_id}: {e}")
+            logger.warning("Erro ao criar anúncio a partir do post %s: %s", post_id, e)
             return {
                 'success': False,
                 'error': f'Erro na API do Facebook: {str(e)}'
             }
         except Exception as e:
-            print(f"Erro inesperado ao criar anúncio: {e}")
+            logger.exception("Erro inesperado ao criar anúncio: %s", e)
             return {
                 'success': False,
                 'error': f'Erro interno: {str(e)}'
@@ -1462,5 +2169,5 @@ facebook_data_service = None
 if FACEBOOK_ACCESS_TOKEN and FACEBOOK_AD_ACCOUNT_ID:
     facebook_data_service = FacebookDataService(FACEBOOK_ACCESS_TOKEN, FACEBOOK_AD_ACCOUNT_ID)
 else:
-    print("ATENÇÃO: FACEBOOK_ACCESS_TOKEN ou FACEBOOK_AD_ACCOUNT_ID não configurados. O serviço de dados do Facebook não estará disponível.")
+    logger.warning("FACEBOOK_ACCESS_TOKEN ou FACEBOOK_AD_ACCOUNT_ID não configurados. O serviço de dados do Facebook não estará disponível.")
 
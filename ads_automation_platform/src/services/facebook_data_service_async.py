@@ -0,0 +1,595 @@
+"""
+Variante assíncrona do serviço de dados da Facebook Marketing API.
+
+Espelha os métodos de leitura do FacebookDataService usando httpx com HTTP/2: as leituras de uma conta são
+multiplexadas em poucas conexões e cargas com muitas chamadas independentes (seções do dashboard, páginas
+extras de adsets, detalhes de campanha) rodam em paralelo sob um limite de concorrência configurável.
+
+As corrotinas rodam em um laço de eventos dedicado (thread daemon) com um cliente HTTP compartilhado pelo
+processo; código síncrono (FacebookDataService, rotas Flask) as executa com run_async. As chamadas passam
+pelas mesmas camadas do transporte síncrono: cache de respostas com ETag, controle de uso, circuit breaker,
+retry, métricas e log estruturado.
+
+Segmentação (índice local de autocomplete) e páginas/publicações (tokens de página, proxy de mídia)
+continuam apenas no FacebookDataService.
+
+httpx é opcional: sem ele ASYNC_GRAPH_AVAILABLE é False e o FacebookDataService segue com as chamadas síncronas.
+"""
+
+import asyncio
+import contextvars
+import importlib.util
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
+
+try:
+    import httpx
+except ImportError:  # httpx é opcional: sem ele o cliente assíncrono fica desligado
+    httpx = None
+
+from src.services.app_metrics import observe_graph_request, record_graph_error
+from src.services.graph_cache import NOT_MODIFIED, cache_key, response_cache, ttl_for
+from src.services.graph_http import GRAPH_BASE_URL, GRAPH_CONNECT_TIMEOUT, GRAPH_LOG_SAMPLE_RATE, GRAPH_READ_TIMEOUT
+from src.services.graph_resilience import (
+    GraphCircuitOpenError,
+    circuit_breakers,
+    is_retryable_response,
+    is_server_failure,
+    retry_policy,
+)
+from src.services.graph_usage import GraphThrottledError, usage_keys, usage_throttle
+from src.services.structured_logging import get_logger, log_event
+from src.services.facebook_data_service import (
+    ACCOUNT_FIELDS,
+    ACCOUNT_INSIGHTS_FIELDS,
+    AD_CREATIVE_FIELDS,
+    AD_FIELDS,
+    ADSET_FIELDS,
+    BUDGET_ADSETS_LIMIT,
+    CAMPAIGN_FIELDS,
+    CAMPAIGN_INSIGHTS_FIELDS,
+    CHART_INSIGHTS_FIELDS,
+    DASHBOARD_CAMPAIGNS_SHOWN,
+    DASHBOARD_DEADLINE_SECONDS,
+    DASHBOARD_WINDOWS,
+    INSIGHTS_FIELDS,
+    FacebookAPIError,
+    FacebookDataService,
+    _assemble_dashboard_summary,
+    _build_chart_points,
+    _empty_dashboard_sections,
+    _is_section_result,
+    _match_window_rows,
+    _next_cursor,
+    _sum_adset_budgets,
+    _window_time_ranges,
+)
+
+logger = get_logger(__name__)
+
+GRAPH_ASYNC_ENABLED = os.getenv("GRAPH_ASYNC_ENABLED", "true").lower() == "true"
+# Chamadas simultâneas à Graph API por instância (conta)
+GRAPH_ASYNC_CONCURRENCY = int(os.getenv("GRAPH_ASYNC_CONCURRENCY", "10"))
+# Conexões mantidas pelo cliente compartilhado (com HTTP/2 cada conexão multiplexa várias chamadas)
+GRAPH_ASYNC_MAX_CONNECTIONS = int(os.getenv("GRAPH_ASYNC_MAX_CONNECTIONS", "20"))
+
+# HTTP/2 depende do pacote h2 (instalado via httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+ASYNC_GRAPH_AVAILABLE = httpx is not None and GRAPH_ASYNC_ENABLED
+
+# Dentro de uma tarefa marcada, as leituras usam apenas o cache (mesmo expirado), sem chamar a API
+_cache_only = contextvars.ContextVar("graph_async_cache_only", default=False)
+
+
+class _GraphEventLoop:
+    """Laço de eventos em uma thread dedicada, com o cliente HTTP compartilhado pelas instâncias do processo"""
+    
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client = None
+        self._tasks = set()
+        self._lock = threading.Lock()
+    
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    self._thread = threading.Thread(target=loop.run_forever, name="graph-async", daemon=True)
+                    self._thread.start()
+                    self._loop = loop
+        return self._loop
+    
+    def client(self):
+        """Cliente httpx do laço (criado na primeira chamada, sempre de dentro do laço)"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=httpx.Timeout(GRAPH_READ_TIMEOUT, connect=GRAPH_CONNECT_TIMEOUT),
+                limits=httpx.Limits(max_connections=GRAPH_ASYNC_MAX_CONNECTIONS,
+                                    max_keepalive_connections=GRAPH_ASYNC_MAX_CONNECTIONS)
+            )
+        return self._client
+    
+    def keep(self, task: "asyncio.Task"):
+        """Manter uma tarefa que segue em segundo plano até terminar (o laço guarda só referências fracas)"""
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    def run(self, coroutine: Awaitable[Any], timeout: float = None) -> Any:
+        """Executar a corrotina no laço e aguardar o resultado na thread chamadora"""
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            coroutine.close()
+            raise RuntimeError("run_async não pode ser chamado de dentro do laço da Graph API")
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result(timeout)
+
+
+graph_loop = _GraphEventLoop()
+
+
+def run_async(coroutine: Awaitable[Any], timeout: float = None) -> Any:
+    """
+    Executar uma operação do serviço assíncrono a partir de código síncrono (ex.: rotas Flask)
+    
+    Exemplo:
+        run_async(AsyncFacebookDataService(token, account_id).get_dashboard_summary())
+    """
+    return graph_loop.run(coroutine, timeout)
+
+
+def _consume_result(task: "asyncio.Task"):
+    # Seções abandonadas pelo prazo terminam sozinhas; a falha já foi tratada pelo resumo
+    if not task.cancelled():
+        task.exception()
+
+
+class AsyncFacebookDataService:
+    """
+    Versão assíncrona dos métodos de leitura do FacebookDataService
+    
+    Mantém o mesmo contrato de retorno (dicts da Graph API ou {"error": ...}). As corrotinas devem rodar no
+    laço compartilhado (run_async); a instância pode ser reaproveitada entre requisições.
+    """
+    
+    def __init__(self, access_token: str, ad_account_id: str, max_concurrency: int = GRAPH_ASYNC_CONCURRENCY):
+        if httpx is None:
+            raise RuntimeError("httpx não instalado. Instale httpx[http2] para usar o cliente assíncrono.")
+        
+        self.access_token = access_token
+        self.ad_account_id = ad_account_id
+        self.base_url = GRAPH_BASE_URL
+        self.account_prefix = f"act_{ad_account_id}"
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def _make_request(self, endpoint: str, params: dict = None, use_cache: bool = True,
+                            ttl: float = None) -> Dict[str, Any]:
+        """Fazer requisição GET para a Facebook API, servindo do cache como a versão síncrona"""
+        key = cache_key(self.access_token, endpoint, params)
+        if _cache_only.get():
+            cached = response_cache.peek(key)
+            return cached if cached is not None else {"error": "Resposta não disponível em cache"}
+        
+        if not use_cache or not response_cache.enabled:
+            return (await self._fetch(endpoint, params))[0]
+        
+        return await response_cache.fetch_async(key, ttl or ttl_for(endpoint, params),
+                                                lambda etag: self._fetch(endpoint, params, etag))
+    
+    async def _fetch(self, endpoint: str, params: dict = None, etag: str = None) -> Tuple[Any, Optional[str]]:
+        """Buscar o endpoint na Facebook API (condicional com 'etag'); retorna (corpo ou NOT_MODIFIED, etag)"""
+        url = f"{self.base_url}/{endpoint}"
+        
+        default_params = {"access_token": self.access_token}
+        if params:
+            default_params.update(params)
+        
+        headers = {"If-None-Match": etag} if etag else None
+        
+        try:
+            response = await self._request("GET", url, params=default_params, headers=headers)
+            if response.status_code == 304:
+                return NOT_MODIFIED, response.headers.get("ETag") or etag
+            if response.status_code >= 400:
+                # A mensagem não inclui a URL, que carrega o token de acesso
+                error = f"{response.status_code} {response.reason_phrase}"
+                logger.warning("Erro na requisição assíncrona à Facebook API: %s", error)
+                return {"error": error}, None
+            return response.json(), response.headers.get("ETag")
+        except (httpx.HTTPError, GraphThrottledError, GraphCircuitOpenError) as e:
+            logger.warning("Erro na requisição assíncrona à Facebook API: %s", type(e).__name__)
+            return {"error": str(e) or type(e).__name__}, None
+    
+    async def _request(self, method: str, url: str, **kwargs):
+        """
+        Requisição com controle de uso, circuit breaker, retry com backoff e métricas (mesma política do
+        GraphTransport); a espera entre tentativas acontece fora do semáforo de concorrência
+        """
+        keys = usage_keys(self.account_prefix)
+        breaker = circuit_breakers.for_url(url)
+        client = graph_loop.client()
+        started = time.monotonic()
+        attempt = 0
+        
+        while True:
+            async with self._semaphore:
+                delay = usage_throttle.reserve(keys)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                
+                breaker.before_call()
+                call_started = time.perf_counter()
+                try:
+                    response = await client.request(method, url, **kwargs)
+                except httpx.TransportError as e:
+                    breaker.record_failure()
+                    elapsed = time.perf_counter() - call_started
+                    record_graph_error(method, breaker.name, type(e).__name__, elapsed)
+                    log_event(logger, logging.WARNING, "graph.request_failed", method=method, family=breaker.name,
+                              attempt=attempt, error=type(e).__name__, duration_ms=round(elapsed * 1000, 2))
+                    backoff = retry_policy.next_delay(attempt, started)
+                    if backoff is None:
+                        raise
+                except BaseException:
+                    # Qualquer outra falha (inclusive cancelamento) também libera a tentativa half-open
+                    breaker.record_failure()
+                    raise
+                else:
+                    if is_server_failure(response):
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                    
+                    elapsed = time.perf_counter() - call_started
+                    observe_graph_request(method, breaker.name, response.status_code, elapsed)
+                    log_event(logger, logging.DEBUG, "graph.request", sample_rate=GRAPH_LOG_SAMPLE_RATE, method=method,
+                              family=breaker.name, status=response.status_code, attempt=attempt,
+                              http_version=response.http_version, duration_ms=round(elapsed * 1000, 2))
+                    usage_throttle.record_response(keys, response)
+                    
+                    backoff = retry_policy.next_delay(attempt, started) if is_retryable_response(response) else None
+                    if backoff is None:
+                        return response
+            
+            await asyncio.sleep(backoff)
+            attempt += 1
+    
+    async def _iter_items(self, endpoint: str, params: dict = None) -> List[Dict[str, Any]]:
+        """Itens de todas as páginas de um edge (as páginas dependem do cursor e são buscadas em sequência)"""
+        items = []
+        page_params = dict(params or {})
+        while True:
+            response = await self._make_request(endpoint, page_params)
+            if "error" in response:
+                raise FacebookAPIError(response["error"])
+            items.extend(response.get("data", []))
+            after = _next_cursor(response)
+            if not after:
+                return items
+            page_params = {**page_params, "after": after}
+    
+    _page_params = staticmethod(FacebookDataService._page_params)
+    
+    # ===== LEITURA DE OBJETOS =====
+    
+    async def get_ad_account_info(self) -> Dict[str, Any]:
+        """Buscar informações da conta de anúncios"""
+        return await self._make_request(self.account_prefix, {"fields": ACCOUNT_FIELDS})
+    
+    async def get_campaigns(self, limit: int = 50, after: str = None) -> Dict[str, Any]:
+        """Buscar uma página de campanhas da conta de anúncios"""
+        params = {"fields": CAMPAIGN_FIELDS, "limit": limit}
+        return await self._make_request(f"{self.account_prefix}/campaigns", self._page_params(params, after))
+    
+    async def get_adsets(self, campaign_id: str = None, limit: int = 50, after: str = None) -> Dict[str, Any]:
+        """Buscar uma página de conjuntos de anúncios"""
+        endpoint = f"{campaign_id}/adsets" if campaign_id else f"{self.account_prefix}/adsets"
+        return await self._make_request(endpoint, self._page_params({"fields": ADSET_FIELDS, "limit": limit}, after))
+    
+    async def get_ads(self, adset_id: str = None, limit: int = 50, after: str = None) -> Dict[str, Any]:
+        """Buscar uma página de anúncios"""
+        endpoint = f"{adset_id}/ads" if adset_id else f"{self.account_prefix}/ads"
+        return await self._make_request(endpoint, self._page_params({"fields": AD_FIELDS, "limit": limit}, after))
+    
+    async def get_ad_creatives(self, limit: int = 50, after: str = None) -> Dict[str, Any]:
+        """Buscar uma página de criativos de anúncios"""
+        params = {"fields": AD_CREATIVE_FIELDS, "limit": limit}
+        result = await self._make_request(f"{self.account_prefix}/adcreatives", self._page_params(params, after))
+        if "data" in result:
+            return {"success": True, "creatives": result["data"], "next_cursor": _next_cursor(result)}
+        return {"success": False, "error": "Nenhum criativo encontrado"}
+    
+    async def get_business_managers(self) -> Dict[str, Any]:
+        """Buscar Business Managers do usuário"""
+        result = await self._make_request("me/businesses", {"fields": "id,name,created_time,updated_time,verification_status"})
+        if "data" in result:
+            return {"success": True, "businesses": result["data"]}
+        return {"success": False, "error": "Nenhuma Business Manager encontrada"}
+    
+    async def get_campaign_details(self, campaign_id: str) -> Dict[str, Any]:
+        """Buscar campanha, adsets e anúncios de uma vez (as três leituras são independentes)"""
+        try:
+            campaign_result, adsets_result, ads_result = await asyncio.gather(
+                self._make_request(campaign_id, {
+                    "fields": "id,name,status,objective,created_time,updated_time,start_time,stop_time,daily_budget,"
+                              "lifetime_budget,budget_remaining,bid_strategy,buying_type,special_ad_categories"
+                }),
+                self._make_request(f"{campaign_id}/adsets", {
+                    "fields": "id,name,status,daily_budget,lifetime_budget,targeting,optimization_goal,bid_amount"
+                }),
+                self._make_request(f"{campaign_id}/ads", {"fields": "id,name,status,creative"})
+            )
+            
+            if "error" in campaign_result:
+                return {"success": False, "error": campaign_result["error"]}
+            
+            return {
+                "success": True,
+                "campaign": {
+                    "basic_info": campaign_result,
+                    "adsets": adsets_result.get("data", []),
+                    "ads": ads_result.get("data", [])
+                }
+            }
+        
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
+    # ===== INSIGHTS =====
+    
+    async def get_campaign_insights(self, campaign_id: str, date_preset: str = "last_7_days", after: str = None) -> Dict[str, Any]:
+        """Buscar insights de performance de uma campanha"""
+        params = {"fields": CAMPAIGN_INSIGHTS_FIELDS, "date_preset": date_preset}
+        return await self._make_request(f"{campaign_id}/insights", self._page_params(params, after))
+    
+    async def get_adset_insights(self, adset_id: str, date_preset: str = "last_7_days", after: str = None) -> Dict[str, Any]:
+        """Buscar insights de performance de um conjunto de anúncios"""
+        params = {"fields": INSIGHTS_FIELDS, "date_preset": date_preset}
+        return await self._make_request(f"{adset_id}/insights", self._page_params(params, after))
+    
+    async def get_ad_insights(self, ad_id: str, date_preset: str = "last_7_days", after: str = None) -> Dict[str, Any]:
+        """Buscar insights de performance de um anúncio"""
+        params = {"fields": INSIGHTS_FIELDS, "date_preset": date_preset}
+        return await self._make_request(f"{ad_id}/insights", self._page_params(params, after))
+    
+    async def get_account_insights(self, date_preset: str = "last_7_days", after: str = None) -> Dict[str, Any]:
+        """Buscar insights de performance da conta de anúncios"""
+        params = {"fields": ACCOUNT_INSIGHTS_FIELDS, "date_preset": date_preset}
+        return await self._make_request(f"{self.account_prefix}/insights", self._page_params(params, after))
+    
+    async def get_account_insights_windows(self, windows: Dict[str, int] = None) -> Dict[str, Any]:
+        """Buscar insights da conta para várias janelas de comparação em uma única chamada (time_ranges)"""
+        time_ranges = _window_time_ranges(windows or DASHBOARD_WINDOWS)
+        response = await self._make_request(f"{self.account_prefix}/insights", {
+            "fields": ACCOUNT_INSIGHTS_FIELDS,
+            "time_ranges": json.dumps(list(time_ranges.values()))
+        })
+        if "error" in response:
+            return response
+        return _match_window_rows(response.get("data", []), time_ranges)
+    
+    async def get_many_campaign_insights(self, campaign_ids: List[str],
+                                         date_preset: str = "last_7_days") -> Dict[str, Dict[str, Any]]:
+        """Buscar insights de várias campanhas em paralelo (limitado por max_concurrency)"""
+        responses = await asyncio.gather(*(self.get_campaign_insights(campaign_id, date_preset)
+                                           for campaign_id in campaign_ids))
+        return dict(zip(campaign_ids, responses))
+    
+    async def get_insights_with_date_range(self, object_id: str, object_type: str, start_date: str, end_date: str,
+                                           level: str = None, time_increment: Any = None,
+                                           estimated_objects: int = 1) -> Dict[str, Any]:
+        """
+        Buscar insights com intervalo de datas específico
+        
+        Períodos longos seguem pelo relatório assíncrono da Graph API, como na versão síncrona.
+        """
+        endpoint = f"{self.account_prefix}/insights" if object_type == "account" else f"{object_id}/insights"
+        params = {
+            "fields": INSIGHTS_FIELDS,
+            "time_range": json.dumps({"since": start_date, "until": end_date})
+        }
+        if level:
+            params["level"] = level
+        if time_increment:
+            params["time_increment"] = time_increment
+        
+        if FacebookDataService._should_use_async_insights(start_date, end_date, estimated_objects, time_increment):
+            return await self._run_insights_report(endpoint, params)
+        return await self._make_request(endpoint, params)
+    
+    async def get_campaign_performance_chart_data(self, days: int = 7) -> Dict[str, Any]:
+        """Buscar dados para gráficos de performance por dia"""
+        try:
+            end_date = datetime.now().date()
+            start_date = end_date - timedelta(days=days-1)
+            since, until = start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+            
+            endpoint = f"{self.account_prefix}/insights"
+            params = {
+                "fields": CHART_INSIGHTS_FIELDS,
+                "time_range": json.dumps({"since": since, "until": until}),
+                "time_increment": 1
+            }
+            
+            if FacebookDataService._should_use_async_insights(since, until, time_increment=1):
+                response = await self._run_insights_report(endpoint, params)
+            else:
+                response = {"data": await self._iter_items(endpoint, params)}
+            
+            if "data" in response:
+                return {"success": True, "data": _build_chart_points(response["data"])}
+            return {"success": False, "error": "Nenhum dado encontrado"}
+        
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
+    async def _run_insights_report(self, endpoint: str, params: dict) -> Dict[str, Any]:
+        """Relatório assíncrono da Graph API (report_run_id) do serviço síncrono, executado fora do laço"""
+        sync_service = FacebookDataService(self.access_token, self.ad_account_id)
+        return await asyncio.to_thread(sync_service.run_async_insights_report, endpoint, params)
+    
+    # ===== DASHBOARD =====
+    
+    async def get_campaign_budgets(self, campaigns: List[Dict] = None, max_campaigns: int = None) -> Dict[str, float]:
+        """
+        Buscar orçamentos das campanhas com a mesma consulta aninhada da versão síncrona
+        
+        As páginas extras de adsets das campanhas de uma página são buscadas em paralelo.
+        
+        Raises:
+            FacebookAPIError: se alguma página de campanhas ou de adsets falhar
+        """
+        campaign_budgets = {}
+        pending_ids = None
+        if campaigns is not None:
+            pending_ids = {campaign.get("id") for campaign in campaigns if campaign.get("id")}
+            if not pending_ids:
+                return campaign_budgets
+        
+        endpoint = f"{self.account_prefix}/campaigns"
+        params = {
+            "fields": f"id,daily_budget,lifetime_budget,adsets.limit({BUDGET_ADSETS_LIMIT}){{daily_budget,lifetime_budget}}",
+            "limit": min(100, max_campaigns) if max_campaigns and pending_ids is None else 100
+        }
+        
+        while True:
+            response = await self._make_request(endpoint, params)
+            if "error" in response:
+                logger.warning("Erro ao buscar orçamentos das campanhas: %s", response['error'])
+                raise FacebookAPIError(response["error"])
+            
+            page_campaigns = [
+                campaign for campaign in response.get("data", [])
+                if pending_ids is None or campaign.get("id") in pending_ids
+            ]
+            remaining = await asyncio.gather(*(
+                self._get_remaining_adsets(campaign.get("id"), campaign.get("adsets") or {})
+                for campaign in page_campaigns
+            ))
+            
+            for campaign, extra_adsets in zip(page_campaigns, remaining):
+                campaign_id = campaign.get("id")
+                adsets = (campaign.get("adsets") or {}).get("data", []) + extra_adsets
+                # Campanhas com orçamento na própria campanha (CBO) não têm orçamento nos adsets
+                campaign_budgets[campaign_id] = _sum_adset_budgets(adsets) or _sum_adset_budgets([campaign])
+                if pending_ids is not None:
+                    pending_ids.discard(campaign_id)
+            
+            after = _next_cursor(response)
+            if not after or pending_ids == set():
+                break
+            if pending_ids is None and max_campaigns and len(campaign_budgets) >= max_campaigns:
+                break
+            params = {**params, "after": after}
+        
+        return campaign_budgets
+    
+    async def _get_remaining_adsets(self, campaign_id: str, adsets_edge: Dict[str, Any]) -> List[Dict]:
+        """Seguir a paginação do edge de adsets de uma campanha além da primeira página aninhada"""
+        remaining = []
+        after = _next_cursor(adsets_edge)
+        
+        while after:
+            response = await self._make_request(f"{campaign_id}/adsets", {
+                "fields": "daily_budget,lifetime_budget",
+                "limit": BUDGET_ADSETS_LIMIT,
+                "after": after
+            })
+            if "error" in response:
+                logger.warning("Erro ao paginar adsets da campanha %s: %s", campaign_id, response['error'])
+                raise FacebookAPIError(response["error"])
+            remaining.extend(response.get("data", []))
+            after = _next_cursor(response)
+        
+        return remaining
+    
+    async def _campaign_count(self, status: str) -> int:
+        """Total de campanhas com o status efetivo informado (só o summary, sem percorrer a listagem)"""
+        response = await self._make_request(f"{self.account_prefix}/campaigns", {
+            "effective_status": json.dumps([status]), "fields": "id", "limit": 1, "summary": "total_count"
+        })
+        if "error" in response:
+            raise FacebookAPIError(response["error"])
+        return int((response.get("summary") or {}).get("total_count", 0))
+    
+    async def _load_dashboard_campaigns(self) -> Dict[str, Any]:
+        """Campanhas exibidas no dashboard e o total da conta (summary=total_count)"""
+        page = await self._make_request(f"{self.account_prefix}/campaigns", {
+            "fields": CAMPAIGN_FIELDS, "limit": DASHBOARD_CAMPAIGNS_SHOWN, "summary": "total_count"
+        })
+        if "error" in page:
+            raise FacebookAPIError(page["error"])
+        
+        campaigns = page.get("data", [])
+        return {"data": campaigns, "total": int((page.get("summary") or {}).get("total_count", len(campaigns)))}
+    
+    @staticmethod
+    async def _load_cached_section(loader) -> Any:
+        """Carregar uma seção servindo apenas do cache (as tarefas filhas herdam o contexto)"""
+        token = _cache_only.set(True)
+        try:
+            return await loader()
+        finally:
+            _cache_only.reset(token)
+    
+    async def get_dashboard_summary(self, deadline: float = DASHBOARD_DEADLINE_SECONDS) -> Dict[str, Any]:
+        """
+        Buscar resumo para dashboard com as seções independentes em paralelo sob um prazo único
+        
+        Mesmo contrato da versão síncrona ('sections_status' e 'partial'). Seções que não respondem a tempo
+        continuam no laço de eventos e alimentam o cache para os próximos acessos.
+        """
+        loaders = {
+            "account_info": self.get_ad_account_info,
+            "campaigns": self._load_dashboard_campaigns,
+            "campaigns_active": lambda: self._campaign_count("ACTIVE"),
+            "campaigns_paused": lambda: self._campaign_count("PAUSED"),
+            "insights": self.get_account_insights_windows,
+            "budgets": lambda: self.get_campaign_budgets(max_campaigns=DASHBOARD_CAMPAIGNS_SHOWN)
+        }
+        empty = _empty_dashboard_sections()
+        
+        try:
+            tasks = {name: asyncio.ensure_future(loader()) for name, loader in loaders.items()}
+            await asyncio.wait(tasks.values(), timeout=deadline)
+            
+            results = {}
+            sections_status = {}
+            for name, task in tasks.items():
+                failure = "timeout"
+                if task.done():
+                    try:
+                        result = task.result()
+                        if _is_section_result(result):
+                            results[name] = result
+                            sections_status[name] = "ok"
+                            continue
+                    except Exception as e:
+                        logger.warning("Erro ao carregar seção '%s' do dashboard: %s", name, e)
+                    failure = "error"
+                else:
+                    graph_loop.keep(task)
+                    task.add_done_callback(_consume_result)
+                
+                try:
+                    cached = await self._load_cached_section(loaders[name])
+                except Exception:
+                    cached = None
+                if _is_section_result(cached):
+                    results[name] = cached
+                    sections_status[name] = "cached"
+                else:
+                    results[name] = empty[name]
+                    sections_status[name] = failure
+            
+            return {"success": True, "data": _assemble_dashboard_summary(results, sections_status)}
+        
+        except Exception as e:
+            return {"success": False, "error": str(e)}
@@ -0,0 +1,402 @@
+"""
+Cache de respostas de leitura da Graph API.
+
+As respostas são indexadas por identidade do token, endpoint e parâmetros normalizados, com TTL por tipo de
+endpoint (informações da conta: horas; campanhas: minutos; insights do dia: segundos). Depois de expirada,
+uma entrada continua sendo servida por uma janela de tolerância enquanto uma única atualização roda em segundo
+plano (stale-while-revalidate). O ETag de cada resposta é guardado junto ao corpo, e as revalidações enviam
+If-None-Match: quando o objeto não mudou a API responde 304 sem corpo e a entrada existente é renovada.
+Buscas simultâneas da mesma chave são coalescidas (single-flight): apenas uma chamada sobe para a API e as
+demais aguardam e recebem o mesmo resultado.
+
+Backends disponíveis (GRAPH_CACHE_BACKEND):
+    memory  - LRU no processo (padrão)
+    sqlite  - arquivo SQLite compartilhado entre workers
+    none    - desativa o cache
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.services.local_store import local_db_path, open_local_db
+from src.services.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+GRAPH_CACHE_BACKEND = os.getenv("GRAPH_CACHE_BACKEND", "memory").lower()
+GRAPH_CACHE_MAX_ENTRIES = int(os.getenv("GRAPH_CACHE_MAX_ENTRIES", "2000"))
+GRAPH_CACHE_DB = os.getenv("GRAPH_CACHE_DB", local_db_path("graph_cache.db"))
+# Por quanto tempo após expirar (múltiplo do TTL) uma entrada ainda pode ser servida enquanto é atualizada
+GRAPH_CACHE_STALE_FACTOR = float(os.getenv("GRAPH_CACHE_STALE_FACTOR", "3"))
+GRAPH_CACHE_REFRESH_WORKERS = int(os.getenv("GRAPH_CACHE_REFRESH_WORKERS", "4"))
+
+# TTLs em segundos
+TTL_ACCOUNT_INFO = 3 * 3600
+TTL_PAGES = 30 * 60
+TTL_OBJECTS = 5 * 60
+TTL_INSIGHTS_HISTORICAL = 15 * 60
+TTL_INSIGHTS_TODAY = 30
+TTL_DEFAULT = 60
+
+# Resultado do loader quando a API responde 304 ao If-None-Match
+NOT_MODIFIED = object()
+
+_ACCOUNT_ENDPOINT = re.compile(r"^/?act_\d+$")
+_OBJECT_ENDPOINT = re.compile(r"/(campaigns|adsets|ads|adcreatives)$")
+_PAGES_ENDPOINT = re.compile(r"(^/?me/accounts$|/(posts|published_posts|instagram_accounts|media)$)")
+# Presets cujo período inclui o dia corrente (os presets last_Nd terminam ontem)
+_TODAY_PRESETS = {"today", "maximum", "data_maximum", "this_month", "this_week_mon_today", "this_week_sun_today",
+                  "this_quarter", "this_year"}
+
+
+def token_identity(access_token: str) -> str:
+    """Identificador estável do token (o token em si nunca é gravado no cache)"""
+    return hashlib.sha256((access_token or "").encode()).hexdigest()[:16]
+
+
+def cache_key(access_token: str, endpoint: str, params: Optional[dict] = None) -> str:
+    """Chave '<token_id>:<endpoint>:<hash dos parâmetros normalizados>'"""
+    normalized = {k: v for k, v in (params or {}).items() if k != "access_token"}
+    params_hash = hashlib.sha1(json.dumps(normalized, sort_keys=True, default=str).encode()).hexdigest()
+    return f"{token_identity(access_token)}:{endpoint.strip('/')}:{params_hash}"
+
+
+def _insights_include_today(params: dict) -> bool:
+    """Verificar se o período dos insights inclui o dia corrente (dados ainda mudando)"""
+    ranges = params.get("time_ranges") or params.get("time_range")
+    if ranges:
+        if isinstance(ranges, str):
+            try:
+                ranges = json.loads(ranges)
+            except ValueError:
+                return True
+        if isinstance(ranges, dict):
+            ranges = [ranges]
+        today = date.today().isoformat()
+        return any(str(time_range.get("until", "")) >= today for time_range in ranges)
+    return params.get("date_preset", "last_30d") in _TODAY_PRESETS
+
+
+def ttl_for(endpoint: str, params: Optional[dict] = None) -> float:
+    """TTL da resposta conforme o tipo de endpoint e o período consultado"""
+    endpoint = endpoint.strip("/")
+    params = params or {}
+    if endpoint.endswith("/insights"):
+        return TTL_INSIGHTS_TODAY if _insights_include_today(params) else TTL_INSIGHTS_HISTORICAL
+    if _ACCOUNT_ENDPOINT.match(endpoint):
+        return TTL_ACCOUNT_INFO
+    if _OBJECT_ENDPOINT.search(endpoint):
+        return TTL_OBJECTS
+    if _PAGES_ENDPOINT.search(endpoint):
+        return TTL_PAGES
+    return TTL_DEFAULT
+
+
+class LRUCacheBackend:
+    """Backend em memória com descarte do item menos usado"""
+    
+    def __init__(self, max_entries: int = GRAPH_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+    
+    def set(self, key: str, entry: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def delete_prefix(self, prefix: str):
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+
+class SQLiteCacheBackend:
+    """Backend em arquivo SQLite (WAL), compartilhado entre os workers da máquina"""
+    
+    def __init__(self, db_path: str = GRAPH_CACHE_DB, max_entries: int = GRAPH_CACHE_MAX_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._writes = 0
+    
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = open_local_db(self.db_path)
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS graph_cache (
+                    key TEXT PRIMARY KEY,
+                    body TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    ttl REAL NOT NULL,
+                    etag TEXT
+                )
+            """)
+            # Bancos criados antes do suporte a ETag
+            columns = {row[1] for row in self._connection.execute("PRAGMA table_info(graph_cache)")}
+            if "etag" not in columns:
+                self._connection.execute("ALTER TABLE graph_cache ADD COLUMN etag TEXT")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS idx_graph_cache_stored_at ON graph_cache (stored_at)")
+            self._pid = os.getpid()
+        return self._connection
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with self._lock:
+                row = self._db().execute(
+                    "SELECT body, stored_at, ttl, etag FROM graph_cache WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Erro ao ler cache da Graph API: %s", e)
+            return None
+        if row is None:
+            return None
+        return {"body": row[0], "stored_at": row[1], "ttl": row[2], "etag": row[3]}
+    
+    def set(self, key: str, entry: Dict[str, Any]):
+        try:
+            with self._lock:
+                db = self._db()
+                db.execute(
+                    "INSERT OR REPLACE INTO graph_cache (key, body, stored_at, ttl, etag) VALUES (?, ?, ?, ?, ?)",
+                    (key, entry["body"], entry["stored_at"], entry["ttl"], entry.get("etag"))
+                )
+                # Poda periódica das entradas mais antigas acima do limite
+                self._writes += 1
+                if self._writes % 100 == 0:
+                    db.execute("""
+                        DELETE FROM graph_cache WHERE key IN (
+                            SELECT key FROM graph_cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?
+                        )
+                    """, (self.max_entries,))
+        except sqlite3.Error as e:
+            logger.warning("Erro ao gravar cache da Graph API: %s", e)
+    
+    def delete_prefix(self, prefix: str):
+        try:
+            with self._lock:
+                self._db().execute("DELETE FROM graph_cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+        except sqlite3.Error as e:
+            logger.warning("Erro ao invalidar cache da Graph API: %s", e)
+
+
+class _Flight:
+    """Chamada em andamento compartilhada pelos chamadores da mesma chave"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalescer chamadas simultâneas com a mesma chave em uma única execução"""
+    
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+    
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Executar fn() uma única vez por chave entre os chamadores simultâneos
+        
+        Quem chega enquanto a chamada está em andamento aguarda e recebe uma cópia do resultado
+        (ou a mesma exceção), evitando que um chamador altere o objeto entregue aos demais.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result)
+        
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+    
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+
+class GraphResponseCache:
+    """Cache TTL com stale-while-revalidate sobre um backend plugável"""
+    
+    def __init__(self, backend: Any = None, stale_factor: float = GRAPH_CACHE_STALE_FACTOR,
+                 refresh_workers: int = GRAPH_CACHE_REFRESH_WORKERS, flights: SingleFlight = None):
+        self.backend = backend
+        self.flights = flights or SingleFlight()
+        self.stale_factor = stale_factor
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self._refresh_pool = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="graph-cache-refresh")
+        self._async_refreshes = set()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+    
+    def fetch(self, key: str, ttl: float, loader: Callable[[Optional[str]], Tuple[Any, Optional[str]]]) -> Dict[str, Any]:
+        """
+        Retornar a resposta em cache ou buscá-la com 'loader'
+        
+        loader(etag) recebe o ETag da entrada existente (ou None) e retorna (corpo, etag); o corpo é
+        NOT_MODIFIED quando a API respondeu 304. Entradas expiradas dentro da janela de tolerância são
+        devolvidas imediatamente e atualizadas em segundo plano (no máximo uma atualização por chave).
+        Respostas com 'error' nunca são armazenadas.
+        """
+        if not self.enabled:
+            return loader(None)[0]
+        
+        entry = self.backend.get(key)
+        if entry is not None:
+            age = time.time() - entry["stored_at"]
+            if age <= entry["ttl"]:
+                return json.loads(entry["body"])
+            if age <= entry["ttl"] * (1 + self.stale_factor):
+                self._schedule_refresh(key, ttl, loader, entry)
+                return json.loads(entry["body"])
+        
+        return self._load(key, ttl, loader, entry)
+    
+    def _load(self, key: str, ttl: float, loader: Callable[[Optional[str]], Tuple[Any, Optional[str]]],
+              entry: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return self.flights.do(key, lambda: self._load_from_upstream(key, ttl, loader, entry))
+    
+    def _load_from_upstream(self, key: str, ttl: float, loader: Callable[[Optional[str]], Tuple[Any, Optional[str]]],
+                            entry: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        result, etag = loader(entry.get("etag") if entry else None)
+        return self._store(key, ttl, entry, result, etag)
+    
+    def _store(self, key: str, ttl: float, entry: Optional[Dict[str, Any]], result: Any, etag: Optional[str]) -> Any:
+        """Gravar o resultado do loader e retornar o corpo a entregar ao chamador"""
+        if result is NOT_MODIFIED:
+            # Objeto inalterado: renovar a entrada existente sem transferir nem decodificar o corpo novamente
+            self.backend.set(key, {**entry, "stored_at": time.time(), "ttl": ttl, "etag": etag or entry.get("etag")})
+            return json.loads(entry["body"])
+        
+        if isinstance(result, (dict, list)) and not (isinstance(result, dict) and "error" in result):
+            self.backend.set(key, {"body": json.dumps(result), "stored_at": time.time(), "ttl": ttl, "etag": etag})
+        return result
+    
+    def _schedule_refresh(self, key: str, ttl: float, loader: Callable[[Optional[str]], Tuple[Any, Optional[str]]],
+                          entry: Dict[str, Any]):
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        
+        def refresh():
+            try:
+                self._load(key, ttl, loader, entry)
+            except Exception as e:
+                logger.warning("Erro ao atualizar cache da Graph API em segundo plano: %s", e)
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+        
+        self._refresh_pool.submit(refresh)
+    
+    async def fetch_async(self, key: str, ttl: float,
+                          loader: Callable[[Optional[str]], Awaitable[Tuple[Any, Optional[str]]]]) -> Dict[str, Any]:
+        """
+        Equivalente de fetch para o cliente assíncrono: loader(etag) é uma corrotina com o mesmo contrato
+        
+        A atualização de entradas expiradas dentro da janela de tolerância roda como tarefa no próprio laço
+        de eventos. Não há coalescência entre chamadores: o cliente assíncrono já limita a concorrência por conta.
+        """
+        if not self.enabled:
+            return (await loader(None))[0]
+        
+        entry = self.backend.get(key)
+        if entry is not None:
+            age = time.time() - entry["stored_at"]
+            if age <= entry["ttl"]:
+                return json.loads(entry["body"])
+            if age <= entry["ttl"] * (1 + self.stale_factor):
+                self._schedule_async_refresh(key, ttl, loader, entry)
+                return json.loads(entry["body"])
+        
+        result, etag = await loader(entry.get("etag") if entry else None)
+        return self._store(key, ttl, entry, result, etag)
+    
+    def _schedule_async_refresh(self, key: str, ttl: float,
+                                loader: Callable[[Optional[str]], Awaitable[Tuple[Any, Optional[str]]]],
+                                entry: Dict[str, Any]):
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        
+        async def refresh():
+            try:
+                result, etag = await loader(entry.get("etag"))
+                self._store(key, ttl, entry, result, etag)
+            except Exception as e:
+                logger.warning("Erro ao atualizar cache da Graph API em segundo plano: %s", e)
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+        
+        # O laço guarda só referências fracas às tarefas: manter a referência até o fim da atualização
+        task = asyncio.get_running_loop().create_task(refresh())
+        self._async_refreshes.add(task)
+        task.add_done_callback(self._async_refreshes.discard)
+    
+    def peek(self, key: str) -> Optional[Any]:
+        """Retornar a resposta armazenada independentemente da idade, sem buscar na API (None se ausente)"""
+        if not self.enabled:
+            return None
+        entry = self.backend.get(key)
+        return json.loads(entry["body"]) if entry is not None else None
+    
+    def invalidate_token(self, access_token: str):
+        """Descartar todas as respostas obtidas com o token (após escritas na conta)"""
+        if self.enabled:
+            self.backend.delete_prefix(f"{token_identity(access_token)}:")
+
+
+def _build_backend(name: str = GRAPH_CACHE_BACKEND) -> Any:
+    if name == "sqlite":
+        return SQLiteCacheBackend()
+    if name == "memory":
+        return LRUCacheBackend()
+    return None
+
+
+single_flight = SingleFlight()
+response_cache = GraphResponseCache(_build_backend(), flights=single_flight)
@@ -0,0 +1,144 @@
+"""
+Transporte HTTP compartilhado para chamadas à Graph API do Facebook.
+Mantém um pool de conexões keep-alive por host e timeouts padrão, reutilizado por todos os serviços.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.services.app_metrics import observe_graph_request, record_graph_error
+from src.services.graph_resilience import (
+    RETRYABLE_METHODS,
+    circuit_breakers,
+    is_retryable_response,
+    is_server_failure,
+    retry_policy,
+)
+from src.services.graph_usage import usage_keys, usage_throttle
+from src.services.structured_logging import get_logger, log_event
+
+logger = get_logger(__name__)
+
+GRAPH_API_VERSION = "v23.0"
+GRAPH_BASE_URL = f"https://graph.facebook.com/{GRAPH_API_VERSION}"
+
+# Configuração do pool (conexões por host) e timeouts (conexão, leitura) em segundos
+GRAPH_POOL_CONNECTIONS = int(os.getenv("GRAPH_POOL_CONNECTIONS", "10"))
+GRAPH_POOL_MAXSIZE = int(os.getenv("GRAPH_POOL_MAXSIZE", "20"))
+GRAPH_CONNECT_TIMEOUT = float(os.getenv("GRAPH_CONNECT_TIMEOUT", "5"))
+GRAPH_READ_TIMEOUT = float(os.getenv("GRAPH_READ_TIMEOUT", "30"))
+# Fração das chamadas registradas no log de depuração (evento de alta frequência)
+GRAPH_LOG_SAMPLE_RATE = float(os.getenv("GRAPH_LOG_SAMPLE_RATE", "0.1"))
+
+
+class GraphTransport:
+    """Sessão HTTP thread-safe com pool de conexões e timeouts padrão"""
+    
+    def __init__(self, pool_connections: int = GRAPH_POOL_CONNECTIONS, pool_maxsize: int = GRAPH_POOL_MAXSIZE,
+                 connect_timeout: float = GRAPH_CONNECT_TIMEOUT, read_timeout: float = GRAPH_READ_TIMEOUT):
+        self.default_timeout = (connect_timeout, read_timeout)
+        
+        # pool_connections = quantidade de hosts mantidos; pool_maxsize = conexões abertas por host
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=False)
+        
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Connection": "keep-alive"})
+    
+    def request(self, method: str, url: str, timeout: Any = None, usage_key: str = None, retry: bool = None,
+                **kwargs) -> requests.Response:
+        """
+        Executar requisição reutilizando as conexões do pool
+        
+        usage_key identifica a conta de anúncios ('act_<id>') cujo limite de uso a chamada consome;
+        a chamada aguarda sua vez quando o uso está alto e atualiza o modelo com os headers da resposta.
+        
+        Falhas transitórias são repetidas com backoff (por padrão apenas GET/DELETE; use retry=True para
+        forçar em POSTs idempotentes). Levanta GraphCircuitOpenError quando a família do endpoint está degradada.
+        """
+        keys = usage_keys(usage_key)
+        breaker = circuit_breakers.for_url(url)
+        if retry is None:
+            retry = method.upper() in RETRYABLE_METHODS
+        
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            delay = usage_throttle.reserve(keys)
+            if delay > 0:
+                time.sleep(delay)
+            
+            breaker.before_call()
+            call_started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, timeout=timeout or self.default_timeout, **kwargs)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                breaker.record_failure()
+                elapsed = time.perf_counter() - call_started
+                record_graph_error(method, breaker.name, type(e).__name__, elapsed)
+                log_event(logger, logging.WARNING, "graph.request_failed", method=method, family=breaker.name,
+                          attempt=attempt, error=type(e).__name__, duration_ms=round(elapsed * 1000, 2))
+                backoff = retry_policy.next_delay(attempt, started) if retry else None
+                if backoff is None:
+                    raise
+            except requests.exceptions.RequestException as e:
+                breaker.record_failure()
+                record_graph_error(method, breaker.name, type(e).__name__, time.perf_counter() - call_started)
+                raise
+            except Exception:
+                # Qualquer outra falha (ex.: leitura do corpo em streaming) também libera a tentativa half-open
+                breaker.record_failure()
+                raise
+            else:
+                # O disjuntor é atualizado antes dos hooks de métricas/log/uso, que não podem prendê-lo em half-open
+                if is_server_failure(response):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                
+                elapsed = time.perf_counter() - call_started
+                observe_graph_request(method, breaker.name, response.status_code, elapsed)
+                log_event(logger, logging.DEBUG, "graph.request", sample_rate=GRAPH_LOG_SAMPLE_RATE, method=method,
+                          family=breaker.name, status=response.status_code, attempt=attempt,
+                          duration_ms=round(elapsed * 1000, 2))
+                usage_throttle.record_response(keys, response)
+                
+                backoff = retry_policy.next_delay(attempt, started) if retry and is_retryable_response(response) else None
+                if backoff is None:
+                    return response
+            
+            time.sleep(backoff)
+            attempt += 1
+    
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+    
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+    
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", url, **kwargs)
+    
+    def close(self):
+        self.session.close()
+
+
+_transport: Optional[GraphTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_graph_transport() -> GraphTransport:
+    """Retornar o transporte compartilhado do processo (criado sob demanda)"""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = GraphTransport()
+    return _transport
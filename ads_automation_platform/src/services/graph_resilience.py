@@ -0,0 +1,190 @@
+"""
+Política de retry e circuit breakers para chamadas à Graph API.
+
+Falhas transitórias (timeouts, erros 5xx e códigos de erro temporários da Graph API) são repetidas com
+backoff exponencial e jitter. Cada família de endpoints (insights, campaigns, pages, other) tem um circuit
+breaker próprio que passa a falhar imediatamente enquanto o Facebook está degradado, sem prender as threads
+do Flask em chamadas lentas.
+"""
+
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from src.services.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+GRAPH_MAX_RETRIES = int(os.getenv("GRAPH_MAX_RETRIES", "3"))
+GRAPH_RETRY_BASE_DELAY = float(os.getenv("GRAPH_RETRY_BASE_DELAY", "0.5"))
+GRAPH_RETRY_MAX_DELAY = float(os.getenv("GRAPH_RETRY_MAX_DELAY", "8"))
+# Tempo total máximo gasto em uma chamada somando todas as tentativas (s)
+GRAPH_RETRY_BUDGET = float(os.getenv("GRAPH_RETRY_BUDGET", "20"))
+
+# Falhas consecutivas que abrem o circuito e tempo até a próxima tentativa de teste (s)
+GRAPH_BREAKER_THRESHOLD = int(os.getenv("GRAPH_BREAKER_THRESHOLD", "5"))
+GRAPH_BREAKER_COOLDOWN = float(os.getenv("GRAPH_BREAKER_COOLDOWN", "30"))
+
+# Métodos repetidos por padrão (POSTs de criação não são idempotentes)
+RETRYABLE_METHODS = {"GET", "DELETE"}
+
+# Códigos de erro temporários da Graph API (1 = erro desconhecido, 2 = serviço indisponível).
+# Códigos de limite de taxa ficam com o controle de uso (graph_usage), que bloqueia a chave até liberar.
+TRANSIENT_ERROR_CODES = {1, 2}
+
+_FAMILY_PATTERNS = (
+    ("insights", re.compile(r"/(insights|async_status)\b")),
+    ("campaigns", re.compile(r"/(campaigns|adsets|ads|adcreatives|act_\d+)\b")),
+    ("pages", re.compile(r"/(accounts|posts|published_posts|feed|media|instagram_accounts|picture)\b")),
+)
+
+
+class GraphCircuitOpenError(requests.exceptions.RequestException):
+    """Chamada recusada localmente porque o circuito da família de endpoints está aberto"""
+
+
+def endpoint_family(url: str) -> str:
+    """Classificar a URL em uma família de endpoints para o circuit breaker"""
+    path = urlparse(url).path
+    for family, pattern in _FAMILY_PATTERNS:
+        if pattern.search(path):
+            return family
+    return "other"
+
+
+def _graph_error(response: Any) -> Dict[str, Any]:
+    """Objeto 'error' do corpo de uma resposta de falha (requests ou httpx)"""
+    if response.status_code < 400:
+        return {}
+    try:
+        body = response.json()
+    except ValueError:
+        return {}
+    if not isinstance(body, dict):
+        return {}
+    return body.get("error") or {}
+
+
+def is_server_failure(response: Any) -> bool:
+    """Resposta que indica degradação do lado do Facebook (conta para o circuit breaker)"""
+    return response.status_code >= 500
+
+
+def is_retryable_response(response: Any) -> bool:
+    """Resposta de falha transitória que vale a pena repetir"""
+    if response.status_code < 400:
+        return False
+    error = _graph_error(response)
+    if error.get("is_transient") or error.get("code") in TRANSIENT_ERROR_CODES:
+        return True
+    return response.status_code >= 500
+
+
+class RetryPolicy:
+    """Backoff exponencial com 'full jitter' limitado por um orçamento total de tempo"""
+    
+    def __init__(self, max_retries: int = GRAPH_MAX_RETRIES, base_delay: float = GRAPH_RETRY_BASE_DELAY,
+                 max_delay: float = GRAPH_RETRY_MAX_DELAY, budget: float = GRAPH_RETRY_BUDGET):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+    
+    def backoff(self, attempt: int) -> float:
+        """Espera antes da tentativa seguinte a 'attempt' (0 = primeira tentativa)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+    
+    def next_delay(self, attempt: int, started: float) -> Optional[float]:
+        """Espera até a próxima tentativa, ou None quando as tentativas ou o orçamento se esgotaram"""
+        if attempt >= self.max_retries:
+            return None
+        delay = self.backoff(attempt)
+        if time.monotonic() - started + delay > self.budget:
+            return None
+        return delay
+
+
+class CircuitBreaker:
+    """Circuit breaker por falhas consecutivas com estado meio-aberto (uma chamada de teste por vez)"""
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, name: str, threshold: int = GRAPH_BREAKER_THRESHOLD, cooldown: float = GRAPH_BREAKER_COOLDOWN):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    def before_call(self):
+        """Liberar a chamada ou falhar imediatamente com o circuito aberto"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            remaining = max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+            raise GraphCircuitOpenError(
+                f"Graph API degradada para '{self.name}'; chamadas suspensas por mais {remaining:.0f}s"
+            )
+    
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+    
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                if self.state != self.OPEN:
+                    logger.warning("Circuit breaker da Graph API aberto para '%s' após %s falhas", self.name, self.failures)
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._trial_in_flight = False
+    
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self.state, "failures": self.failures}
+
+
+class CircuitBreakerRegistry:
+    """Circuit breakers do processo, um por família de endpoints"""
+    
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, family: str) -> CircuitBreaker:
+        with self._lock:
+            if family not in self._breakers:
+                self._breakers[family] = CircuitBreaker(family)
+            return self._breakers[family]
+    
+    def for_url(self, url: str) -> CircuitBreaker:
+        return self.get(endpoint_family(url))
+    
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {family: breaker.status() for family, breaker in breakers.items()}
+
+
+retry_policy = RetryPolicy()
+circuit_breakers = CircuitBreakerRegistry()
@@ -0,0 +1,268 @@
+"""
+Controle adaptativo de taxa baseado nos headers de uso da Graph API.
+
+Cada resposta traz X-App-Usage, X-Ad-Account-Usage e/ou X-Business-Use-Case-Usage com o percentual
+consumido da janela de limite. O modelo de uso fica em uma tabela SQLite (WAL) compartilhada por todas as
+threads e workers, e as chamadas passam a ser espaçadas à medida que o uso se aproxima de 100%, antes que
+o Facebook comece a responder com erros de throttling (4, 17, 613, 80000-80014).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from src.services.local_store import local_db_path, open_local_db
+from src.services.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+GRAPH_THROTTLE_ENABLED = os.getenv("GRAPH_THROTTLE_ENABLED", "true").lower() == "true"
+GRAPH_USAGE_DB = os.getenv("GRAPH_USAGE_DB", local_db_path("graph_usage.db"))
+
+# Percentual a partir do qual as chamadas começam a ser espaçadas e intervalo máximo entre chamadas (s)
+GRAPH_USAGE_SOFT_LIMIT = float(os.getenv("GRAPH_USAGE_SOFT_LIMIT", "75"))
+GRAPH_USAGE_MAX_INTERVAL = float(os.getenv("GRAPH_USAGE_MAX_INTERVAL", "2"))
+# Espera máxima aceitável antes de desistir da chamada (s)
+GRAPH_THROTTLE_MAX_WAIT = float(os.getenv("GRAPH_THROTTLE_MAX_WAIT", "10"))
+# Bloqueio aplicado quando a API retorna erro de throttling sem informar o tempo de recuperação (s)
+GRAPH_THROTTLE_DEFAULT_BLOCK = float(os.getenv("GRAPH_THROTTLE_DEFAULT_BLOCK", "60"))
+# Leituras de uso mais antigas que isso são descartadas (a janela da API é móvel)
+GRAPH_USAGE_STALE_SECONDS = float(os.getenv("GRAPH_USAGE_STALE_SECONDS", "300"))
+
+APP_USAGE_KEY = "app"
+
+# Códigos de erro de limite de taxa da Graph API
+APP_THROTTLE_CODES = {4}
+ACCOUNT_THROTTLE_CODES = {17, 32, 613} | set(range(80000, 80015))
+THROTTLE_ERROR_CODES = APP_THROTTLE_CODES | ACCOUNT_THROTTLE_CODES
+
+_USAGE_METRICS = ("call_count", "total_cputime", "total_time")
+
+
+class GraphThrottledError(requests.exceptions.RequestException):
+    """Chamada recusada localmente porque o limite de uso da Graph API está esgotado"""
+
+
+def _load_header(headers: Any, name: str) -> Any:
+    raw = headers.get(name) if headers else None
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except (TypeError, ValueError):
+        return None
+
+
+def _max_metric(usage: Dict[str, Any]) -> float:
+    return max((float(usage.get(metric) or 0) for metric in _USAGE_METRICS), default=0.0)
+
+
+def parse_usage_headers(headers: Any) -> Dict[str, Any]:
+    """
+    Extrair os percentuais de uso dos headers da resposta
+    
+    Returns:
+        {"app": pct | None, "account": pct | None, "regain_seconds": segundos até liberar (0 se não informado)}
+    """
+    app_usage = _load_header(headers, "X-App-Usage")
+    account_usage = _load_header(headers, "X-Ad-Account-Usage")
+    buc_usage = _load_header(headers, "X-Business-Use-Case-Usage")
+    
+    app_pct = _max_metric(app_usage) if isinstance(app_usage, dict) else None
+    account_pct = None
+    regain_seconds = 0.0
+    
+    if isinstance(account_usage, dict):
+        account_pct = float(account_usage.get("acc_id_util_pct") or 0)
+        regain_seconds = float(account_usage.get("reset_time_duration") or 0)
+    
+    # BUC vem agrupado por business: {"<business_id>": [{"type": "ads_insights", "call_count": 28, ...}]}
+    if isinstance(buc_usage, dict):
+        for entries in buc_usage.values():
+            for entry in entries if isinstance(entries, list) else []:
+                account_pct = max(account_pct or 0.0, _max_metric(entry))
+                regain_seconds = max(regain_seconds, float(entry.get("estimated_time_to_regain_access") or 0) * 60)
+    
+    return {"app": app_pct, "account": account_pct, "regain_seconds": regain_seconds}
+
+
+def _response_error_code(response: requests.Response) -> Optional[int]:
+    """Código de erro da Graph API presente no corpo de uma resposta de falha"""
+    if response.status_code < 400:
+        return None
+    try:
+        return (response.json().get("error") or {}).get("code")
+    except ValueError:
+        return None
+
+
+class GraphUsageThrottle:
+    """Modelo de uso por chave ('app' ou 'act_<id>') persistido em SQLite e compartilhado entre processos"""
+    
+    def __init__(self, db_path: str = GRAPH_USAGE_DB, enabled: bool = GRAPH_THROTTLE_ENABLED):
+        self.db_path = db_path
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+    
+    def _db(self) -> sqlite3.Connection:
+        # Conexões SQLite não sobrevivem a fork: reabrir quando o worker mudar
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = open_local_db(self.db_path)
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS graph_usage (
+                    key TEXT PRIMARY KEY,
+                    usage_pct REAL NOT NULL DEFAULT 0,
+                    blocked_until REAL NOT NULL DEFAULT 0,
+                    next_slot REAL NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL DEFAULT 0
+                )
+            """)
+            self._pid = os.getpid()
+        return self._connection
+    
+    @staticmethod
+    def _interval_for(usage_pct: float) -> float:
+        """Intervalo mínimo entre chamadas: zero abaixo do limite suave, crescendo quadraticamente até 100%"""
+        if usage_pct < GRAPH_USAGE_SOFT_LIMIT:
+            return 0.0
+        pressure = min(1.0, (usage_pct - GRAPH_USAGE_SOFT_LIMIT) / max(1.0, 100 - GRAPH_USAGE_SOFT_LIMIT))
+        return GRAPH_USAGE_MAX_INTERVAL * pressure ** 2
+    
+    def _plan(self, rows: List[Tuple], now: float) -> Tuple[float, List[Tuple[str, float]]]:
+        """Calcular a espera necessária e os próximos slots de cada chave"""
+        delay = 0.0
+        slots = []
+        for key, usage_pct, blocked_until, next_slot, updated_at in rows:
+            if now - updated_at > GRAPH_USAGE_STALE_SECONDS:
+                usage_pct = 0.0
+            interval = self._interval_for(usage_pct)
+            if interval == 0 and blocked_until <= now:
+                continue
+            start = max(now, blocked_until, next_slot if interval else 0)
+            delay = max(delay, start - now)
+            slots.append((key, start + interval))
+        return delay, slots
+    
+    def reserve(self, keys: Iterable[str]) -> float:
+        """
+        Reservar a vez da próxima chamada para as chaves informadas
+        
+        Returns:
+            Segundos que o chamador deve aguardar antes de enviar a requisição
+        
+        Raises:
+            GraphThrottledError: quando a espera excederia GRAPH_THROTTLE_MAX_WAIT
+        """
+        if not self.enabled:
+            return 0.0
+        
+        keys = list(keys)
+        placeholders = ",".join("?" * len(keys))
+        query = f"SELECT key, usage_pct, blocked_until, next_slot, updated_at FROM graph_usage WHERE key IN ({placeholders})"
+        
+        try:
+            with self._lock:
+                db = self._db()
+                now = time.time()
+                
+                # Caminho rápido: sem pressão de uso não há o que reservar
+                delay, slots = self._plan(db.execute(query, keys).fetchall(), now)
+                if not slots:
+                    return 0.0
+                
+                db.execute("BEGIN IMMEDIATE")
+                try:
+                    now = time.time()
+                    delay, slots = self._plan(db.execute(query, keys).fetchall(), now)
+                    if delay > GRAPH_THROTTLE_MAX_WAIT:
+                        db.execute("ROLLBACK")
+                        raise GraphThrottledError(
+                            f"Limite de uso da Graph API atingido para {', '.join(keys)}; "
+                            f"nova tentativa possível em {delay:.0f}s"
+                        )
+                    db.executemany("UPDATE graph_usage SET next_slot = ? WHERE key = ?",
+                                   [(slot, key) for key, slot in slots])
+                    db.execute("COMMIT")
+                except sqlite3.Error:
+                    db.execute("ROLLBACK")
+                    raise
+                return delay
+        except sqlite3.Error as e:
+            # O controle de uso nunca deve derrubar a chamada em si
+            logger.warning("Erro ao consultar modelo de uso da Graph API: %s", e)
+            return 0.0
+    
+    def record(self, keys: Iterable[str], headers: Any, error_code: Optional[int] = None):
+        """Atualizar o modelo com os headers de uso (e o erro de throttling, se houver) de uma resposta"""
+        if not self.enabled:
+            return
+        
+        keys = list(keys)
+        usage = parse_usage_headers(headers)
+        now = time.time()
+        
+        blocked_keys = set()
+        if error_code in APP_THROTTLE_CODES:
+            blocked_keys = {APP_USAGE_KEY}
+        elif error_code in ACCOUNT_THROTTLE_CODES:
+            blocked_keys = {key for key in keys if key != APP_USAGE_KEY} or {APP_USAGE_KEY}
+        
+        updates = []
+        for key in keys:
+            usage_pct = usage["app"] if key == APP_USAGE_KEY else usage["account"]
+            blocked_until = 0.0
+            if key in blocked_keys:
+                blocked_until = now + (usage["regain_seconds"] or GRAPH_THROTTLE_DEFAULT_BLOCK)
+                usage_pct = 100.0
+            elif key != APP_USAGE_KEY and usage["regain_seconds"] and (usage_pct or 0) >= 100:
+                blocked_until = now + usage["regain_seconds"]
+            if usage_pct is None and not blocked_until:
+                continue
+            updates.append((key, usage_pct or 0.0, blocked_until, now))
+        
+        if not updates:
+            return
+        
+        try:
+            with self._lock:
+                self._db().executemany("""
+                    INSERT INTO graph_usage (key, usage_pct, blocked_until, updated_at) VALUES (?, ?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET
+                        usage_pct = excluded.usage_pct,
+                        blocked_until = MAX(graph_usage.blocked_until, excluded.blocked_until),
+                        updated_at = excluded.updated_at
+                """, updates)
+        except sqlite3.Error as e:
+            logger.warning("Erro ao registrar uso da Graph API: %s", e)
+    
+    def record_response(self, keys: Iterable[str], response: requests.Response):
+        self.record(keys, response.headers, _response_error_code(response))
+    
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Estado atual do modelo de uso (para diagnóstico)"""
+        try:
+            with self._lock:
+                rows = self._db().execute(
+                    "SELECT key, usage_pct, blocked_until, updated_at FROM graph_usage"
+                ).fetchall()
+        except sqlite3.Error as e:
+            return {"error": str(e)}
+        return {
+            key: {"usage_pct": usage_pct, "blocked_until": blocked_until, "updated_at": updated_at}
+            for key, usage_pct, blocked_until, updated_at in rows
+        }
+
+
+def usage_keys(usage_key: Optional[str] = None) -> List[str]:
+    """Chaves de uso afetadas por uma chamada: sempre a do app, mais a da conta quando conhecida"""
+    return [APP_USAGE_KEY, usage_key] if usage_key else [APP_USAGE_KEY]
+
+
+usage_throttle = GraphUsageThrottle()
@@ -6,6 +6,7 @@ Este módulo fornece funcionalidades para gerar textos de anúncios baseados em
 import json
 import requests
 from typing import Dict, List, Any, Optional
+from src.services.app_metrics import llm_call
 from datetime import datetime
 import base64
 import os
@@ -57,25 +58,28 @@ class OpenAIProvider(LLMProvider):
                 "temperature": 0.7
             }
             
-            response = requests.post(
-                f"{self.base_url}/chat/completions",
-                headers=self.headers,
-                json=payload
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return {
-                    "success": True,
-                    "text": result["choices"][0]["message"]["content"].strip(),
-                    "usage": result.get("usage", {}),
-                    "model": "gpt-4"
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": f"API Error: {response.status_code} - {response.text}"
-                }
+            with llm_call("openai", "gpt-4", "generate_ad_copy") as call:
+                response = requests.post(
+                    f"{self.base_url}/chat/completions",
+                    headers=self.headers,
+                    json=payload
+                )
+                
+                if response.status_code == 200:
+                    result = response.json()
+                    call["usage"] = result.get("usage")
+                    return {
+                        "success": True,
+                        "text": result["choices"][0]["message"]["content"].strip(),
+                        "usage": result.get("usage", {}),
+                        "model": "gpt-4"
+                    }
+                else:
+                    call["error"] = True
+                    return {
+                        "success": False,
+                        "error": f"API Error: {response.status_code} - {response.text}"
+                    }
                 
         except Exception as e:
             return {
@@ -112,24 +116,27 @@ class OpenAIProvider(LLMProvider):
                 "max_tokens": 300
             }
             
-            response = requests.post(
-                f"{self.base_url}/chat/completions",
-                headers=self.headers,
-                json=payload
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return {
-                    "success": True,
-                    "description": result["choices"][0]["message"]["content"].strip(),
-                    "model": "gpt-4-vision"
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": f"API Error: {response.status_code} - {response.text}"
-                }
+            with llm_call("openai", "gpt-4-vision-preview", "analyze_image") as call:
+                response = requests.post(
+                    f"{self.base_url}/chat/completions",
+                    headers=self.headers,
+                    json=payload
+                )
+                
+                if response.status_code == 200:
+                    result = response.json()
+                    call["usage"] = result.get("usage")
+                    return {
+                        "success": True,
+                        "description": result["choices"][0]["message"]["content"].strip(),
+                        "model": "gpt-4-vision"
+                    }
+                else:
+                    call["error"] = True
+                    return {
+                        "success": False,
+                        "error": f"API Error: {response.status_code} - {response.text}"
+                    }
                 
         except Exception as e:
             return {
@@ -163,31 +170,34 @@ class HuggingFaceProvider(LLMProvider):
                 }
             }
             
-            response = requests.post(
-                f"{self.base_url}/{model}",
-                headers=self.headers,
-                json=payload
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                if isinstance(result, list) and len(result) > 0:
-                    generated_text = result[0].get("generated_text", "")
-                    return {
-                        "success": True,
-                        "text": generated_text.replace(prompt, "").strip(),
-                        "model": model
-                    }
+            with llm_call("huggingface", model, "generate_ad_copy") as call:
+                response = requests.post(
+                    f"{self.base_url}/{model}",
+                    headers=self.headers,
+                    json=payload
+                )
+                
+                if response.status_code == 200:
+                    result = response.json()
+                    if isinstance(result, list) and len(result) > 0:
+                        generated_text = result[0].get("generated_text", "")
+                        return {
+                            "success": True,
+                            "text": generated_text.replace(prompt, "").strip(),
+                            "model": model
+                        }
+                    else:
+                        call["error"] = True
+                        return {
+                            "success": False,
+                            "error": "Resposta inesperada da API"
+                        }
                 else:
+                    call["error"] = True
                     return {
                         "success": False,
-                        "error": "Resposta inesperada da API"
+                        "error": f"API Error: {response.status_code} - {response.text}"
                     }
-            else:
-                return {
-                    "success": False,
-                    "error": f"API Error: {response.status_code} - {response.text}"
-                }
                 
         except Exception as e:
             return {
@@ -201,33 +211,36 @@ class HuggingFaceProvider(LLMProvider):
             # Usando um modelo de descrição de imagens
             model = "Salesforce/blip-image-captioning-base"
             
-            with open(image_path, "rb") as image_file:
-                files = {"file": image_file}
+            with llm_call("huggingface", model, "analyze_image") as call:
+                with open(image_path, "rb") as image_file:
+                    files = {"file": image_file}
+                    
+                    response = requests.post(
+                        f"{self.base_url}/{model}",
+                        headers={"Authorization": f"Bearer {self.api_key}"},
+                        files=files
+                    )
                 
-                response = requests.post(
-                    f"{self.base_url}/{model}",
-                    headers={"Authorization": f"Bearer {self.api_key}"},
-                    files=files
-                )
-            
-            if response.status_code == 200:
-                result = response.json()
-                if isinstance(result, list) and len(result) > 0:
-                    return {
-                        "success": True,
-                        "description": result[0].get("generated_text", ""),
-                        "model": model
-                    }
+                if response.status_code == 200:
+                    result = response.json()
+                    if isinstance(result, list) and len(result) > 0:
+                        return {
+                            "success": True,
+                            "description": result[0].get("generated_text", ""),
+                            "model": model
+                        }
+                    else:
+                        call["error"] = True
+                        return {
+                            "success": False,
+                            "error": "Resposta inesperada da API"
+                        }
                 else:
+                    call["error"] = True
                     return {
                         "success": False,
-                        "error": "Resposta inesperada da API"
+                        "error": f"API Error: {response.status_code} - {response.text}"
                     }
-            else:
-                return {
-                    "success": False,
-                    "error": f"API Error: {response.status_code} - {response.text}"
-                }
                 
         except Exception as e:
             return {
@@ -0,0 +1,32 @@
+"""
+Acesso aos bancos SQLite locais usados como estado compartilhado entre threads e processos (workers).
+Os arquivos ficam em src/database ao lado do app.db.
+"""
+
+import os
+import sqlite3
+
+LOCAL_DB_DIR = os.getenv("LOCAL_DB_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "database"))
+
+
+def local_db_path(filename: str) -> str:
+    """Caminho absoluto de um banco local dentro de LOCAL_DB_DIR"""
+    return os.path.join(LOCAL_DB_DIR, filename)
+
+
+def open_local_db(path: str, busy_timeout_ms: int = 5000) -> sqlite3.Connection:
+    """
+    Abrir conexão SQLite em modo WAL (leitores não bloqueiam o escritor entre processos).
+    
+    A conexão pode ser compartilhada entre threads do mesmo processo, desde que o chamador
+    serialize o acesso com um lock.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    connection = sqlite3.connect(path, timeout=busy_timeout_ms / 1000, check_same_thread=False, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+    return connection
@@ -0,0 +1,320 @@
+"""
+Proxy de imagens de publicações (thumbnails) servidas pela própria API em /api/facebook/media/<hash>.
+
+As URLs de origem (CDN/Graph) ficam registradas no servidor sob um hash opaco do id estável da mídia (post ou
+mídia do Instagram), e não da URL assinada. A URL do proxy leva ainda a versão da imagem (?v=), um hash do caminho
+da URL de origem sem a query: quando o Facebook só rotaciona a assinatura, a URL do proxy e o arquivo em cache
+continuam os mesmos; quando a imagem é trocada (post ou criativo editado) o CDN muda o caminho, a versão muda, o
+arquivo é baixado de novo e o navegador recebe uma URL nova. O navegador nunca recebe as URLs de origem.
+Cada imagem é baixada uma única vez, gravada em disco endereçada pelo SHA-256 do conteúdo (URLs diferentes
+da mesma imagem compartilham o arquivo) e reduzida para os tamanhos usados pela interface. Um índice SQLite
+(WAL) compartilhado entre workers controla o último acesso e remove os arquivos menos usados quando o cache
+passa do limite de bytes.
+"""
+
+import hashlib
+import io
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+from src.services.graph_cache import single_flight
+from src.services.graph_http import GRAPH_CONNECT_TIMEOUT, GRAPH_READ_TIMEOUT, get_graph_transport
+from src.services.local_store import local_db_path, open_local_db
+from src.services.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow é opcional: sem ele as imagens são servidas no tamanho original
+    Image = None
+
+MEDIA_PROXY_ENABLED = os.getenv("MEDIA_PROXY_ENABLED", "true").lower() == "true"
+MEDIA_CACHE_DIR = os.getenv("MEDIA_CACHE_DIR", local_db_path("media_cache"))
+MEDIA_CACHE_DB = os.getenv("MEDIA_CACHE_DB", local_db_path("media_cache.db"))
+# Tamanho máximo do cache em disco (bytes); ao exceder, os arquivos menos acessados são removidos
+MEDIA_CACHE_MAX_BYTES = int(os.getenv("MEDIA_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+# Tamanho máximo aceito para uma imagem de origem (bytes)
+MEDIA_MAX_SOURCE_BYTES = int(os.getenv("MEDIA_MAX_SOURCE_BYTES", str(15 * 1024 * 1024)))
+# URLs registradas e não vistas há mais tempo que isso são esquecidas (s)
+MEDIA_SOURCE_TTL = float(os.getenv("MEDIA_SOURCE_TTL", str(30 * 24 * 3600)))
+# Intervalo mínimo entre atualizações do último acesso de um mesmo arquivo (s)
+MEDIA_TOUCH_INTERVAL = 60
+
+MEDIA_URL_PREFIX = "/api/facebook/media"
+
+# Tamanhos usados pela interface (maior lado, em pixels); 'original' serve o arquivo baixado
+MEDIA_SIZES = {"thumb": 320, "normal": 720}
+ORIGINAL_SIZE = "original"
+DEFAULT_MEDIA_SIZE = "thumb"
+
+_EXTENSIONS = {"image/jpeg": "jpg", "image/png": "png", "image/gif": "gif", "image/webp": "webp"}
+
+
+def media_hash(media_id: str) -> str:
+    """Identificador opaco de uma mídia a partir do seu id estável (ex.: 'fb:<post_id>', 'ig:<media_id>')"""
+    return hashlib.sha256(media_id.encode("utf-8")).hexdigest()[:32]
+
+
+def source_version(source_url: str) -> str:
+    """Versão da imagem: hash do host e do caminho da URL de origem (a assinatura na query rotaciona sozinha)"""
+    parts = urlsplit(source_url)
+    return hashlib.sha256(f"{parts.netloc}{parts.path}".encode("utf-8")).hexdigest()[:12]
+
+
+class MediaProxy:
+    """Cache em disco endereçado por conteúdo, com índice SQLite e remoção LRU por limite de bytes"""
+    
+    def __init__(self, cache_dir: str = MEDIA_CACHE_DIR, db_path: str = MEDIA_CACHE_DB,
+                 max_bytes: int = MEDIA_CACHE_MAX_BYTES, enabled: bool = MEDIA_PROXY_ENABLED):
+        self.cache_dir = cache_dir
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+    
+    def _db(self) -> sqlite3.Connection:
+        # Conexões SQLite não sobrevivem a fork: reabrir quando o worker mudar
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = open_local_db(self.db_path)
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS media_sources (
+                    hash TEXT PRIMARY KEY,
+                    source_url TEXT NOT NULL,
+                    content_hash TEXT,
+                    last_seen REAL NOT NULL DEFAULT 0
+                );
+                CREATE TABLE IF NOT EXISTS media_files (
+                    content_hash TEXT NOT NULL,
+                    size TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    content_type TEXT NOT NULL,
+                    bytes INTEGER NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (content_hash, size)
+                );
+                CREATE INDEX IF NOT EXISTS idx_media_files_last_access ON media_files (last_access);
+            """)
+            columns = {row[1] for row in self._connection.execute("PRAGMA table_info(media_sources)")}
+            if "version" not in columns:
+                # Índices criados antes do versionamento: as entradas antigas são baixadas de novo uma vez
+                self._connection.execute("ALTER TABLE media_sources ADD COLUMN version TEXT")
+            self._pid = os.getpid()
+        return self._connection
+    
+    def proxy_urls(self, sources: List[Tuple[str, Optional[str]]]) -> List[str]:
+        """
+        Registrar as imagens de uma listagem em uma única transação e retornar as URLs do proxy
+        
+        Args:
+            sources: pares (id estável da mídia, URL de origem assinada)
+        
+        Returns:
+            URLs relativas do proxy com a versão da imagem, na mesma ordem ('' sem URL de origem; as próprias
+            URLs se o proxy estiver desativado ou indisponível)
+        """
+        if not self.enabled:
+            return [source_url or "" for _, source_url in sources]
+        
+        now = time.time()
+        rows = {media_hash(media_id): source_url for media_id, source_url in sources if source_url}
+        if rows:
+            try:
+                with self._lock:
+                    db = self._db()
+                    db.execute("BEGIN IMMEDIATE")
+                    try:
+                        # A URL assinada é atualizada a cada listagem; o arquivo já baixado (content_hash) só é
+                        # mantido enquanto a versão (caminho da origem) não muda
+                        db.executemany("""
+                            INSERT INTO media_sources (hash, source_url, version, last_seen) VALUES (?, ?, ?, ?)
+                            ON CONFLICT(hash) DO UPDATE SET
+                                source_url = excluded.source_url,
+                                content_hash = CASE WHEN media_sources.version IS excluded.version
+                                                    THEN media_sources.content_hash END,
+                                version = excluded.version,
+                                last_seen = excluded.last_seen
+                        """, [(key, source_url, source_version(source_url), now) for key, source_url in rows.items()])
+                        db.execute("COMMIT")
+                    except sqlite3.Error:
+                        db.execute("ROLLBACK")
+                        raise
+            except sqlite3.Error as e:
+                logger.warning("Erro ao registrar imagens no proxy de mídia: %s", e)
+                return [source_url or "" for _, source_url in sources]
+        
+        return [f"{MEDIA_URL_PREFIX}/{media_hash(media_id)}?v={source_version(source_url)}" if source_url else ""
+                for media_id, source_url in sources]
+    
+    def get(self, key: str, size: str = DEFAULT_MEDIA_SIZE) -> Optional[Dict[str, Any]]:
+        """
+        Arquivo local de uma imagem registrada no tamanho pedido, baixando e reduzindo na primeira vez
+        
+        Returns:
+            {"path", "content_type", "etag", "version"}, {"error": ...} se a origem falhar, ou None para hash
+            desconhecido
+        """
+        source = self._source(key)
+        if source is None:
+            return None
+        source_url, content_hash, version = source
+        
+        try:
+            stored = self._stored_file(content_hash, size) if content_hash else None
+            if stored is None:
+                # Requisições simultâneas da mesma imagem (ou do mesmo tamanho) compartilham um único download
+                if not (content_hash and self._stored_file(content_hash, ORIGINAL_SIZE)):
+                    content_hash = single_flight.do(f"media:{key}:{version}",
+                                                    lambda: self._download(key, source_url, version))
+                if size == ORIGINAL_SIZE:
+                    stored = self._stored_file(content_hash, ORIGINAL_SIZE)
+                else:
+                    stored = single_flight.do(f"media:{content_hash}:{size}", lambda: self._resize(content_hash, size))
+            return {**stored, "version": version} if stored else stored
+        except (requests.exceptions.RequestException, OSError, ValueError) as e:
+            logger.warning("Erro ao obter imagem %s para o proxy de mídia: %s", key, e)
+            return {"error": str(e)}
+    
+    def _source(self, key: str) -> Optional[tuple]:
+        with self._lock:
+            return self._db().execute(
+                "SELECT source_url, content_hash, version FROM media_sources WHERE hash = ?", (key,)
+            ).fetchone()
+    
+    def _stored_file(self, content_hash: str, size: str) -> Optional[Dict[str, Any]]:
+        """Arquivo já presente no cache (atualizando o último acesso), ou None"""
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT path, content_type, last_access FROM media_files WHERE content_hash = ? AND size = ?",
+                (content_hash, size)
+            ).fetchone()
+            if row is None:
+                return None
+            path, content_type, last_access = row
+            if not os.path.exists(path):
+                db.execute("DELETE FROM media_files WHERE content_hash = ? AND size = ?", (content_hash, size))
+                return None
+            now = time.time()
+            if now - last_access > MEDIA_TOUCH_INTERVAL:
+                db.execute("UPDATE media_files SET last_access = ? WHERE content_hash = ? AND size = ?",
+                           (now, content_hash, size))
+        return {"path": path, "content_type": content_type, "etag": f"{content_hash[:32]}-{size}"}
+    
+    def _download(self, key: str, source_url: str, version: Optional[str]) -> str:
+        """Baixar a imagem de origem, gravá-la endereçada pelo conteúdo e retornar o hash do conteúdo"""
+        response = get_graph_transport().session.get(
+            source_url, stream=True, timeout=(GRAPH_CONNECT_TIMEOUT, GRAPH_READ_TIMEOUT)
+        )
+        try:
+            response.raise_for_status()
+            content_type = (response.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+            if not content_type.startswith("image/"):
+                raise ValueError(f"Conteúdo de origem não é uma imagem ({content_type or 'sem Content-Type'})")
+            
+            content = bytearray()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                content.extend(chunk)
+                if len(content) > MEDIA_MAX_SOURCE_BYTES:
+                    raise ValueError(f"Imagem de origem maior que {MEDIA_MAX_SOURCE_BYTES} bytes")
+        finally:
+            response.close()
+        
+        content_hash = hashlib.sha256(content).hexdigest()
+        self._store(content_hash, ORIGINAL_SIZE, bytes(content), content_type)
+        with self._lock:
+            # Só grava se a origem não mudou de versão durante o download
+            self._db().execute("UPDATE media_sources SET content_hash = ? WHERE hash = ? AND version IS ?",
+                               (content_hash, key, version))
+        return content_hash
+    
+    def _resize(self, content_hash: str, size: str) -> Optional[Dict[str, Any]]:
+        """Gerar (uma vez) a versão reduzida da imagem; sem Pillow ou para formatos animados serve o original"""
+        stored = self._stored_file(content_hash, size)
+        if stored:
+            return stored
+        original = self._stored_file(content_hash, ORIGINAL_SIZE)
+        if original is None or Image is None:
+            return original
+        
+        max_side = MEDIA_SIZES[size]
+        with Image.open(original["path"]) as image:
+            if getattr(image, "is_animated", False) or max(image.size) <= max_side:
+                return original
+            image.thumbnail((max_side, max_side))
+            
+            output = io.BytesIO()
+            if image.mode in ("RGBA", "LA", "P"):
+                image.save(output, format="PNG", optimize=True)
+                content_type = "image/png"
+            else:
+                image.convert("RGB").save(output, format="JPEG", quality=82, optimize=True, progressive=True)
+                content_type = "image/jpeg"
+        
+        self._store(content_hash, size, output.getvalue(), content_type)
+        return self._stored_file(content_hash, size)
+    
+    def _store(self, content_hash: str, size: str, content: bytes, content_type: str):
+        """Gravar o arquivo de forma atômica, indexá-lo e aplicar o limite de bytes do cache"""
+        extension = _EXTENSIONS.get(content_type, "img")
+        directory = os.path.join(self.cache_dir, content_hash[:2])
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{content_hash}.{size}.{extension}")
+        
+        descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as temp_file:
+                temp_file.write(content)
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        
+        with self._lock:
+            self._db().execute("""
+                INSERT OR REPLACE INTO media_files (content_hash, size, path, content_type, bytes, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (content_hash, size, path, content_type, len(content), time.time()))
+        self._evict()
+    
+    def _evict(self):
+        """Remover os arquivos menos acessados até o cache voltar a 90% do limite"""
+        with self._lock:
+            db = self._db()
+            total = db.execute("SELECT COALESCE(SUM(bytes), 0) FROM media_files").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            
+            target = self.max_bytes * 0.9
+            removed = []
+            for content_hash, size, path, size_bytes in db.execute(
+                "SELECT content_hash, size, path, bytes FROM media_files ORDER BY last_access"
+            ).fetchall():
+                if total <= target:
+                    break
+                removed.append((content_hash, size, path))
+                total -= size_bytes
+            
+            db.executemany("DELETE FROM media_files WHERE content_hash = ? AND size = ?",
+                           [(content_hash, size) for content_hash, size, _ in removed])
+            db.execute("DELETE FROM media_sources WHERE last_seen < ?", (time.time() - MEDIA_SOURCE_TTL,))
+        
+        for _, _, path in removed:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        logger.info("Proxy de mídia: %s arquivos removidos do cache (limite de %s bytes)", len(removed), self.max_bytes)
+
+
+media_proxy = MediaProxy()
@@ -0,0 +1,132 @@
+"""
+Cache de tokens de acesso de páginas do Facebook.
+
+Os tokens de página vêm de /me/accounts e são guardados em memória por (identidade do token de usuário, página),
+com a validade informada por /debug_token. Perto de expirar, o conjunto é renovado em segundo plano enquanto o
+token atual continua sendo usado; erros de autenticação (190/102) invalidam a entrada. Páginas que não estão no
+conjunto carregado ficam registradas como ausentes por PAGE_TOKEN_MISS_TTL, sem novas idas a /me/accounts.
+Os tokens nunca são gravados em disco.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from src.services.graph_cache import single_flight, token_identity
+from src.services.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Idade máxima de um token em cache, mesmo quando a API informa que ele não expira (s)
+PAGE_TOKEN_MAX_AGE = float(os.getenv("PAGE_TOKEN_MAX_AGE", str(6 * 3600)))
+# Antecedência com que a renovação proativa é disparada antes da expiração (s)
+PAGE_TOKEN_REFRESH_MARGIN = float(os.getenv("PAGE_TOKEN_REFRESH_MARGIN", "3600"))
+# Por quanto tempo uma página ausente do conjunto carregado é respondida como ausente sem recarregar (s)
+PAGE_TOKEN_MISS_TTL = float(os.getenv("PAGE_TOKEN_MISS_TTL", "300"))
+
+# Códigos de erro da Graph API que indicam token inválido ou expirado
+AUTH_ERROR_CODES = {102, 190}
+
+# loader() -> {"tokens": {page_id: page_token}, "expires_at": timestamp}
+PageTokenLoader = Callable[[], Dict[str, Any]]
+
+
+def token_expiry(debug_data: Dict[str, Any], now: Optional[float] = None,
+                 max_age: float = PAGE_TOKEN_MAX_AGE) -> float:
+    """Calcular até quando um token pode ser usado a partir do 'data' de /debug_token (0 = não expira)"""
+    now = now or time.time()
+    candidates = [now + max_age]
+    for field in ("expires_at", "data_access_expires_at"):
+        value = debug_data.get(field) or 0
+        if value > 0:
+            candidates.append(float(value))
+    return min(candidates)
+
+
+class PageTokenCache:
+    """Tokens de página por (token de usuário, página), com expiração e renovação proativa"""
+    
+    def __init__(self, refresh_margin: float = PAGE_TOKEN_REFRESH_MARGIN, miss_ttl: float = PAGE_TOKEN_MISS_TTL):
+        self.refresh_margin = refresh_margin
+        self.miss_ttl = miss_ttl
+        self._entries: Dict[tuple, Dict[str, Any]] = {}
+        # Momento do último carregamento completo por usuário (base do cache negativo)
+        self._loaded_at: Dict[str, float] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+    
+    def get(self, user_token: str, page_id: str, loader: PageTokenLoader) -> Optional[str]:
+        """
+        Retornar o token da página, carregando (uma vez por token de usuário) quando ausente ou expirado
+        
+        Returns:
+            Token da página ou None se a página não estiver entre as páginas do usuário
+        """
+        user_id = token_identity(user_token)
+        entry = self._entry(user_id, page_id)
+        now = time.time()
+        
+        if entry is not None and now < entry["expires_at"]:
+            if now >= entry["expires_at"] - self.refresh_margin:
+                self._refresh_in_background(user_id, loader)
+            return entry["token"]
+        
+        if entry is None and self._recently_loaded(user_id, now):
+            # A página não estava no conjunto carregado há pouco: ausência em cache
+            return None
+        
+        self._load(user_id, loader)
+        entry = self._entry(user_id, page_id)
+        return entry["token"] if entry is not None else None
+    
+    def invalidate(self, user_token: str, page_id: str = None):
+        """Descartar o token de uma página (ou de todas as páginas do usuário) após erro de autenticação"""
+        user_id = token_identity(user_token)
+        with self._lock:
+            # O próximo acesso recarrega o conjunto em vez de responder do cache negativo
+            self._loaded_at.pop(user_id, None)
+            for key in [key for key in self._entries if key[0] == user_id and (page_id is None or key[1] == page_id)]:
+                del self._entries[key]
+    
+    def _recently_loaded(self, user_id: str, now: float) -> bool:
+        with self._lock:
+            return now - self._loaded_at.get(user_id, float("-inf")) < self.miss_ttl
+    
+    def _entry(self, user_id: str, page_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._entries.get((user_id, page_id))
+    
+    def _load(self, user_id: str, loader: PageTokenLoader):
+        # Requisições simultâneas do mesmo usuário compartilham uma única ida a /me/accounts
+        single_flight.do(f"page_tokens:{user_id}", lambda: self._store(user_id, loader()))
+    
+    def _store(self, user_id: str, loaded: Dict[str, Any]):
+        expires_at = loaded.get("expires_at") or time.time() + PAGE_TOKEN_MAX_AGE
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+            for page_id, page_token in loaded.get("tokens", {}).items():
+                if page_token:
+                    self._entries[(user_id, page_id)] = {"token": page_token, "expires_at": expires_at}
+            self._loaded_at[user_id] = time.time()
+    
+    def _refresh_in_background(self, user_id: str, loader: PageTokenLoader):
+        with self._lock:
+            if user_id in self._refreshing:
+                return
+            self._refreshing.add(user_id)
+        
+        def refresh():
+            try:
+                self._load(user_id, loader)
+            except Exception as e:
+                logger.warning("Erro ao renovar tokens de página em segundo plano: %s", e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(user_id)
+        
+        threading.Thread(target=refresh, name="page-token-refresh", daemon=True).start()
+
+
+page_token_cache = PageTokenCache()
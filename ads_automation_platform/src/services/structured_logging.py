@@ -0,0 +1,196 @@
+"""
+Logging estruturado da aplicação.
+
+Os eventos são registrados como nome + campos (logfmt por padrão, JSON com LOG_FORMAT=json) e gravados no
+stdout por uma thread dedicada (QueueHandler/QueueListener): a thread da requisição só enfileira o registro,
+e a mensagem é formatada apenas se o nível estiver habilitado e já fora do caminho da requisição. Tokens de
+acesso são mascarados na saída. Eventos de alta frequência podem ser amostrados.
+
+Configuração por variáveis de ambiente:
+    LOG_LEVEL=INFO                                   nível padrão
+    LOG_LEVELS=src.routes=WARNING,src.services.graph_http=DEBUG   níveis por módulo
+    LOG_FORMAT=logfmt|json
+"""
+
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import math
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "logfmt").lower()
+
+# Campos cujo valor nunca é escrito
+_SECRET_FIELDS = {"access_token", "token", "page_token", "token_pagina", "client_secret", "api_key", "password"}
+# Tokens dentro de textos livres (URLs, corpos de requisição, mensagens de erro)
+_SECRET_PATTERN = re.compile(r"((?:access_token|input_token|client_secret)=)[^&\s'\"]+")
+_SECRET_VALUE_PATTERN = re.compile(r"(['\"](?:access_token|token|page_token)['\"]\s*:\s*['\"])[^'\"]+")
+
+_configured = False
+_configure_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def redact(text: str) -> str:
+    """Mascarar tokens de acesso presentes em um texto"""
+    text = _SECRET_PATTERN.sub(r"\1***", text)
+    return _SECRET_VALUE_PATTERN.sub(r"\1***", text)
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    text = redact(str(value))
+    if not text or any(char in text for char in ' ="'):
+        return json.dumps(text, ensure_ascii=False)
+    return text
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formata 'evento + campos' em logfmt ou JSON, mascarando tokens"""
+    
+    def __init__(self, output: str = LOG_FORMAT):
+        super().__init__()
+        self.output = output
+    
+    def format(self, record: logging.LogRecord) -> str:
+        fields = {
+            key: ("***" if key in _SECRET_FIELDS else value)
+            for key, value in (getattr(record, "fields", None) or {}).items()
+        }
+        message = redact(record.getMessage())
+        if record.exc_info or record.exc_text:
+            fields["exc"] = redact(record.exc_text or self.formatException(record.exc_info))
+        
+        timestamp = datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds")
+        if self.output == "json":
+            payload = {"ts": timestamp, "level": record.levelname, "logger": record.name, "msg": message}
+            payload.update({key: value if isinstance(value, (int, float, bool)) or value is None else redact(str(value))
+                            for key, value in fields.items()})
+            return json.dumps(payload, ensure_ascii=False, default=str)
+        
+        parts = [f"ts={timestamp}", f"level={record.levelname}", f"logger={record.name}",
+                 f"msg={_format_value(message)}"]
+        parts.extend(f"{key}={_format_value(value)}" for key, value in fields.items())
+        return " ".join(parts)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que não formata na thread de origem: a formatação fica com o QueueListener"""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info and not record.exc_text:
+            # O traceback precisa ser capturado antes que a pilha da exceção seja descartada
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        return record
+
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    levels = {}
+    for item in spec.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging():
+    """Instalar o handler assíncrono e os níveis por módulo (idempotente)"""
+    global _configured, _listener
+    if _configured:
+        return
+    with _configure_lock:
+        if _configured:
+            return
+        
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(StructuredFormatter())
+        
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=False)
+        _listener.start()
+        atexit.register(_listener.stop)
+        
+        app_logger = logging.getLogger("src")
+        app_logger.handlers = [DeferredQueueHandler(log_queue)]
+        app_logger.setLevel(LOG_LEVEL)
+        app_logger.propagate = False
+        
+        for name, level in _parse_levels(LOG_LEVELS).items():
+            logging.getLogger(name).setLevel(level)
+        
+        _configured = True
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger do módulo (use __name__), com a configuração da aplicação já instalada"""
+    configure_logging()
+    return logging.getLogger(name)
+
+
+class _Sampler:
+    """Amostragem determinística por evento: registra 1 a cada N ocorrências"""
+    
+    def __init__(self):
+        self._counters: Dict[str, Iterator[int]] = {}
+        self._lock = threading.Lock()
+    
+    def keep(self, event: str, rate: float) -> bool:
+        if rate >= 1:
+            return True
+        counter = self._counters.get(event)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.setdefault(event, itertools.count())
+        return next(counter) % max(1, math.ceil(1 / rate)) == 0
+
+
+_sampler = _Sampler()
+
+
+def log_event(logger: logging.Logger, level: int, event: str, sample_rate: float = 1.0, **fields: Any):
+    """
+    Registrar um evento estruturado
+    
+    Nada é montado quando o nível está desabilitado; com sample_rate < 1 apenas uma fração das ocorrências
+    é registrada (com o campo 'sample_rate' para permitir reescalar contagens).
+    """
+    if not logger.isEnabledFor(level):
+        return
+    if sample_rate < 1:
+        if not _sampler.keep(event, sample_rate):
+            return
+        fields["sample_rate"] = sample_rate
+    logger.log(level, event, extra={"fields": fields})
+
+
+@contextmanager
+def timed(logger: logging.Logger, event: str, level: int = logging.INFO, sample_rate: float = 1.0,
+          **fields: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Medir a duração de um bloco e registrá-la como 'duration_ms' no evento
+    
+    O dicionário retornado pode receber campos adicionais dentro do bloco (status, contagens...).
+    Exceções são registradas com 'error' e propagadas.
+    """
+    started = time.perf_counter()
+    try:
+        yield fields
+    except Exception as e:
+        fields["error"] = str(e)
+        raise
+    finally:
+        fields["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        log_event(logger, level, event, sample_rate=sample_rate, **fields)
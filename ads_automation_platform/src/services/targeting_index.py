@@ -0,0 +1,163 @@
+"""
+Índice local de autocomplete para as buscas de segmentação (Graph API /search).
+
+Os resultados de buscas anteriores alimentam, por escopo (tipo de busca, locale e filtros), uma lista ordenada
+de (termo normalizado, id) consultada com bisect. Quando a API devolve menos itens que o limite pedido para um
+prefixo, o prefixo fica "completo": qualquer consulta que o estenda é respondida localmente, sem ida à API.
+Teclas digitadas em sequência são agrupadas: uma consulta que estende um prefixo já em andamento espera por ele
+em vez de disparar outra chamada.
+"""
+
+import bisect
+import os
+import threading
+import time
+import unicodedata
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.services.graph_cache import single_flight
+
+# Itens pedidos por consulta à API (resultados abaixo disso marcam o prefixo como completo)
+TARGETING_SEARCH_LIMIT = int(os.getenv("TARGETING_SEARCH_LIMIT", "100"))
+# Validade da cobertura de um prefixo (s); depois disso ele volta a ser consultado na API
+TARGETING_INDEX_TTL = float(os.getenv("TARGETING_INDEX_TTL", str(24 * 3600)))
+# Máximo de itens por escopo; ao exceder, o escopo é reconstruído do zero
+TARGETING_INDEX_MAX_ITEMS = int(os.getenv("TARGETING_INDEX_MAX_ITEMS", "20000"))
+# Espera máxima por um prefixo em andamento antes de consultar a API por conta própria (s)
+TARGETING_PENDING_WAIT = float(os.getenv("TARGETING_PENDING_WAIT", "5"))
+# Consultas mais curtas que isso não geram cobertura (a API limita os resultados de termos muito curtos)
+TARGETING_MIN_PREFIX = 2
+
+# loader(query, limit) -> lista de itens da Graph API (cada um com 'key' ou 'id' e 'name')
+SearchLoader = Callable[[str, int], List[Dict[str, Any]]]
+
+
+def normalize_term(text: str) -> str:
+    """Minúsculas e sem acentos, para que 'sao' encontre 'São Paulo'"""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower().strip()
+
+
+def _item_id(item: Dict[str, Any]) -> str:
+    return str(item.get("key") or item.get("id") or item.get("name"))
+
+
+def _item_terms(item: Dict[str, Any]) -> List[str]:
+    """Termos indexados de um item: o nome completo e cada palavra a partir da segunda"""
+    name = normalize_term(item.get("name", ""))
+    words = name.split()
+    return list(dict.fromkeys([name] + words[1:])) if name else []
+
+
+def _item_rank(item: Dict[str, Any]) -> Tuple:
+    """Ordem dos resultados locais: maior público primeiro, depois nomes mais curtos"""
+    audience = item.get("audience_size_upper_bound") or item.get("audience_size") or 0
+    return (-int(audience), len(item.get("name", "")), item.get("name", ""))
+
+
+class _ScopeIndex:
+    """Itens e prefixos completos de um escopo (tipo de busca + locale + filtros)"""
+    
+    def __init__(self):
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.terms: List[Tuple[str, str]] = []
+        self.complete: Dict[str, float] = {}
+        self.pending: Dict[str, threading.Event] = {}
+    
+    def covering_prefix(self, term: str, now: float) -> Optional[str]:
+        """Prefixo completo (e ainda válido) que cobre o termo, se houver"""
+        for length in range(len(term), TARGETING_MIN_PREFIX - 1, -1):
+            covered_at = self.complete.get(term[:length])
+            if covered_at is not None and now - covered_at < TARGETING_INDEX_TTL:
+                return term[:length]
+        return None
+    
+    def pending_prefix(self, term: str) -> Optional[threading.Event]:
+        """Consulta em andamento cujo prefixo é estendido pelo termo"""
+        for length in range(len(term), TARGETING_MIN_PREFIX - 1, -1):
+            event = self.pending.get(term[:length])
+            if event is not None:
+                return event
+        return None
+    
+    def add(self, items: List[Dict[str, Any]]):
+        for item in items:
+            item_id = _item_id(item)
+            if item_id not in self.items:
+                for term in _item_terms(item):
+                    bisect.insort(self.terms, (term, item_id))
+            self.items[item_id] = item
+    
+    def match(self, term: str, limit: int) -> List[Dict[str, Any]]:
+        """Itens com algum termo começando pelo prefixo consultado"""
+        matched = {}
+        position = bisect.bisect_left(self.terms, (term, ""))
+        while position < len(self.terms) and self.terms[position][0].startswith(term):
+            item_id = self.terms[position][1]
+            matched[item_id] = self.items[item_id]
+            position += 1
+        return sorted(matched.values(), key=_item_rank)[:limit]
+
+
+class TargetingSearchIndex:
+    """Autocomplete de segmentação respondido localmente para prefixos já cobertos pela API"""
+    
+    def __init__(self, search_limit: int = TARGETING_SEARCH_LIMIT):
+        self.search_limit = search_limit
+        self._scopes: Dict[Tuple, _ScopeIndex] = {}
+        self._lock = threading.Lock()
+    
+    def _scope(self, scope: Tuple) -> _ScopeIndex:
+        index = self._scopes.get(scope)
+        if index is None:
+            index = self._scopes[scope] = _ScopeIndex()
+        return index
+    
+    def search(self, scope: Tuple, query: str, loader: SearchLoader, limit: int = 25) -> Dict[str, Any]:
+        """
+        Sugestões para a consulta, do índice local quando o prefixo está coberto
+        
+        Returns:
+            {"data": [...], "source": "local" | "api"}
+        """
+        term = normalize_term(query)
+        
+        # Espera limitada: se o prefixo em andamento não cobrir a consulta, ela segue para a API
+        deadline = time.monotonic() + TARGETING_PENDING_WAIT
+        while True:
+            with self._lock:
+                index = self._scope(scope)
+                if index.covering_prefix(term, time.time()):
+                    return {"data": index.match(term, limit), "source": "local"}
+                event = index.pending_prefix(term)
+            remaining = deadline - time.monotonic()
+            if event is None or remaining <= 0 or not event.wait(remaining):
+                break
+        
+        items = single_flight.do(f"targeting:{scope}:{term}", lambda: self._load(scope, term, query, loader))
+        return {"data": items[:limit], "source": "api"}
+    
+    def _load(self, scope: Tuple, term: str, query: str, loader: SearchLoader) -> List[Dict[str, Any]]:
+        event = threading.Event()
+        with self._lock:
+            self._scope(scope).pending[term] = event
+        
+        try:
+            items = loader(query, self.search_limit)
+            with self._lock:
+                index = self._scope(scope)
+                if len(index.items) + len(items) > TARGETING_INDEX_MAX_ITEMS:
+                    pending = index.pending
+                    index = self._scopes[scope] = _ScopeIndex()
+                    index.pending = pending
+                index.add(items)
+                if len(items) < self.search_limit and len(term) >= TARGETING_MIN_PREFIX:
+                    index.complete[term] = time.time()
+            return items
+        finally:
+            with self._lock:
+                self._scope(scope).pending.pop(term, None)
+            event.set()
+
+
+targeting_index = TargetingSearchIndex()